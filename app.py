@@ -1,17 +1,20 @@
 # app.py
 
 import streamlit as st
-import pandas as pd
-import joblib
 from streamlit_option_menu import option_menu
+import contextlib
 import time
-import lime
-import lime.lime_tabular
-import matplotlib.pyplot as plt
-from sklearn.model_selection import train_test_split
-import plotly.graph_objects as go
-import plotly.express as px
-import seaborn as sns
+
+# Pustaka berat (pandas, sklearn, lime, matplotlib, plotly.express) diimpor oleh
+# fungsi yang membutuhkannya; sisanya dipanaskan di latar setelah render pertama
+# (lihat jantung/startup.py)
+from jantung.batcher import buat_batcher_prediksi
+from jantung.cache import CacheHasil, HasilPrediksi, kunci_pasien
+from jantung.executor import EksekutorPenjelasan
+from jantung.metrics import ADMIN_PANEL, METRIK, mulai_server, ukur_tahap
+from jantung.schema import AMBANG_SEDANG, AMBANG_TINGGI, band_risiko
+from jantung.session import HasilSesi, PenyimpanSesi, payload_list, payload_tuple
+from jantung.startup import panaskan_latar
 
 # ==============================================================================
 # 1. KONFIGURASI, DATA STATIS, DAN GAYA (CSS)
@@ -54,6 +57,7 @@ TRANSLATIONS = {
         'home_disclaimer_title': "⚠️ Disclaimer Penting",
         'home_disclaimer_md': "Aplikasi ini adalah prototipe untuk tujuan edukasi dan **tidak boleh digunakan untuk diagnosis medis nyata**. Hasil prediksi tidak menggantikan konsultasi dengan tenaga medis profesional.",
         'form_intro': "Silakan isi data pasien di bawah ini secara akurat untuk mendapatkan prediksi.",
+        'model_unavailable': "Model tidak berhasil dimuat, sehingga prediksi belum dapat dilakukan.",
         'patient_data_header': "🩺 Data Pasien",
         'age_label': "Usia", 'sex_label': "Jenis Kelamin", 'chest_pain_type_label': "Tipe Nyeri Dada",
         'resting_bp_label': "Tekanan Darah Istirahat", 'cholesterol_label': "Kolesterol",
@@ -74,7 +78,24 @@ TRANSLATIONS = {
         'prediction_confidence_label': "Keyakinan Prediksi",
         'no_disease_prob': "Probabilitas Tidak Sakit Jantung", 'disease_prob': "Probabilitas Sakit Jantung",
         'lime_analysis_title': "🔬 Penjelasan Faktor Risiko (Analisis LIME)",
-        'lime_explanation': "Grafik di bawah ini menunjukkan faktor-faktor yang paling berpengaruh pada prediksi untuk pasien ini. Faktor dengan bar merah mendukung prediksi 'Sakit Jantung', sedangkan bar hijau menentangnya.",
+        'lime_explanation': "Grafik di bawah ini menunjukkan faktor-faktor yang paling berpengaruh pada prediksi untuk pasien ini. Faktor dengan bar merah mendukung prediksi 'Sakit Jantung', sedangkan bar biru menentangnya.",
+        'percentile_title': "📊 Posisi Pasien dalam Populasi", 'percentile_all': "Risiko pasien ini lebih tinggi dari **{p:.0%}** pasien dalam dataset ({n} pasien).",
+        'percentile_group_help': "Persentase pasien dalam kelompok ini ({n} pasien) yang skor risikonya lebih rendah.", 'percentile_note': "Dibandingkan dengan probabilitas out-of-fold seluruh baris heart.csv.",
+        'whatif_title': "🔬 Analisis What-If", 'whatif_desc': "Lihat bagaimana risiko berubah jika satu atau dua faktor pasien ini digeser di sepanjang rentang input. Seluruh grid dihitung sekali; menggeser slider tidak menghitung ulang.",
+        'whatif_feature_x': "Faktor yang digeser", 'whatif_feature_y': "Faktor kedua (opsional)", 'whatif_none': "(tidak ada)",
+        'whatif_slider': "Nilai {fitur}", 'whatif_risk_at': "Risiko pada nilai terpilih", 'whatif_chart_title': "Kurva risiko what-if",
+        'cohort_title': "Kontribusi Rata-rata per Pasien (Penjelasan Lokal)", 'cohort_desc': "Rata-rata besar kontribusi tiap faktor pada penjelasan lokal seluruh pasien dalam dataset. Bar merah: rata-rata mendorong risiko naik, biru: menurunkannya. Bisa dipersempit ke satu subgrup.",
+        'cohort_group': "Subgrup", 'cohort_all': "Seluruh pasien", 'cohort_chart_title': "Rata-rata |kontribusi| per fitur", 'cohort_xaxis': "Rata-rata |kontribusi| terhadap probabilitas",
+        'cohort_caption': "{n} pasien, mode penjelasan '{mode}', dihitung {created}.", 'cohort_missing': "Ringkasan penjelasan kohort belum dihitung untuk model ini. Jalankan `python -m jantung.cohort`.",
+        'input_mode': "Mode input", 'input_mode_form': "📝 Satu pasien (form)", 'input_mode_upload': "📂 Unggah file pasien",
+        'upload_desc': "Unggah file CSV atau Parquet dengan kolom yang sama seperti heart.csv: {kolom}. Kolom lain (mis. ID pasien) ikut disalin ke file hasil. File diskor per bagian, jadi file besar pun tidak membebani memori.",
+        'upload_label': "File pasien (.csv / .parquet)", 'upload_start': "🧠 Skor Seluruh File", 'upload_cancel': "⏹️ Batalkan",
+        'upload_progress': "{rows:,} baris diskor ({rate:,.0f} baris/detik)", 'upload_chart_title': "Jumlah pasien per kategori risiko", 'upload_patients': "Jumlah pasien",
+        'upload_done': "Selesai: {rows:,} baris diskor dalam {seconds:.1f} detik.", 'upload_cancelled': "Skoring dihentikan setelah {rows:,} baris. File hasil hanya berisi baris yang sudah diskor.",
+        'upload_invalid': "{n:,} baris tidak valid dan tidak diskor; alasannya ada di kolom `error` file hasil.", 'upload_download': "⬇️ Unduh Hasil (CSV)", 'upload_error': "File tidak bisa diskor: {error}",
+        'admin_panel_title': "Panel Admin: Metrik Kinerja", 'admin_panel_empty': "Belum ada data pengukuran.",
+        'lime_fallback_timeout': "Penjelasan untuk pasien ini belum tersedia (batas waktu terlampaui).", 'lime_fallback_error': "Penjelasan untuk pasien ini gagal dihitung.",
+        'lime_fallback_global': "Ditampilkan tingkat kepentingan fitur global dari model sebagai gantinya.", 'lime_fallback_none': "Model aktif tidak memiliki tingkat kepentingan fitur global untuk ditampilkan.",
         'lime_plot_title_prefix': "Penjelasan lokal untuk kelas", 'class_disease': "Penyakit",
         'prob_explanation_title': "💡 Interpretasi Probabilitas",
         'prob_explanation_high': "Skor probabilitas pasien **({score:.1f}%)** berada di atas ambang batas risiko tinggi **(46%)**, sehingga diklasifikasikan sebagai **RISIKO TINGGI**.",
@@ -140,7 +161,8 @@ TRANSLATIONS = {
         'feature_importance_desc': "Grafik ini menunjukkan fitur mana yang paling berpengaruh secara global terhadap prediksi model Random Forest. Semakin tinggi nilainya, semakin penting fitur tersebut bagi model.",
         'feature_importance_chart_title': "Fitur Paling Berpengaruh (Random Forest Feature Importance)",
         'feature_importance_xaxis': "Tingkat Kepentingan (Importance)",
-        'feature_importance_yaxis': "Fitur"
+        'feature_importance_yaxis': "Fitur",
+        'feature_importance_unavailable': "Model aktif tidak menyediakan tingkat kepentingan fitur global (mis. SVC), sehingga grafik ini tidak ditampilkan."
         # <<< AKHIR KODE BARU >>>
     },
     'en': { # English translations need to be fully populated for a real app
@@ -171,6 +193,7 @@ TRANSLATIONS = {
         'home_disclaimer_title': "⚠️ Important Disclaimer",
         'home_disclaimer_md': "This application is a prototype for educational purposes and **should not be used for real medical diagnosis**. Predictions do not replace consultation with a healthcare professional.",
         'form_intro': "Please fill in the patient's data below accurately to receive a prediction.",
+        'model_unavailable': "The model could not be loaded, so predictions are not available.",
         'patient_data_header': "🩺 Patient Data",
         'age_label': "Age", 'sex_label': "Sex", 'chest_pain_type_label': "Chest Pain Type",
         'resting_bp_label': "Resting Blood Pressure", 'cholesterol_label': "Cholesterol",
@@ -191,7 +214,24 @@ TRANSLATIONS = {
         'prediction_confidence_label': "Prediction Confidence",
         'no_disease_prob': "Probability of No Heart Disease", 'disease_prob': "Probability of Heart Disease",
         'lime_analysis_title': "🔬 Risk Factor Explanation (LIME Analysis)",
-        'lime_explanation': "The chart below shows the most influential factors for this patient's prediction. Red bars support the 'Heart Disease' prediction, while green bars oppose it.",
+        'lime_explanation': "The chart below shows the most influential factors for this patient's prediction. Red bars support the 'Heart Disease' prediction, while blue bars oppose it.",
+        'percentile_title': "📊 Patient Position in the Population", 'percentile_all': "This patient's risk is higher than **{p:.0%}** of patients in the dataset ({n} patients).",
+        'percentile_group_help': "Share of patients in this group ({n} patients) with a lower risk score.", 'percentile_note': "Compared against out-of-fold probabilities for every row of heart.csv.",
+        'whatif_title': "🔬 What-If Analysis", 'whatif_desc': "See how the risk changes when one or two of this patient's factors move across the input range. The whole grid is computed once; dragging the slider does not recompute it.",
+        'whatif_feature_x': "Factor to vary", 'whatif_feature_y': "Second factor (optional)", 'whatif_none': "(none)",
+        'whatif_slider': "{fitur} value", 'whatif_risk_at': "Risk at selected value", 'whatif_chart_title': "What-if risk curve",
+        'cohort_title': "Average Per-Patient Contribution (Local Explanations)", 'cohort_desc': "Average magnitude of each factor's contribution across the local explanations of every patient in the dataset. Red bars push the risk up on average, blue bars push it down. Can be narrowed to a subgroup.",
+        'cohort_group': "Subgroup", 'cohort_all': "All patients", 'cohort_chart_title': "Mean |contribution| per feature", 'cohort_xaxis': "Mean |contribution| to probability",
+        'cohort_caption': "{n} patients, '{mode}' explanation mode, computed {created}.", 'cohort_missing': "The cohort explanation summary has not been computed for this model yet. Run `python -m jantung.cohort`.",
+        'input_mode': "Input mode", 'input_mode_form': "📝 Single patient (form)", 'input_mode_upload': "📂 Upload patient file",
+        'upload_desc': "Upload a CSV or Parquet file with the same columns as heart.csv: {kolom}. Other columns (e.g. patient ID) are copied to the result file. The file is scored in parts, so even large files do not strain memory.",
+        'upload_label': "Patient file (.csv / .parquet)", 'upload_start': "🧠 Score Entire File", 'upload_cancel': "⏹️ Cancel",
+        'upload_progress': "{rows:,} rows scored ({rate:,.0f} rows/second)", 'upload_chart_title': "Patients per risk category", 'upload_patients': "Patients",
+        'upload_done': "Done: {rows:,} rows scored in {seconds:.1f} seconds.", 'upload_cancelled': "Scoring stopped after {rows:,} rows. The result file only contains the rows scored so far.",
+        'upload_invalid': "{n:,} invalid rows were not scored; the reasons are in the result file's `error` column.", 'upload_download': "⬇️ Download Results (CSV)", 'upload_error': "The file could not be scored: {error}",
+        'admin_panel_title': "Admin Panel: Performance Metrics", 'admin_panel_empty': "No measurements yet.",
+        'lime_fallback_timeout': "The explanation for this patient is not available yet (timed out).", 'lime_fallback_error': "The explanation for this patient could not be computed.",
+        'lime_fallback_global': "The model's global feature importances are shown instead.", 'lime_fallback_none': "The active model has no global feature importances to show instead.",
         'lime_plot_title_prefix': "Local explanation for class", 'class_disease': "Disease",
         'prob_explanation_title': "💡 Probability Interpretation",
         'prob_explanation_high': "The patient's probability score **({score:.1f}%)** is above the high-risk threshold **(46%)**, hence classified as **HIGH RISK**.",
@@ -256,7 +296,8 @@ TRANSLATIONS = {
         'feature_importance_desc': "This chart shows which features are most influential globally for the Random Forest model's predictions. A higher value means the feature is more important to the model.",
         'feature_importance_chart_title': "Most Influential Features (Random Forest Feature Importance)",
         'feature_importance_xaxis': "Importance Level",
-        'feature_importance_yaxis': "Feature"
+        'feature_importance_yaxis': "Feature",
+        'feature_importance_unavailable': "The active model does not provide global feature importances (e.g. an SVC), so this chart is not shown."
         # <<< AKHIR KODE BARU >>>
     }
 }
@@ -293,6 +334,57 @@ def atur_gaya():
 # 2. FUNGSI-FUNGSI UTAMA (LOGIKA & HALAMAN)
 # ==============================================================================
 
+# What-if: grid satu/dua fitur diskor dalam satu panggilan (jantung/whatif.py) dan disimpan di cache,
+# sehingga menggeser slider (rerun fragment saja) hanya membaca grid yang sudah ada
+@st.cache_resource
+def get_cache_whatif():
+    return CacheHasil(maxsize=256)
+
+# Figur what-if per (grid, posisi penanda, label): rerun penuh halaman prediksi tidak membangunnya ulang
+@st.cache_resource(show_spinner=False, max_entries=128)
+def get_figur_whatif(kunci, titik_asli, titik_pilih, judul, label_risiko, _hasil):
+    from jantung.whatif import figur_sapuan
+    return figur_sapuan(_hasil, judul, label_risiko, titik_asli, titik_pilih)
+
+@st.fragment
+def tampilkan_whatif(T, model, versi_model, pasien):
+    from jantung.whatif import FITUR_SAPUAN, sapuan_cache
+    st.subheader(T['whatif_title']); st.caption(T['whatif_desc'])
+    col1, col2 = st.columns(2)
+    with col1: fitur_x = st.selectbox(T['whatif_feature_x'], FITUR_SAPUAN, index=FITUR_SAPUAN.index('Cholesterol'), key='whatif_x')
+    with col2: fitur_y = st.selectbox(T['whatif_feature_y'], [None] + [f for f in FITUR_SAPUAN if f != fitur_x], format_func=lambda f: T['whatif_none'] if f is None else f, key='whatif_y')
+    with ukur_tahap('predict', 'whatif'): hasil = sapuan_cache(get_cache_whatif(), model, versi_model, pasien, fitur_x, fitur_y)
+    asli_x, asli_y = hasil.titik_x(pasien[fitur_x]), hasil.titik_y(pasien[fitur_y]) if fitur_y else None
+    # Kunci slider memuat kunci pasien: pasien baru mulai dari nilainya sendiri, bukan posisi slider pasien sebelumnya
+    k_pasien = kunci_pasien(pasien, versi_model); sufiks = '_'.join(map(str, k_pasien))
+    pilih_x = st.select_slider(T['whatif_slider'].format(fitur=fitur_x), options=list(hasil.nilai_x), value=asli_x, key=f'whatif_nilai_x_{fitur_x}_{sufiks}')
+    pilih_y = st.select_slider(T['whatif_slider'].format(fitur=fitur_y), options=list(hasil.nilai_y), value=asli_y, key=f'whatif_nilai_y_{fitur_y}_{sufiks}') if fitur_y else None
+    risiko, risiko_asli = hasil.nilai_di(pilih_x, pilih_y), hasil.nilai_di(asli_x, asli_y)
+    st.metric(T['whatif_risk_at'], f"{risiko:.1%}", delta=f"{(risiko - risiko_asli) * 100:+.1f} pp", delta_color="inverse")
+    titik_asli, titik_pilih = (asli_x, asli_y) if fitur_y else asli_x, (pilih_x, pilih_y) if fitur_y else pilih_x
+    kunci = (k_pasien, fitur_x, fitur_y)
+    st.plotly_chart(get_figur_whatif(kunci, titik_asli, titik_pilih, T['whatif_chart_title'], T['risk_level'], hasil), use_container_width=True)
+
+# Ringkasan penjelasan kohort dihitung offline (python -m jantung.cohort) dan hanya dibaca di sini;
+# mtime file ikut kunci cache agar hasil job baru langsung terbaca
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_ringkasan_kohort(versi_model, mtime):
+    from jantung.cohort import muat_ringkasan
+    return muat_ringkasan(versi_model)
+
+@st.fragment
+def tampilkan_kohort(T, versi_model):
+    import os
+    from jantung.cohort import figur_kohort, path_ringkasan
+    st.markdown(f"**{T['cohort_title']}**"); st.write(T['cohort_desc'])
+    path = path_ringkasan(versi_model)
+    ringkasan = get_ringkasan_kohort(versi_model, os.path.getmtime(path)) if path.exists() else None
+    if ringkasan is None: st.info(T['cohort_missing']); return
+    pilihan = {T['cohort_all']: (None, None), **{f"{dimensi} = {grup}": (dimensi, grup) for dimensi, isi in ringkasan['groups'].items() for grup in isi}}
+    pilih = st.selectbox(T['cohort_group'], list(pilihan), key='cohort_grup')
+    st.plotly_chart(figur_kohort(ringkasan, T['cohort_chart_title'], T['cohort_xaxis'], *pilihan[pilih]), use_container_width=True)
+    st.caption(T['cohort_caption'].format(n=ringkasan['overall']['n'], mode=ringkasan['mode'], created=ringkasan['created'][:10]))
+
 def tampilkan_header_banner(T):
     st.markdown(f"""
     <div class="banner">
@@ -307,28 +399,98 @@ def tampilkan_header_banner(T):
     """, unsafe_allow_html=True)
 
 @st.cache_resource
-def setup_resources():
+def get_pengelola_model():
+    # Memuat bundle artefak yang sudah dibangun (python -m jantung.artifacts):
+    # tidak ada train_test_split atau fit ulang preprocessor saat startup.
+    # Logika pemuatan dibagi dengan layanan REST (jantung/resources.py); model
+    # aktif ditukar tanpa restart lewat `python -m jantung.registry activate`.
+    # Pool penjelasan dibuat (dan dipanaskan) saat setiap versi dimuat, bukan saat penjelasan pertama diminta
+    from jantung.registry import PengelolaModel
+    return PengelolaModel(pabrik_lampiran={'eksekutor': lambda sd: EksekutorPenjelasan(sd.explainer, sd.versi_model)})
+
+@contextlib.contextmanager
+def sewa_sumber_daya():
+    # Model yang dipinjam tetap di memori sampai rerun ini selesai, walau model aktif sudah ditukar
     try:
-        model = joblib.load("model_pipeline_terbaik.pkl")
-        df = pd.read_csv('heart.csv')
-        X = df.drop('HeartDisease', axis=1)
-        y = df['HeartDisease']
-        X_train, _, _, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
-        preprocessor = model.named_steps['preprocessor']
-        X_train_processed = preprocessor.fit_transform(X_train)
-        explainer = lime.lime_tabular.LimeTabularExplainer(
-            training_data=X_train_processed,
-            feature_names=preprocessor.get_feature_names_out(),
-            class_names=['No Disease', 'Disease'],
-            mode='classification'
-        )
-        return model, explainer, preprocessor, df
+        pengelola = get_pengelola_model()
     except FileNotFoundError:
-        st.error("Gagal memuat file 'model_pipeline_terbaik.pkl' atau 'heart.csv'.")
-        return None, None, None, None
+        st.error("Gagal memuat bundle artefak (jalankan `python -m jantung.artifacts`) atau 'heart.csv'.")
+        yield None, None, None, None, None, None
+        return
+    except (ValueError, OSError) as exc:
+        # Mis. store dataset yang tidak bisa dibuka/ditulis (lihat `python -m jantung.store rebuild`)
+        st.error(f"Gagal memuat sumber daya model: {exc}")
+        yield None, None, None, None, None, None
+        return
+    with pengelola.sewa() as sd:
+        yield sd.model, sd.explainer, sd.preprocessor, sd.df, sd.versi_model, sd.agregat
+
+# Agregat Home dibaca dari agregat berjalan store (tanpa memindai baris) sekali per (dataset, model);
+# figur & heatmap per bahasa
+@st.cache_resource(show_spinner=False)
+def get_agregat_home(dataset_hash, versi_model, _df, _model, _berjalan=None):
+    from jantung.analytics import hitung_agregat
+    return hitung_agregat(_df, _model, _berjalan)
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def siapkan_analitik_home(dataset_hash, versi_model, lang, _df, _model, _berjalan=None):
+    T = TRANSLATIONS.get(lang, TRANSLATIONS['id'])
+    from jantung.analytics import figur_home, render_heatmap_png
+    agregat = get_agregat_home(dataset_hash, versi_model, _df, _model, _berjalan)
+    return {
+        'agregat': agregat,
+        'figur': figur_home(agregat, T),
+        'heatmap_png': render_heatmap_png(agregat, T['correlation_heatmap_title']),
+    }
+
+# Indeks persentil populasi per (dataset, model): dibaca dari artifacts/<versi>/ (dibangun saat bundle dibuat),
+# baris baru dataset diskor di memori. None jika bundle belum punya indeks (`python -m jantung.percentile`)
+@st.cache_resource(show_spinner=False)
+def get_indeks_persentil(dataset_hash, versi_model, _df, _model):
+    from jantung.percentile import muat_atau_bangun
+    return muat_atau_bangun(versi_model, _df, _model, simpan=False, bangun=False)
+
+# Permintaan prediksi bersamaan dari banyak sesi digabung menjadi satu predict_proba.
+# Batcher dan pool penjelasan melekat pada versi model, dan ditutup saat versi itu dilepas.
+def get_batcher_prediksi(versi_model, model):
+    return get_pengelola_model().lampiran(versi_model, 'batcher', lambda: buat_batcher_prediksi(model))
+
+# Penjelasan LIME dihitung di process pool yang dipanaskan saat versi dimuat (lihat jantung/executor.py)
+def get_eksekutor_penjelasan(versi_model, explainer):
+    return get_pengelola_model().lampiran(versi_model, 'eksekutor', lambda: EksekutorPenjelasan(explainer, versi_model))
+
+# Cache hasil prediksi dibagi oleh semua sesi dalam proses ini (lihat jantung/cache.py)
+@st.cache_resource
+def get_cache_prediksi():
+    return CacheHasil()
+
+# Hasil prediksi terakhir per sesi (payload ringkas, lihat jantung/session.py), agar rerun tidak menghilangkan hasil
+def get_penyimpan_sesi():
+    if 'hasil_prediksi' not in st.session_state: st.session_state.hasil_prediksi = PenyimpanSesi()
+    return st.session_state.hasil_prediksi
+
+# Figur hasil dibangun sekali per (input, bahasa) dan dibagi antar sesi. Objek Figure hanya disalin oleh
+# st.plotly_chart, sedangkan figur baru (atau spesifikasi dict) divalidasi ulang plotly di setiap rerun
+@st.cache_resource(show_spinner=False, max_entries=128)
+def get_figur_hasil(jenis, prob_sakit_percent, lang):
+    T = TRANSLATIONS.get(lang, TRANSLATIONS['id'])
+    return create_gauge_chart(prob_sakit_percent, T) if jenis == 'gauge' else create_pie_chart(prob_sakit_percent, T)
+
+@st.cache_resource(show_spinner=False, max_entries=128)
+def get_figur_penjelasan(penjelasan, judul):
+    from jantung.render import figur_penjelasan
+    return figur_penjelasan(payload_list(penjelasan), judul)
+
+# Histogram waktu per tahap diekspos di HEART_METRICS_PORT (format Prometheus, lihat jantung/metrics.py)
+@st.cache_resource(show_spinner=False)
+def siapkan_metrik():
+    METRIK.daftarkan_gauge('heart_prediction_cache', lambda: get_cache_prediksi().stats(), "Statistik cache hasil prediksi.")
+    METRIK.daftarkan_gauge('heart_model_swaps', lambda: get_pengelola_model().swaps, "Jumlah penukaran model aktif.")
+    return mulai_server()
 
 def create_gauge_chart(probability_score, T):
     # ... (fungsi ini tidak berubah)
+    import plotly.graph_objects as go
     fig = go.Figure(go.Indicator(
         mode = "gauge+number", value = probability_score,
         title = {'text': T['risk_level'], 'font': {'size': 20}},
@@ -348,6 +510,7 @@ def create_gauge_chart(probability_score, T):
 # [MODIFIKASI] - Mengubah pemetaan warna pada pie chart
 # ==========================================================
 def create_pie_chart(probability_score, T):
+    import plotly.express as px
     labels = [T['no_disease'], T['disease']]
     values = [100 - probability_score, probability_score]
     
@@ -399,21 +562,30 @@ def atur_navigasi(T):
             - {T['model_info_accuracy']}
             - {T['model_info_features']}
             """)
+        if ADMIN_PANEL:
+            with st.expander(T['admin_panel_title']):
+                ringkasan = METRIK.ringkasan()
+                if ringkasan: st.dataframe(ringkasan, hide_index=True, use_container_width=True)
+                else: st.caption(T['admin_panel_empty'])
+                st.json({'cache': get_cache_prediksi().stats(), 'models': get_pengelola_model().status()}, expanded=False)
     return selected_page
 
 # <<< UBAH DEFINISI FUNGSI INI >>>
-def tampilkan_halaman_home(T, df, model): # Tambahkan 'model' sebagai parameter
+def tampilkan_halaman_home(T, df, model, versi_model, berjalan=None): # Tambahkan 'model' sebagai parameter
     st.markdown(f"#### {T['home_intro_new']}")
     st.markdown("---")
     if df is None: st.warning("Data `heart.csv` tidak ditemukan."); return
 
+    with ukur_tahap('home', 'analytics'): analitik = siapkan_analitik_home(df.attrs.get('sha256'), versi_model, st.session_state.lang, df, model, berjalan)
+    agregat, figur = analitik['agregat'], analitik['figur']
+
     # Tinjauan Dataset
     st.subheader(T['dataset_overview_title'])
     col1, col2, col3, col4 = st.columns(4)
-    with col1: st.metric(label=f"🗂️ {T['total_samples_title']}", value=df.shape[0], help=T['total_samples_desc'])
-    with col2: st.metric(label=f"⚙️ {T['features_title']}", value=df.shape[1] - 1, help=T['features_desc'])
-    with col3: st.metric(label=f"⚠️ {T['positive_cases_title']}", value=df['HeartDisease'].sum(), help=T['positive_cases_desc'])
-    with col4: st.metric(label=f"✅ {T['healthy_cases_title']}", value=df.shape[0] - df['HeartDisease'].sum(), help=T['healthy_cases_desc'])
+    with col1: st.metric(label=f"🗂️ {T['total_samples_title']}", value=agregat['n_rows'], help=T['total_samples_desc'])
+    with col2: st.metric(label=f"⚙️ {T['features_title']}", value=agregat['n_features'], help=T['features_desc'])
+    with col3: st.metric(label=f"⚠️ {T['positive_cases_title']}", value=agregat['n_sakit'], help=T['positive_cases_desc'])
+    with col4: st.metric(label=f"✅ {T['healthy_cases_title']}", value=agregat['n_sehat'], help=T['healthy_cases_desc'])
     
     st.subheader(T['input_guide_title'])
 
@@ -439,10 +611,8 @@ def tampilkan_halaman_home(T, df, model): # Tambahkan 'model' sebagai parameter
     st.markdown("---")
     st.subheader(T['data_analysis_title']) 
 
-    df_display = df.copy()
-    df_display['HeartDisease_Label'] = df_display['HeartDisease'].map({1: T['class_disease'], 0: T['class_healthy']})
-
     # Definisi Tabs
+    mulai_grafik = time.perf_counter()
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
         f"📊 {T['tab_target_dist']}",
         f"⏳ {T['tab_age_dist']}",
@@ -452,94 +622,47 @@ def tampilkan_halaman_home(T, df, model): # Tambahkan 'model' sebagai parameter
     ])
 
     # --- KONTEN UNTUK SETIAP TAB ---
+    # Semua figur sudah dibangun dari agregat yang di-cache (jantung/analytics.py)
 
     with tab1:
         st.markdown(f"**{T['target_dist_title']}**")
         st.write(T['target_dist_desc'])
-        pie_data = df_display['HeartDisease_Label'].value_counts()
-        fig_pie = px.pie(
-            values=pie_data.values,
-            names=pie_data.index,
-            title=T['target_dist_pie_title'],
-            color=pie_data.index,
-            color_discrete_map={
-                T['class_disease']: '#FF4B4B', 
-                T['class_healthy']: '#1E88E5'
-            }
-        )
-        st.plotly_chart(fig_pie, use_container_width=True)
+        st.plotly_chart(figur['pie'], use_container_width=True)
 
     with tab2:
         st.markdown(f"**{T['age_dist_title']}**")
         st.write(T['age_dist_desc'])
-        fig_hist = px.histogram(
-            df_display, x='Age', color='HeartDisease_Label',
-            marginal="box", nbins=30, title=T['age_dist_hist_title'],
-            color_discrete_map={
-                T['class_disease']: '#FF4B4B',
-                T['class_healthy']: '#1E88E5'
-            }
-        )
-        st.plotly_chart(fig_hist, use_container_width=True)
+        st.plotly_chart(figur['age_hist'], use_container_width=True)
 
     with tab3:
         st.markdown(f"**{T['feature_relation_title']}**")
         st.write(T['feature_relation_desc'])
-        fig_box = px.box(
-            df_display, x='HeartDisease_Label', y='Cholesterol', color='HeartDisease_Label',
-            title=T['chol_vs_disease_title'],
-            color_discrete_map={
-                T['class_disease']: '#FF4B4B',
-                T['class_healthy']: '#1E88E5'
-            }
-        )
-        st.plotly_chart(fig_box, use_container_width=True)
-        fig_bar = px.histogram(
-            df_display, x='Sex', color='HeartDisease_Label', barmode='group',
-            title=T['sex_vs_disease_title'],
-            color_discrete_map={
-                T['class_disease']: '#FF4B4B',
-                T['class_healthy']: '#1E88E5'
-            }
-        )
-        st.plotly_chart(fig_bar, use_container_width=True)
+        st.plotly_chart(figur['chol_box'], use_container_width=True)
+        st.plotly_chart(figur['sex_bar'], use_container_width=True)
 
     with tab4:
         st.markdown(f"**{T['correlation_title']}**")
         st.write(T['correlation_desc'])
-        numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
-        corr_matrix = df[numeric_cols].corr()
-        fig_heatmap, ax = plt.subplots(figsize=(10, 8))
-        sns.heatmap(corr_matrix, annot=True, fmt=".2f", cmap="coolwarm", ax=ax, annot_kws={"size": 8})
-        ax.set_title(T['correlation_heatmap_title'], fontsize=16)
-        st.pyplot(fig_heatmap)
-        plt.clf()
+        st.image(analitik['heatmap_png'], use_container_width=True)
 
     with tab5:
         st.markdown(f"**{T['feature_importance_title']}**")
         st.write(T['feature_importance_desc'])
-        if model:
-            importances = model.named_steps['classifier'].feature_importances_
-            feature_names = model.named_steps['preprocessor'].get_feature_names_out()
-            feature_importance_df = pd.DataFrame({
-                'Feature': feature_names,
-                'Importance': importances
-            }).sort_values(by='Importance', ascending=False)
-            fig_importance = px.bar(
-                feature_importance_df, x='Importance', y='Feature', orientation='h',
-                title=T['feature_importance_chart_title'],
-                labels={'Importance': T['feature_importance_xaxis'], 'Feature': T['feature_importance_yaxis']}
-            )
-            fig_importance.update_layout(yaxis={'categoryorder':'total ascending'})
-            st.plotly_chart(fig_importance, use_container_width=True)
+        if 'importance' in figur:
+            st.plotly_chart(figur['importance'], use_container_width=True)
         else:
-            st.warning("Model tidak berhasil dimuat untuk menampilkan feature importance.")
+            st.warning("Model tidak berhasil dimuat untuk menampilkan feature importance." if model is None else T['feature_importance_unavailable'])
+        st.divider()
+        tampilkan_kohort(T, versi_model)
+    METRIK.observe('home', 'charts', time.perf_counter() - mulai_grafik)
 
     st.markdown("<br>", unsafe_allow_html=True)
     st.error(f"**{T['home_disclaimer_title']}**\n{T['home_disclaimer_md']}")
 
-def tampilkan_halaman_prediksi(T, model, explainer, preprocessor):
+def tampilkan_halaman_prediksi(T, model, explainer, preprocessor, versi_model, df=None):
     # ... (fungsi ini tidak berubah)
+    # Sumber daya gagal dimuat (sewa_sumber_daya sudah menampilkan alasannya): tidak ada yang bisa diskor
+    if model is None: st.warning(T['model_unavailable']); return
     st.info(T['form_intro'])
     st.markdown(f"**{T['risk_key_title']}**")
     col1, col2, col3 = st.columns(3)
@@ -550,6 +673,10 @@ def tampilkan_halaman_prediksi(T, model, explainer, preprocessor):
     with col3:
         with st.container(border=True): st.markdown(T['risk_key_high_title']); st.write(T['risk_key_high_desc'])
     st.markdown("<br>", unsafe_allow_html=True)
+    mode_input = st.radio(T['input_mode'], ['form', 'upload'], format_func=lambda mode: T[f'input_mode_{mode}'], horizontal=True, key='mode_input')
+    if mode_input == 'upload':
+        tampilkan_unggah(T, model, versi_model)
+        return
     with st.container(border=True):
         with st.form("prediction_form"):
             st.header(T['patient_data_header'])
@@ -561,38 +688,129 @@ def tampilkan_halaman_prediksi(T, model, explainer, preprocessor):
             with col3:
                 max_hr = st.number_input(T['max_hr_label'], min_value=70, max_value=205, value=150, step=1); exercise_angina = st.selectbox(T['exercise_angina_label'], ['Y', 'N']); oldpeak = st.number_input(T['oldpeak_label'], min_value=-2.0, max_value=6.5, value=1.0, step=0.1, format="%.1f"); st_slope = st.selectbox(T['st_slope_label'], ['Up', 'Flat', 'Down']); resting_ecg = st.selectbox(T['resting_ecg_label'], ['Normal', 'ST', 'LVH'])
             submitted = st.form_submit_button(T['predict_button'], use_container_width=True, type="primary")
+    sesi, versi_mode, future_penjelasan = get_penyimpan_sesi(), f"{versi_model}/{explainer.mode}", None
     if submitted:
-        with st.spinner(T['spinner_text']):
-            input_data = pd.DataFrame({'Age': [age], 'Sex': [sex], 'ChestPainType': [chest_pain_type], 'RestingBP': [resting_bp], 'Cholesterol': [cholesterol], 'FastingBS': [fasting_bs], 'RestingECG': [resting_ecg], 'MaxHR': [max_hr], 'ExerciseAngina': [exercise_angina], 'Oldpeak': [oldpeak], 'ST_Slope': [st_slope]})
-            probabilitas = model.predict_proba(input_data); prob_sakit = probabilitas[0][1]; input_processed = preprocessor.transform(input_data)
-            explanation = explainer.explain_instance(input_processed[0], model.named_steps['classifier'].predict_proba, num_features=11, labels=(1,))
-        st.divider()
-        st.header(T['result_header'])
-        prob_sakit_percent = prob_sakit * 100
-        if prob_sakit_percent >= 46: risk_text, risk_class, risk_icon, recommendation_text = T['result_high_risk'], "high", "🔴", T['recommendation_high']
-        elif prob_sakit_percent >= 25: risk_text, risk_class, risk_icon, recommendation_text = T['result_medium_risk'], "medium", "🟡", T['recommendation_medium']
-        else: risk_text, risk_class, risk_icon, recommendation_text = T['result_low_risk'], "low", "🟢", T['recommendation_low']
-        col1, col2 = st.columns([0.6, 0.4])
-        with col1: st.markdown(f"""<div class="result-box result-box-{risk_class}"><div class="result-title"><span class="result-icon">{risk_icon}</span><span>{risk_text}</span></div><div class="result-score">{T['risk_score']}: {prob_sakit_percent:.1f}%</div><div class="result-recommendation">{recommendation_text}</div></div>""", unsafe_allow_html=True)
-        with col2: st.plotly_chart(create_gauge_chart(prob_sakit_percent, T), use_container_width=True)
-        st.divider()
-        st.subheader(T['probability_breakdown'])
-        col1, col2 = st.columns([0.4, 0.6])
-        with col1:
-            with st.container(border=True): st.plotly_chart(create_pie_chart(prob_sakit_percent, T), use_container_width=True)
-        with col2:
-            with st.container(border=True):
-                st.markdown(f"**{T['model_confidence_title']}**"); st.markdown(f"**{T['prediction_confidence_label']}:** `{max(prob_sakit, 1-prob_sakit):.1%}`")
-                st.markdown(f"**{T['no_disease_prob']}:** `{1-prob_sakit:.1%}`"); st.markdown(f"**{T['disease_prob']}:** `{prob_sakit:.1%}`")
-                st.markdown("---"); st.info(T['prob_explanation_low'].format(score=prob_sakit_percent) if risk_class == 'low' else T['prob_explanation_medium'].format(score=prob_sakit_percent) if risk_class == 'medium' else T['prob_explanation_high'].format(score=prob_sakit_percent))
-        with st.expander(T['lime_analysis_title']):
-            st.markdown(T['lime_explanation']); fig = explanation.as_pyplot_figure(label=1); ax = plt.gca(); bars = ax.patches; exp_list = explanation.as_list(label=1); exp_list.reverse()
-            for i, patch in enumerate(bars):
-                if i < len(exp_list):
-                    weight = exp_list[i][1]
-                    if weight > 0: patch.set_color('red')
-                    else: patch.set_color('blue')
-            ax.set_title(f"{T['lime_plot_title_prefix']} {T['class_disease']}", fontsize=15); st.pyplot(fig, use_container_width=True); plt.clf()
+        pasien = {'Age': age, 'Sex': sex, 'ChestPainType': chest_pain_type, 'RestingBP': resting_bp, 'Cholesterol': cholesterol, 'FastingBS': fasting_bs, 'RestingECG': resting_ecg, 'MaxHR': max_hr, 'ExerciseAngina': exercise_angina, 'Oldpeak': oldpeak, 'ST_Slope': st_slope}
+        kunci = kunci_pasien(pasien, versi_mode)
+        # Submit ulang input yang sudah dihitung di sesi ini (klik ganda, kembali ke input sebelumnya) tidak dihitung ulang
+        hasil_sesi = sesi.pilih(kunci)
+        if hasil_sesi is None or hasil_sesi.fallback:
+            with st.spinner(T['spinner_text']):
+                # Pasien identik dari sesi mana pun (model & mode penjelasan sama) langsung diambil dari cache
+                with ukur_tahap('predict', 'cache'): hasil = get_cache_prediksi().get(kunci)
+                if hasil is None:
+                    with ukur_tahap('predict', 'pipeline'): prob_sakit = get_batcher_prediksi(versi_model, model)(pasien)
+                    # Penjelasan dikirim ke process pool; probabilitas & gauge dirender tanpa menunggunya
+                    future_penjelasan = kirim_penjelasan(versi_model, explainer, preprocessor, pasien)
+                    hasil = HasilPrediksi(prob_sakit, band_risiko(prob_sakit))
+                sesi.simpan(HasilSesi(kunci, pasien, hasil.prob_sakit, hasil.risk_band, penjelasan=hasil.explanation))
+    # Hasil terakhir sesi ini dirender ulang di setiap rerun (ganti bahasa, widget lain) selama model & mode penjelasan sama
+    hasil_sesi = sesi.terakhir
+    if hasil_sesi is not None and hasil_sesi.versi == versi_mode:
+        tampilkan_hasil_prediksi(T, hasil_sesi, model, explainer, preprocessor, versi_model, df, future_penjelasan)
+
+def kirim_penjelasan(versi_model, explainer, preprocessor, pasien):
+    import pandas as pd
+    input_data = pd.DataFrame({kolom: [nilai] for kolom, nilai in pasien.items()})
+    with ukur_tahap('predict', 'transform'): input_processed = preprocessor.transform(input_data)
+    return get_eksekutor_penjelasan(versi_model, explainer).submit(input_processed[0], num_features=11, label=1)
+
+def tampilkan_hasil_prediksi(T, hasil, model, explainer, preprocessor, versi_model, df, future_penjelasan=None):
+    pasien, prob_sakit, lang = hasil.pasien, hasil.prob_sakit, st.session_state.lang
+    st.divider()
+    st.header(T['result_header'])
+    prob_sakit_percent = prob_sakit * 100
+    if prob_sakit >= AMBANG_TINGGI: risk_text, risk_class, risk_icon, recommendation_text = T['result_high_risk'], "high", "🔴", T['recommendation_high']
+    elif prob_sakit >= AMBANG_SEDANG: risk_text, risk_class, risk_icon, recommendation_text = T['result_medium_risk'], "medium", "🟡", T['recommendation_medium']
+    else: risk_text, risk_class, risk_icon, recommendation_text = T['result_low_risk'], "low", "🟢", T['recommendation_low']
+    col1, col2 = st.columns([0.6, 0.4])
+    with col1: st.markdown(f"""<div class="result-box result-box-{risk_class}"><div class="result-title"><span class="result-icon">{risk_icon}</span><span>{risk_text}</span></div><div class="result-score">{T['risk_score']}: {prob_sakit_percent:.1f}%</div><div class="result-recommendation">{recommendation_text}</div></div>""", unsafe_allow_html=True)
+    with col2, ukur_tahap('predict', 'gauge'): st.plotly_chart(get_figur_hasil('gauge', prob_sakit_percent, lang), use_container_width=True)
+    with ukur_tahap('predict', 'percentile'): indeks = get_indeks_persentil(df.attrs.get('sha256'), versi_model, df, model) if df is not None else None
+    if indeks is not None:
+        # Posisi pasien di populasi: binary search pada probabilitas out-of-fold terurut (jantung/percentile.py)
+        konteks = indeks.konteks(prob_sakit, pasien)
+        with st.container(border=True):
+            st.markdown(f"**{T['percentile_title']}**"); st.markdown(T['percentile_all'].format(p=konteks['all']['percentile'], n=konteks['all']['n']))
+            for kolom, (dimensi, label) in zip(st.columns(3), (('Sex', T['sex_label']), ('ChestPainType', T['chest_pain_type_label']), ('AgeBand', T['age_label']))):
+                with kolom: st.metric(f"{label}: {konteks[dimensi]['group']}", f"{konteks[dimensi]['percentile']:.0%}" if konteks[dimensi]['n'] else "-", help=T['percentile_group_help'].format(n=konteks[dimensi]['n']))
+            st.caption(T['percentile_note'])
+    st.divider()
+    st.subheader(T['probability_breakdown'])
+    col1, col2 = st.columns([0.4, 0.6])
+    with col1:
+        with st.container(border=True), ukur_tahap('predict', 'pie'): st.plotly_chart(get_figur_hasil('pie', prob_sakit_percent, lang), use_container_width=True)
+    with col2:
+        with st.container(border=True):
+            st.markdown(f"**{T['model_confidence_title']}**"); st.markdown(f"**{T['prediction_confidence_label']}:** `{max(prob_sakit, 1-prob_sakit):.1%}`")
+            st.markdown(f"**{T['no_disease_prob']}:** `{1-prob_sakit:.1%}`"); st.markdown(f"**{T['disease_prob']}:** `{prob_sakit:.1%}`")
+            st.markdown("---"); st.info(T['prob_explanation_low'].format(score=prob_sakit_percent) if risk_class == 'low' else T['prob_explanation_medium'].format(score=prob_sakit_percent) if risk_class == 'medium' else T['prob_explanation_high'].format(score=prob_sakit_percent))
+    with st.expander(T['lime_analysis_title']):
+        st.markdown(T['lime_explanation'])
+        if hasil.penjelasan is None:
+            from jantung.render import payload_penjelasan
+            # Run submit: tunggu future; rerun yang memotong penantian sebelumnya: kirim ulang ke pool
+            future_penjelasan = future_penjelasan or kirim_penjelasan(versi_model, explainer, preprocessor, pasien)
+            with st.spinner(T['spinner_text']), ukur_tahap('predict', 'explain'):
+                explanation, hasil.fallback = get_eksekutor_penjelasan(versi_model, explainer).hasil(future_penjelasan, num_features=11, label=1)
+            # Disimpan sebagai payload ringkas (jantung/render.py), bukan objek lime Explanation
+            hasil.penjelasan = payload_tuple(payload_penjelasan(explanation)) if explanation is not None else ()
+            if not hasil.fallback: get_cache_prediksi().put(hasil.kunci, HasilPrediksi(prob_sakit, hasil.risk_band, hasil.penjelasan))
+        if hasil.fallback: st.warning(f"{T[f'lime_fallback_{hasil.fallback}']} {T['lime_fallback_global'] if hasil.penjelasan else T['lime_fallback_none']}")
+        if hasil.penjelasan:
+            # Bar Plotly dari payload: tanpa figur matplotlib per permintaan (lihat jantung/render.py)
+            with ukur_tahap('predict', 'lime_render'): st.plotly_chart(get_figur_penjelasan(hasil.penjelasan, f"{T['lime_plot_title_prefix']} {T['class_disease']}"), use_container_width=True)
+    st.divider()
+    tampilkan_whatif(T, model, versi_model, pasien)
+
+def figur_band_unggah(per_band, T):
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Bar(
+        x=[T['risk_key_low_title'], T['risk_key_medium_title'], T['risk_key_high_title']], y=list(per_band.values()),
+        marker_color=['#28a745', '#ffc107', '#FF4B4B'], text=list(per_band.values()), textposition='auto'))
+    fig.update_layout(title_text=T['upload_chart_title'], yaxis_title=T['upload_patients'], height=300, margin=dict(l=10, r=10, t=40, b=10))
+    return fig
+
+# Skoring file unggahan per chunk (jantung/batch.py): hasil langsung ditulis ke file sementara, yang disimpan di sesi
+# hanya hitungan per band. Tombol batal memicu rerun yang menghentikan loop pada panggilan st.* berikutnya; pekerjaan
+# yang terhenti tetap di session_state sehingga baris yang sudah diskor masih bisa diunduh
+def tampilkan_unggah(T, model, versi_model):
+    from jantung.batch import SkoringUnggah
+    from jantung.schema import FITUR
+    st.info(T['upload_desc'].format(kolom=", ".join(f"`{kolom}`" for kolom in FITUR)))
+    berkas = st.file_uploader(T['upload_label'], type=['csv', 'parquet', 'pq'], key='unggah_berkas')
+    if berkas is None: return
+    mulai = st.button(T['upload_start'], type="primary", use_container_width=True)
+    wadah_progres, wadah_batal, wadah_grafik = st.empty(), st.empty(), st.empty()
+    digambar = {'rows': None}
+    def gambar(pekerjaan):
+        # Figur dengan isi identik dua kali dalam satu run ditolak Streamlit (ID elemen ganda), jadi hanya saat ada baris baru
+        stat = pekerjaan.stat
+        wadah_progres.progress(1.0 if pekerjaan.selesai else stat.fraction or 0.0, text=T['upload_progress'].format(rows=stat.rows, rate=stat.rows_per_second if stat.seconds else 0))
+        if digambar['rows'] != stat.rows: wadah_grafik.plotly_chart(figur_band_unggah(pekerjaan.per_band, T), use_container_width=True)
+        digambar['rows'] = stat.rows
+    pekerjaan = st.session_state.get('skoring_unggah')
+    if mulai:
+        pekerjaan = st.session_state.skoring_unggah = SkoringUnggah(berkas.name, versi_model)
+        wadah_batal.button(T['upload_cancel'], key='unggah_batal')
+        terakhir = 0.0
+        try:
+            with ukur_tahap('predict', 'upload'):
+                for _ in pekerjaan.jalankan(model, berkas):
+                    if time.perf_counter() - terakhir >= 0.25: gambar(pekerjaan); terakhir = time.perf_counter()
+        except ValueError as exc:
+            del st.session_state.skoring_unggah
+            wadah_batal.empty(); wadah_progres.empty(); wadah_grafik.empty()
+            st.error(T['upload_error'].format(error=exc))
+            return
+        wadah_batal.empty()
+    if pekerjaan is None or pekerjaan.nama != berkas.name or pekerjaan.versi_model != versi_model: return
+    gambar(pekerjaan)
+    if pekerjaan.selesai: st.success(T['upload_done'].format(rows=pekerjaan.stat.rows, seconds=pekerjaan.stat.seconds))
+    else: st.warning(T['upload_cancelled'].format(rows=pekerjaan.stat.rows))
+    if pekerjaan.stat.invalid: st.warning(T['upload_invalid'].format(n=pekerjaan.stat.invalid))
+    # File hasil baru dibaca saat tombol diklik (data callable), bukan di setiap rerun
+    st.download_button(T['upload_download'], data=pekerjaan.baca_output, file_name=pekerjaan.nama_output, mime="text/csv", on_click="ignore", use_container_width=True)
 
 def tampilkan_halaman_about(T):
     # ... (fungsi ini tidak berubah)
@@ -629,28 +847,30 @@ def tampilkan_halaman_about(T):
 # 3. FUNGSI UTAMA (MAIN) UNTUK MENJALANKAN APLIKASI
 # ==============================================================================
 
+def render_halaman(T, halaman):
+    # Sumber daya model hanya dimuat oleh halaman yang membutuhkannya
+    if halaman == 'home':
+        with sewa_sumber_daya() as (model, explainer, preprocessor, df, versi_model, berjalan), ukur_tahap('home', 'total'):
+            tampilkan_halaman_home(T, df, model, versi_model, berjalan)
+    elif halaman == 'predict':
+        with sewa_sumber_daya() as (model, explainer, preprocessor, df, versi_model, _), ukur_tahap('predict', 'total'):
+            tampilkan_halaman_prediksi(T, model, explainer, preprocessor, versi_model, df)
+    elif halaman == 'about':
+        tampilkan_halaman_about(T)
+
 def main():
+    siapkan_metrik()
     atur_gaya()
     if 'lang' not in st.session_state: st.session_state.lang = 'id'
     
     T = TRANSLATIONS.get(st.session_state.lang, TRANSLATIONS['id'])
-    model, explainer, preprocessor, df = setup_resources()
     selected_page = atur_navigasi(T)
     
     tampilkan_header_banner(T)
 
-    # <<< UBAH PANGGILAN FUNGSI DI BAWAH INI >>>
-    if selected_page == T['nav_home']:
-        # Teruskan 'model' ke fungsi halaman home
-        tampilkan_halaman_home(T, df, model)
-    elif selected_page == T['nav_predict']:
-        
-        tampilkan_halaman_prediksi(T, model, explainer, preprocessor)
-        # Teruskan 'model', 'explainer', dan 'preprocessor' ke fungsi
-        # ... (tidak ada perubahan di sini)
-    elif selected_page == T['nav_about']:
-        tampilkan_halaman_about(T)
-        # ... (tidak ada perubahan di sini)
+    halaman = {T['nav_home']: 'home', T['nav_predict']: 'predict', T['nav_about']: 'about'}.get(selected_page)
+    render_halaman(T, halaman)
+    panaskan_latar()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
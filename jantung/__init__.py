@@ -0,0 +1,5 @@
+# jantung/__init__.py
+#
+# Modul pendukung untuk app.py: skoring batch, artefak model, dan mesin
+# penjelasan. Semua modul di sini bebas dari Streamlit agar bisa dipakai
+# oleh CLI, job malam, maupun worker lain.
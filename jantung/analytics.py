@@ -0,0 +1,166 @@
+# jantung/analytics.py
+#
+# Lapisan analitik untuk halaman Home. Agregasi pandas (jumlah kelas,
+# histogram, statistik box plot, matriks korelasi, feature importance) dihitung
+# sekali per dataset, lalu figur Plotly dibangun dari agregat itu
+# per bahasa. Agregat dibaca dari agregat berjalan store kolumnar
+# (jantung/store.py), jadi biayanya tidak tumbuh dengan ukuran dataset.
+# Heatmap korelasi dirender sekali menjadi PNG statis. app.py
+# menyimpan hasilnya di cache per (hash dataset, versi model, bahasa), sehingga
+# rerun halaman Home tidak melakukan agregasi pandas sama sekali.
+
+import io
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+
+WARNA_SAKIT = '#FF4B4B'
+WARNA_SEHAT = '#1E88E5'
+N_BINS_USIA = 30
+
+
+def _kuantil_hitungan(nilai, kumulatif, q):
+    # Sama dengan np.percentile (interpolasi linear) pada data yang diringkas sebagai hitungan nilai
+    posisi = q * (kumulatif[-1] - 1)
+    bawah, atas = int(np.floor(posisi)), int(np.ceil(posisi))
+    v_bawah = nilai[np.searchsorted(kumulatif, bawah, side='right')]
+    v_atas = nilai[np.searchsorted(kumulatif, atas, side='right')]
+    return v_bawah + (v_atas - v_bawah) * (posisi - bawah)
+
+
+def _statistik_box(hitungan):
+    # Statistik yang sama dengan box plot Plotly: kuartil dan pagar 1.5 IQR
+    nilai = np.asarray(sorted(hitungan), dtype=np.float64)
+    jumlah = np.asarray([hitungan[v] for v in sorted(hitungan)])
+    kumulatif = np.cumsum(jumlah)
+    q1, median, q3 = (_kuantil_hitungan(nilai, kumulatif, q) for q in (0.25, 0.5, 0.75))
+    iqr = q3 - q1
+    dalam = nilai[(nilai >= q1 - 1.5 * iqr) & (nilai <= q3 + 1.5 * iqr)]
+    return {
+        'q1': float(q1), 'median': float(median), 'q3': float(q3),
+        'lowerfence': float(dalam.min()), 'upperfence': float(dalam.max()),
+        'mean': float((nilai * jumlah).sum() / kumulatif[-1]),
+    }
+
+
+def _histogram_hitungan(hitungan, edges):
+    nilai = np.asarray(list(hitungan), dtype=np.float64)
+    return np.histogram(nilai, bins=edges, weights=list(hitungan.values()))[0].astype(np.int64)
+
+
+def hitung_agregat(df, model=None, berjalan=None):
+    """Semua agregat yang dibutuhkan halaman Home, dalam bentuk dict kecil.
+
+    Dihitung dari agregat berjalan store (jantung/store.py) tanpa memindai
+    baris; jika `berjalan` tidak diberikan, dipakai df.attrs['agregat'] atau
+    agregat yang dihitung dari df.
+    """
+    from jantung.store import KOLOM_NUMERIK, AgregatBerjalan
+
+    if berjalan is None:
+        berjalan = df.attrs.get('agregat') or AgregatBerjalan.dari_df(df)
+    usia = {kelas: berjalan.hitungan[kelas]['Age'] for kelas in ('sakit', 'sehat')}
+    semua_usia = sorted(set(usia['sakit']) | set(usia['sehat']))
+    edges = np.histogram_bin_edges(semua_usia, bins=N_BINS_USIA)
+    kolesterol = {kelas: berjalan.hitungan[kelas]['Cholesterol'] for kelas in ('sakit', 'sehat')}
+    sex = {kelas: berjalan.kategori[kelas]['Sex'] for kelas in ('sakit', 'sehat')}
+    semua_sex = sorted(set(sex['sakit']) | set(sex['sehat']))
+
+    agregat = {
+        'n_rows': int(berjalan.n),
+        'n_features': int(df.shape[1] - 1),
+        'n_sakit': int(berjalan.per_kelas['sakit']),
+        'n_sehat': int(berjalan.per_kelas['sehat']),
+        'usia_edges': edges,
+        'usia_hist': {kelas: _histogram_hitungan(usia[kelas], edges) for kelas in usia},
+        'usia_box': {kelas: _statistik_box(usia[kelas]) for kelas in usia},
+        'kolesterol_box': {kelas: _statistik_box(kolesterol[kelas]) for kelas in kolesterol},
+        'sex_counts': {kelas: {s: int(sex[kelas].get(s, 0)) for s in semua_sex} for kelas in sex},
+        'corr_cols': list(KOLOM_NUMERIK),
+        'corr': berjalan.korelasi(),
+        'importance': None,
+    }
+    if model is not None and hasattr(model.named_steps['classifier'], 'feature_importances_'):
+        importances = model.named_steps['classifier'].feature_importances_
+        feature_names = model.named_steps['preprocessor'].get_feature_names_out()
+        urutan = np.argsort(importances)[::-1]
+        agregat['importance'] = {
+            'feature': [str(feature_names[i]) for i in urutan],
+            'importance': [float(importances[i]) for i in urutan],
+        }
+    return agregat
+
+
+def _box_precomputed(stat, nama, warna, orientasi='v'):
+    posisi = {'x': [nama]} if orientasi == 'v' else {'y': [nama]}
+    return go.Box(name=nama, marker_color=warna, orientation=orientasi, boxmean=False,
+                  q1=[stat['q1']], median=[stat['median']], q3=[stat['q3']],
+                  lowerfence=[stat['lowerfence']], upperfence=[stat['upperfence']],
+                  legendgroup=nama, showlegend=orientasi == 'v', **posisi)
+
+
+def figur_home(agregat, T):
+    """Figur Plotly untuk tab-tab Home, dibangun dari agregat saja.
+
+    Dikembalikan sebagai objek go.Figure, bukan dict: st.plotly_chart
+    memvalidasi ulang spesifikasi dict (termasuk template) di setiap rerun,
+    sedangkan Figure cukup disalin.
+    """
+    label_sakit, label_sehat = T['class_disease'], T['class_healthy']
+    kelas = (('sakit', label_sakit, WARNA_SAKIT), ('sehat', label_sehat, WARNA_SEHAT))
+    figur = {}
+
+    figur['pie'] = go.Figure(go.Pie(
+        labels=[label_sakit, label_sehat], values=[agregat['n_sakit'], agregat['n_sehat']],
+        marker={'colors': [WARNA_SAKIT, WARNA_SEHAT]}, sort=False))
+    figur['pie'].update_layout(title_text=T['target_dist_pie_title'])
+
+    edges = agregat['usia_edges']
+    pusat, lebar = (edges[:-1] + edges[1:]) / 2, np.diff(edges)
+    fig_hist = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8], vertical_spacing=0.02)
+    for kunci, nama, warna in kelas:
+        fig_hist.add_trace(_box_precomputed(agregat['usia_box'][kunci], nama, warna, orientasi='h'), row=1, col=1)
+        fig_hist.add_trace(go.Bar(x=pusat, y=agregat['usia_hist'][kunci], width=lebar, name=nama,
+                                  marker_color=warna, legendgroup=nama), row=2, col=1)
+    fig_hist.update_layout(title_text=T['age_dist_hist_title'], barmode='relative', bargap=0)
+    fig_hist.update_xaxes(title_text='Age', row=2, col=1)
+    fig_hist.update_yaxes(showticklabels=False, row=1, col=1)
+    figur['age_hist'] = fig_hist
+
+    figur['chol_box'] = go.Figure([_box_precomputed(agregat['kolesterol_box'][kunci], nama, warna)
+                                   for kunci, nama, warna in kelas])
+    figur['chol_box'].update_layout(title_text=T['chol_vs_disease_title'], yaxis_title='Cholesterol')
+
+    figur['sex_bar'] = go.Figure([go.Bar(x=list(agregat['sex_counts'][kunci].keys()),
+                                         y=list(agregat['sex_counts'][kunci].values()),
+                                         name=nama, marker_color=warna)
+                                  for kunci, nama, warna in kelas])
+    figur['sex_bar'].update_layout(title_text=T['sex_vs_disease_title'], barmode='group', xaxis_title='Sex')
+
+    if agregat['importance'] is not None:
+        imp = agregat['importance']
+        figur['importance'] = go.Figure(go.Bar(x=imp['importance'], y=imp['feature'], orientation='h'))
+        figur['importance'].update_layout(
+            title_text=T['feature_importance_chart_title'],
+            xaxis_title=T['feature_importance_xaxis'], yaxis_title=T['feature_importance_yaxis'],
+            yaxis={'categoryorder': 'total ascending'})
+
+    return figur
+
+
+def render_heatmap_png(agregat, judul):
+    """Render heatmap korelasi sekali menjadi PNG (bytes); figur matplotlib langsung ditutup."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    fig, ax = plt.subplots(figsize=(10, 8))
+    try:
+        sns.heatmap(agregat['corr'], annot=True, fmt=".2f", cmap="coolwarm", ax=ax, annot_kws={"size": 8},
+                    xticklabels=agregat['corr_cols'], yticklabels=agregat['corr_cols'])
+        ax.set_title(judul, fontsize=16)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', bbox_inches='tight', dpi=100)
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
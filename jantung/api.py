@@ -0,0 +1,165 @@
+# jantung/api.py
+#
+# Layanan REST (ASGI, Starlette) di samping UI Streamlit, untuk integrasi EHR.
+# Model dimuat dengan jantung.resources.muat_sumber_daya(), sama seperti
+# sewa_sumber_daya() di app.py, lewat PengelolaModel (jantung/registry.py) agar
+# model aktif bisa ditukar tanpa restart worker.
+#
+#   uvicorn jantung.api:app --host 0.0.0.0 --port 8000 --workers 2
+#
+# Endpoint:
+#   GET  /health
+#   POST /predict         satu pasien (11 fitur form prediksi)
+#   POST /predict/batch   {"patients": [...]}, diskor dengan satu predict_proba
+#   POST /explain         satu pasien + kontribusi fitur (HEART_API_EXPLAIN=0 mematikan)
+#
+# Prediksi dan penjelasan berjalan di dua thread pool terpisah, sehingga
+# penjelasan yang mahal tidak mengantre di depan panggilan probabilitas cepat.
+# Permintaan /predict yang datang bersamaan digabung oleh MicroBatcher
+# (jantung/batcher.py) menjadi satu predict_proba; metriknya ada di /health.
+
+import asyncio
+import contextlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from jantung.batcher import MicroBatcher
+from jantung.registry import PengelolaModel
+from jantung.render import payload_penjelasan
+from jantung.schema import FITUR, band_risiko, validasi_pasien
+
+PREDICT_WORKERS = int(os.environ.get('HEART_API_PREDICT_WORKERS', 4))
+EXPLAIN_WORKERS = int(os.environ.get('HEART_API_EXPLAIN_WORKERS', 2))
+EXPLAIN_ENABLED = os.environ.get('HEART_API_EXPLAIN', '1') != '0'
+MAX_BATCH = int(os.environ.get('HEART_API_MAX_BATCH', 10_000))
+
+
+class LayananPrediksi:
+    """Logika prediksi tanpa HTTP; dipanggil dari pool worker."""
+
+    def __init__(self, pengelola):
+        self.pengelola = pengelola
+
+    def prediksi(self, pasien_list):
+        input_data = pd.DataFrame(pasien_list, columns=FITUR)
+        with self.pengelola.sewa() as sd:
+            prob_sakit = sd.model.predict_proba(input_data)[:, 1]
+            versi = sd.versi_model
+        return [{'prob_sakit': float(p), 'risk_band': str(b), 'model_version': versi}
+                for p, b in zip(prob_sakit, band_risiko(prob_sakit))]
+
+    def jelaskan(self, pasien):
+        input_data = pd.DataFrame([pasien], columns=FITUR)
+        with self.pengelola.sewa() as sd:
+            prob_sakit = float(sd.model.predict_proba(input_data)[0, 1])
+            input_processed = sd.preprocessor.transform(input_data)
+            explanation = sd.explainer.explain(input_processed[0], num_features=len(FITUR), label=1)
+            versi, mode = sd.versi_model, sd.explainer.mode
+        return {
+            'prob_sakit': prob_sakit,
+            'risk_band': band_risiko(prob_sakit),
+            'model_version': versi,
+            'explain_mode': mode,
+            'explanation': payload_penjelasan(explanation, label=1),
+        }
+
+
+def _galat(status, pesan):
+    return JSONResponse({'error': pesan}, status_code=status)
+
+
+async def _baca_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        raise ValueError("Body harus berupa JSON yang valid")
+
+
+async def _jalankan(request, pool, fungsi, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(request.app.state.pools[pool], fungsi, *args)
+
+
+async def health(request):
+    pengelola = request.app.state.layanan.pengelola
+    pengelola.sinkron()
+    sd = pengelola.aktif
+    return JSONResponse({'status': 'ok', 'model_version': sd.versi_model, 'explain_mode': sd.explainer.mode,
+                         'models': pengelola.status(), 'batcher': request.app.state.batcher.metrics()})
+
+
+async def predict(request):
+    try:
+        pasien = validasi_pasien(await _baca_json(request))
+    except ValueError as exc:
+        return _galat(422, str(exc))
+    hasil = await asyncio.wrap_future(request.app.state.batcher.submit(pasien))
+    return JSONResponse(hasil)
+
+
+async def predict_batch(request):
+    try:
+        body = await _baca_json(request)
+        pasien_list = body.get('patients') if isinstance(body, dict) else None
+        if not isinstance(pasien_list, list) or not pasien_list:
+            raise ValueError("Body harus berisi 'patients' berupa list tidak kosong")
+        if len(pasien_list) > MAX_BATCH:
+            raise ValueError(f"Maksimal {MAX_BATCH} pasien per permintaan")
+        bersih, kesalahan = [], []
+        for idx, pasien in enumerate(pasien_list):
+            try:
+                bersih.append(validasi_pasien(pasien))
+            except ValueError as exc:
+                kesalahan.append(f"patients[{idx}]: {exc}")
+        if kesalahan:
+            raise ValueError(" | ".join(kesalahan))
+    except ValueError as exc:
+        return _galat(422, str(exc))
+    hasil = await _jalankan(request, 'predict', request.app.state.layanan.prediksi, bersih)
+    return JSONResponse({'results': hasil})
+
+
+async def explain(request):
+    if not EXPLAIN_ENABLED:
+        return _galat(404, "Endpoint /explain dinonaktifkan")
+    try:
+        pasien = validasi_pasien(await _baca_json(request))
+    except ValueError as exc:
+        return _galat(422, str(exc))
+    hasil = await _jalankan(request, 'explain', request.app.state.layanan.jelaskan, pasien)
+    return JSONResponse(hasil)
+
+
+def buat_app(sumber_daya=None):
+    """Bangun aplikasi ASGI; `sumber_daya` bisa diberikan untuk menghindari pemuatan ulang."""
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        app.state.layanan = LayananPrediksi(PengelolaModel(sumber_daya))
+        app.state.batcher = MicroBatcher(app.state.layanan.prediksi)
+        app.state.pools = {
+            'predict': ThreadPoolExecutor(PREDICT_WORKERS, thread_name_prefix='predict'),
+            'explain': ThreadPoolExecutor(EXPLAIN_WORKERS, thread_name_prefix='explain'),
+        }
+        try:
+            yield
+        finally:
+            for pool in app.state.pools.values():
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    return Starlette(
+        routes=[
+            Route('/health', health, methods=['GET']),
+            Route('/predict', predict, methods=['POST']),
+            Route('/predict/batch', predict_batch, methods=['POST']),
+            Route('/explain', explain, methods=['POST']),
+        ],
+        lifespan=lifespan,
+    )
+
+
+app = buat_app()
@@ -0,0 +1,172 @@
+# jantung/artifacts.py
+#
+# Bundle artefak siap pakai untuk app.py: pipeline terlatih, matriks latih yang
+# sudah ditransformasi (untuk LIME), nama fitur, dan indeks persentil populasi
+# (jantung/percentile.py). Dibangun sekali lewat:
+#
+#   python -m jantung.artifacts
+#
+# lalu dimuat oleh jantung/resources.py (lewat PengelolaModel) tanpa train_test_split maupun fit ulang.
+# Matriks latih disimpan sebagai .npy dan dibuka dengan mmap, sehingga beberapa
+# worker di node yang sama berbagi page yang sama dari page cache.
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.model_selection import train_test_split
+
+from jantung.schema import DATA_PATH, MODEL_PATH, ROOT_DIR, TARGET
+
+FORMAT_VERSION = 1
+BUNDLE_DIR = ROOT_DIR / "artifacts"
+CLASS_NAMES = ['No Disease', 'Disease']
+
+_PIPELINE_FILE = "pipeline.joblib"
+_TRAIN_FILE = "X_train_processed.npy"
+_MANIFEST_FILE = "manifest.json"
+_CURRENT_FILE = "CURRENT"
+
+
+@dataclass
+class ArtefakBundle:
+    path: Path
+    model: object
+    X_train_processed: np.ndarray
+    feature_names: list
+    class_names: list
+    manifest: dict = field(default_factory=dict)
+
+    @property
+    def version(self):
+        return self.manifest.get('version')
+
+    @property
+    def preprocessor(self):
+        return self.model.named_steps['preprocessor']
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for blok in iter(lambda: f.read(1 << 20), b''):
+            h.update(blok)
+    return h.hexdigest()
+
+
+def split_data(df):
+    # Split yang sama persis dengan proses pelatihan model (stratified, random_state=42)
+    X = df.drop(TARGET, axis=1)
+    y = df[TARGET]
+    return train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+
+def build_bundle(model_path=MODEL_PATH, data_path=DATA_PATH, out_dir=BUNDLE_DIR, aktifkan=True):
+    """Bangun bundle artefak baru (dan jadikan versi aktif jika `aktifkan`). Mengembalikan path-nya."""
+    model_sha = sha256_file(model_path)
+    data_sha = sha256_file(data_path)
+    version = f"v{FORMAT_VERSION}-{model_sha[:8]}-{data_sha[:8]}"
+    bundle_path = Path(out_dir) / version
+    if (bundle_path / _MANIFEST_FILE).exists():
+        # Versi ditentukan oleh hash model + data, jadi bundle yang sudah ada dipakai ulang
+        if aktifkan:
+            aktifkan_versi(version, out_dir)
+        return bundle_path
+
+    from jantung.percentile import bangun_indeks
+
+    model = joblib.load(model_path)
+    df = pd.read_csv(data_path)
+    X_train, _, _, _ = split_data(df)
+    preprocessor = model.named_steps['preprocessor']
+    # Hanya transform: preprocessor sudah di-fit saat pelatihan dan tidak boleh diubah
+    X_train_processed = np.ascontiguousarray(preprocessor.transform(X_train), dtype=np.float64)
+    feature_names = [str(nama) for nama in preprocessor.get_feature_names_out()]
+
+    bundle_path.mkdir(parents=True, exist_ok=True)
+    joblib.dump(model, bundle_path / _PIPELINE_FILE)
+    np.save(bundle_path / _TRAIN_FILE, X_train_processed)
+    # Indeks persentil populasi (K-fold fit ulang) dihitung di sini, bukan di permintaan pertama app
+    bangun_indeks(bundle_path, model, df)
+    manifest = {
+        'format': FORMAT_VERSION,
+        'version': version,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'model_file': Path(model_path).name,
+        'model_sha256': model_sha,
+        'data_file': Path(data_path).name,
+        'data_sha256': data_sha,
+        'sklearn_version': sklearn.__version__,
+        'feature_names': feature_names,
+        'class_names': CLASS_NAMES,
+        'n_train': int(X_train_processed.shape[0]),
+    }
+    with open(bundle_path / _MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    # Penunjuk versi aktif ditulis terakhir agar pembaca tidak melihat bundle setengah jadi
+    if aktifkan:
+        aktifkan_versi(version, out_dir)
+    return bundle_path
+
+
+def aktifkan_versi(version, out_dir=BUNDLE_DIR):
+    """Ganti penunjuk CURRENT secara atomik (rename); bundle `version` harus sudah ada."""
+    if not (Path(out_dir) / version / _MANIFEST_FILE).exists():
+        raise FileNotFoundError(f"Bundle {version} tidak ada di {out_dir}")
+    current_tmp = Path(out_dir) / (_CURRENT_FILE + ".tmp")
+    current_tmp.write_text(version + "\n", encoding='utf-8')
+    current_tmp.replace(Path(out_dir) / _CURRENT_FILE)
+
+
+def current_version(out_dir=BUNDLE_DIR):
+    current = Path(out_dir) / _CURRENT_FILE
+    if not current.exists():
+        raise FileNotFoundError(f"Bundle artefak belum dibangun: {current} tidak ada")
+    return current.read_text(encoding='utf-8').strip()
+
+
+def load_bundle(out_dir=BUNDLE_DIR, version=None, mmap=True):
+    """Muat bundle (default: versi aktif). Matriks latih dibuka read-only via mmap."""
+    bundle_path = Path(out_dir) / (version or current_version(out_dir))
+    with open(bundle_path / _MANIFEST_FILE, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_VERSION:
+        raise ValueError(f"Format bundle {manifest.get('format')} tidak didukung (butuh {FORMAT_VERSION})")
+    model = joblib.load(bundle_path / _PIPELINE_FILE)
+    X_train_processed = np.load(bundle_path / _TRAIN_FILE, mmap_mode='r' if mmap else None)
+    return ArtefakBundle(path=bundle_path, model=model, X_train_processed=X_train_processed,
+                         feature_names=manifest['feature_names'], class_names=manifest['class_names'],
+                         manifest=manifest)
+
+
+def buat_explainer(bundle):
+    import lime.lime_tabular
+    return lime.lime_tabular.LimeTabularExplainer(
+        training_data=bundle.X_train_processed,
+        feature_names=bundle.feature_names,
+        class_names=bundle.class_names,
+        mode='classification'
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bangun bundle artefak model + explainer.")
+    parser.add_argument('--model', default=str(MODEL_PATH), help="Path pipeline .pkl sumber")
+    parser.add_argument('--data', default=str(DATA_PATH), help="Path dataset CSV")
+    parser.add_argument('--out', default=str(BUNDLE_DIR), help="Direktori bundle")
+    args = parser.parse_args(argv)
+    bundle_path = build_bundle(args.model, args.data, args.out)
+    print(f"Bundle aktif: {bundle_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,260 @@
+# jantung/batch.py
+#
+# Skoring batch tanpa UI: file CSV/Parquet dibaca per chunk, tiap chunk diskor
+# dengan satu panggilan predict_proba, lalu langsung ditulis ke file output.
+# Memori tetap datar karena hanya satu chunk yang ada di memori pada satu waktu.
+# Halaman prediksi app.py memakai skor_bertahap() yang sama untuk file unggahan
+# (SkoringUnggah): progres per chunk, hitungan band berjalan, output ke file
+# sementara yang bisa diunduh, dan bisa dihentikan di tengah jalan.
+#
+# Contoh:
+#   python -m jantung.batch skrining.csv hasil.csv --chunksize 20000
+#   python -m jantung.batch skrining.csv hasil.csv --explain   # + kolom shap__*
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from jantung.schema import BAND_RISIKO, FITUR, MODEL_PATH, band_risiko, cek_kolom, validasi_baris
+from jantung.treeshap import TreeShap
+
+CHUNKSIZE_DEFAULT = 10_000
+CHUNKSIZE_UNGGAH = 2_000       # chunk lebih kecil untuk UI: progres & tombol batal lebih responsif
+
+
+@dataclass
+class StatistikBatch:
+    rows: int
+    seconds: float
+    invalid: int = 0           # baris yang ditolak validasi (hanya dengan validasi=True)
+    fraction: float = None     # perkiraan bagian input yang sudah dibaca (0-1); None jika tidak diketahui
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds > 0 else float('inf')
+
+
+def _is_parquet(path):
+    # `path` boleh berupa objek file (mis. UploadedFile Streamlit) yang punya atribut name
+    return Path(getattr(path, 'name', path)).suffix.lower() in ('.parquet', '.pq')
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError("Dukungan Parquet membutuhkan paket 'pyarrow'.") from exc
+    return pyarrow
+
+
+def baca_bertahap(path, chunksize=CHUNKSIZE_DEFAULT):
+    """Iterasi DataFrame per chunk dari file CSV atau Parquet (path atau objek file biner)."""
+    if _is_parquet(path):
+        pa = _import_pyarrow()
+        parquet_file = pa.parquet.ParquetFile(path)
+        for record_batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield record_batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def skor_chunk(model, chunk, tree_shap=None, validasi=False):
+    """Tambahkan kolom 'prob_sakit' dan 'risk_band' ke satu chunk.
+
+    Jika `tree_shap` diberikan, kontribusi TreeSHAP per fitur (hasil
+    preprocessor) ikut ditulis sebagai kolom 'shap__<nama fitur>'.
+    Dengan `validasi=True` setiap baris diperiksa dulu (validasi_baris):
+    baris yang tidak valid tidak diskor (prob_sakit NaN, risk_band kosong)
+    dan alasannya ditulis di kolom 'error', sehingga satu baris rusak tidak
+    menggagalkan seluruh file.
+    """
+    if validasi:
+        fitur, kesalahan = validasi_baris(chunk)
+        valid = (kesalahan == '').to_numpy()
+        fitur = fitur[valid]
+    else:
+        cek_kolom(chunk)
+        fitur, valid = chunk[FITUR], np.ones(len(chunk), dtype=bool)
+    prob_sakit = np.full(len(chunk), np.nan)
+    if len(fitur):
+        prob_sakit[valid] = model.predict_proba(fitur)[:, 1]
+    hasil = chunk.copy()
+    hasil['prob_sakit'] = prob_sakit
+    hasil['risk_band'] = np.where(valid, band_risiko(np.nan_to_num(prob_sakit)), '')
+    if validasi:
+        hasil['error'] = kesalahan
+    if tree_shap is not None:
+        preprocessor = model.named_steps['preprocessor']
+        nama_fitur = preprocessor.get_feature_names_out()
+        phi = np.full((len(chunk), len(nama_fitur)), np.nan)
+        if len(fitur):
+            phi[valid] = tree_shap.shap_values(preprocessor.transform(fitur))
+        for idx, nama in enumerate(nama_fitur):
+            hasil[f'shap__{nama}'] = phi[:, idx]
+    return hasil
+
+
+class _PenulisOutput:
+    # Penulis inkremental: CSV di-append per chunk, Parquet lewat ParquetWriter
+    def __init__(self, path):
+        self.path = Path(path)
+        self._parquet_writer = None
+        self._header_written = False
+
+    def tulis(self, df):
+        if _is_parquet(self.path):
+            pa = _import_pyarrow()
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pa.parquet.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode='a' if self._header_written else 'w',
+                      header=not self._header_written, index=False)
+            self._header_written = True
+
+    def tutup(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def _pengukur_progres(sumber):
+    # Fraksi input yang sudah dibaca: baris/total untuk Parquet (metadata), posisi baca/ukuran untuk
+    # objek file CSV. Path CSV dibuka sendiri oleh pandas, jadi progresnya tidak diketahui (None).
+    if _is_parquet(sumber):
+        total = _import_pyarrow().parquet.ParquetFile(sumber).metadata.num_rows
+        return lambda rows: rows / total if total else 1.0
+    if hasattr(sumber, 'seek'):
+        ukuran = sumber.seek(0, os.SEEK_END)
+        sumber.seek(0)
+        return lambda rows: sumber.tell() / ukuran if ukuran else 1.0
+    return lambda rows: None
+
+
+def skor_bertahap(model, sumber, penulis, chunksize=CHUNKSIZE_DEFAULT, tree_shap=None, validasi=False):
+    """Skor `sumber` per chunk dan tulis lewat `penulis`; yield (chunk hasil, StatistikBatch) setelah tiap chunk.
+
+    Pemanggil boleh berhenti kapan saja (mis. dibatalkan pengguna): chunk yang
+    sudah di-yield sudah tertulis utuh. Menutup `penulis` tugas pemanggil.
+    """
+    fraksi = _pengukur_progres(sumber)
+    rows = invalid = 0
+    mulai = time.perf_counter()
+    for chunk in baca_bertahap(sumber, chunksize=chunksize):
+        hasil = skor_chunk(model, chunk, tree_shap=tree_shap, validasi=validasi)
+        penulis.tulis(hasil)
+        rows += len(chunk)
+        if validasi:
+            invalid += int((hasil['error'] != '').sum())
+        bagian = fraksi(rows)
+        yield hasil, StatistikBatch(rows, time.perf_counter() - mulai, invalid, None if bagian is None else min(bagian, 1.0))
+
+
+def skor_file(input_path, output_path, model=None, chunksize=CHUNKSIZE_DEFAULT, progress=None,
+              explain=False):
+    """Skor seluruh file input dan tulis hasilnya ke output_path.
+
+    `explain=True` menambahkan kolom TreeSHAP (hanya untuk model berbasis pohon).
+    `progress` opsional dipanggil dengan StatistikBatch setelah tiap chunk.
+    Mengembalikan StatistikBatch akhir (jumlah baris dan durasi).
+    """
+    if model is None:
+        model = joblib.load(MODEL_PATH)
+    tree_shap = TreeShap(model.named_steps['classifier']) if explain else None
+    penulis = _PenulisOutput(output_path)
+    rows = 0
+    mulai = time.perf_counter()
+    try:
+        for _, stat in skor_bertahap(model, input_path, penulis, chunksize=chunksize, tree_shap=tree_shap):
+            rows = stat.rows
+            if progress is not None:
+                progress(stat)
+    finally:
+        penulis.tutup()
+    return StatistikBatch(rows, time.perf_counter() - mulai)
+
+
+def _hapus_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class SkoringUnggah:
+    """Satu pekerjaan skoring file unggahan (halaman prediksi app.py).
+
+    Hasil ditulis per chunk ke file CSV sementara, bukan dikumpulkan di
+    memori; yang disimpan di objek ini hanya statistik dan hitungan per band
+    risiko. File sementara dihapus saat objek ini dibuang (pekerjaan baru
+    menggantikannya atau sesi Streamlit berakhir).
+    """
+
+    def __init__(self, nama, versi_model):
+        self.nama = nama
+        self.versi_model = versi_model
+        self.stat = StatistikBatch(0, 0.0)
+        self.per_band = dict.fromkeys(BAND_RISIKO.tolist(), 0)
+        self.selesai = False
+        fd, self.path = tempfile.mkstemp(prefix='heart-upload-', suffix='.csv')
+        os.close(fd)
+        self._hapus = weakref.finalize(self, _hapus_file, self.path)
+
+    @property
+    def nama_output(self):
+        return f"{Path(self.nama).stem}_skor.csv"
+
+    def jalankan(self, model, sumber, chunksize=CHUNKSIZE_UNGGAH):
+        """Generator: skor `sumber` (dengan validasi baris) dan yield self setelah tiap chunk."""
+        penulis = _PenulisOutput(self.path)
+        try:
+            for hasil, self.stat in skor_bertahap(model, sumber, penulis, chunksize=chunksize, validasi=True):
+                for band, n in hasil['risk_band'].value_counts().items():
+                    if band in self.per_band:
+                        self.per_band[band] += int(n)
+                yield self
+            self.selesai = True
+        finally:
+            penulis.tutup()
+
+    def baca_output(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Skoring batch risiko penyakit jantung (CSV/Parquet).")
+    parser.add_argument('input', help="File input .csv atau .parquet")
+    parser.add_argument('output', help="File output .csv atau .parquet")
+    parser.add_argument('--model', default=str(MODEL_PATH), help="Path pipeline .pkl")
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE_DEFAULT, help="Jumlah baris per chunk")
+    parser.add_argument('--explain', action='store_true', help="Tambahkan kolom kontribusi TreeSHAP per fitur")
+    parser.add_argument('--quiet', action='store_true', help="Jangan tampilkan progres per chunk")
+    args = parser.parse_args(argv)
+
+    model = joblib.load(args.model)
+
+    def lapor(stat):
+        print(f"\r{stat.rows:,} baris | {stat.rows_per_second:,.0f} baris/detik", end='', file=sys.stderr)
+
+    stat = skor_file(args.input, args.output, model=model, chunksize=args.chunksize,
+                     progress=None if args.quiet else lapor, explain=args.explain)
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"Selesai: {stat.rows:,} baris dalam {stat.seconds:.2f} detik "
+          f"({stat.rows_per_second:,.0f} baris/detik) -> {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,160 @@
+# jantung/batcher.py
+#
+# Micro-batching untuk permintaan prediksi satu pasien yang datang bersamaan.
+# Permintaan dikumpulkan paling lama `max_wait_ms` (atau sampai `max_batch_size`
+# terisi), ditumpuk menjadi satu DataFrame, diskor dengan satu predict_proba,
+# lalu hasilnya dikembalikan ke masing-masing pemanggil lewat Future.
+#
+# Dipakai oleh halaman prediksi (app.py) dan endpoint /predict (jantung/api.py).
+# Metrik ukuran batch dan waktu antre tersedia lewat metrics() untuk menyetel
+# trade-off throughput vs latensi.
+#
+#   HEART_BATCH_MAX_SIZE     ukuran batch maksimum (default 64)
+#   HEART_BATCH_MAX_WAIT_MS  waktu kumpul maksimum dalam ms (default 5)
+#   HEART_BATCH_TIMEOUT      batas tunggu hasil batcher(item) dalam detik (default 30)
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError
+
+import numpy as np
+
+MAX_BATCH_SIZE_DEFAULT = int(os.environ.get('HEART_BATCH_MAX_SIZE', 64))
+MAX_WAIT_MS_DEFAULT = float(os.environ.get('HEART_BATCH_MAX_WAIT_MS', 5))
+TIMEOUT_DEFAULT = float(os.environ.get('HEART_BATCH_TIMEOUT', 30))
+
+# Jumlah sampel terakhir yang disimpan untuk menghitung persentil
+_JENDELA_METRIK = 2048
+
+# Penanda berhenti untuk thread latar (lihat close())
+_SELESAI = object()
+
+
+class MicroBatcher:
+    """Penggabung permintaan: submit(item) -> Future, diproses per batch di thread latar."""
+
+    def __init__(self, fungsi_batch, max_batch_size=MAX_BATCH_SIZE_DEFAULT,
+                 max_wait_ms=MAX_WAIT_MS_DEFAULT, nama='micro-batcher', timeout=TIMEOUT_DEFAULT):
+        # fungsi_batch menerima list item dan mengembalikan list hasil dengan urutan yang sama
+        self.fungsi_batch = fungsi_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.timeout = timeout
+        self._antrean = queue.Queue()
+        self._lock = threading.Lock()
+        self._tertutup = False
+        self._ukuran_batch = deque(maxlen=_JENDELA_METRIK)
+        self._waktu_antre = deque(maxlen=_JENDELA_METRIK)
+        self._total_batch = 0
+        self._total_item = 0
+        self._total_gagal = 0
+        self._thread = threading.Thread(target=self._loop, name=nama, daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """Antrekan item; RuntimeError jika batcher sudah ditutup (tidak akan pernah diproses)."""
+        future = Future()
+        # Di bawah lock yang sama dengan close(): tidak ada item yang masuk setelah penanda berhenti
+        with self._lock:
+            if self._tertutup:
+                raise RuntimeError("MicroBatcher sudah ditutup")
+            self._antrean.put((time.perf_counter(), item, future))
+        return future
+
+    def __call__(self, item, timeout=None):
+        """Hasil untuk satu item; TimeoutError setelah `timeout` (default self.timeout) detik."""
+        future = self.submit(item)
+        try:
+            return future.result(timeout=self.timeout if timeout is None else timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def close(self):
+        """Hentikan thread latar setelah item yang sudah mengantre selesai diproses."""
+        with self._lock:
+            if self._tertutup:
+                return
+            self._tertutup = True
+            self._antrean.put((None, _SELESAI, None))
+
+    def _kumpulkan(self):
+        # Blok sampai ada item pertama, lalu tunggu item lain sampai tenggat
+        batch = [self._antrean.get()]
+        tenggat = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size and batch[-1][1] is not _SELESAI:
+            sisa = tenggat - time.perf_counter()
+            try:
+                batch.append(self._antrean.get(timeout=sisa) if sisa > 0 else self._antrean.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        selesai = False
+        while not selesai:
+            batch = self._kumpulkan()
+            selesai = batch[-1][1] is _SELESAI
+            if selesai:
+                batch.pop()
+            mulai = time.perf_counter()
+            batch = [(masuk, item, future) for masuk, item, future in batch
+                     if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                hasil = list(self.fungsi_batch([item for _, item, _ in batch]))
+                if len(hasil) != len(batch):
+                    raise ValueError(f"fungsi_batch mengembalikan {len(hasil)} hasil untuk {len(batch)} item")
+            except Exception as exc:
+                for _, _, future in batch:
+                    future.set_exception(exc)
+                gagal = len(batch)
+            else:
+                for (_, _, future), nilai in zip(batch, hasil):
+                    future.set_result(nilai)
+                gagal = 0
+            with self._lock:
+                self._ukuran_batch.append(len(batch))
+                self._waktu_antre.extend(mulai - masuk for masuk, _, _ in batch)
+                self._total_batch += 1
+                self._total_item += len(batch)
+                self._total_gagal += gagal
+
+    def metrics(self):
+        """Ringkasan ukuran batch dan waktu antre (ms) dari jendela terakhir."""
+        with self._lock:
+            ukuran = np.array(self._ukuran_batch, dtype=float)
+            antre = np.array(self._waktu_antre, dtype=float) * 1000
+            ringkasan = {
+                'batches_total': self._total_batch,
+                'items_total': self._total_item,
+                'failed_total': self._total_gagal,
+                'queue_depth': self._antrean.qsize(),
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+            }
+        if ukuran.size:
+            ringkasan.update({
+                'batch_size_mean': float(ukuran.mean()),
+                'batch_size_max': int(ukuran.max()),
+                'queue_ms_p50': float(np.percentile(antre, 50)),
+                'queue_ms_p95': float(np.percentile(antre, 95)),
+                'queue_ms_max': float(antre.max()),
+            })
+        return ringkasan
+
+
+def buat_batcher_prediksi(model, **kwargs):
+    """MicroBatcher yang menerima dict pasien dan mengembalikan probabilitas sakit jantung."""
+    import pandas as pd
+
+    from jantung.schema import FITUR
+
+    def skor(pasien_list):
+        return model.predict_proba(pd.DataFrame(pasien_list, columns=FITUR))[:, 1].tolist()
+
+    return MicroBatcher(skor, **kwargs)
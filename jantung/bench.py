@@ -0,0 +1,251 @@
+# jantung/bench.py
+#
+# Suite benchmark jalur panas aplikasi, diukur pada heart.csv:
+#   load.*       joblib.load tiap model_pipeline_terbaik*.pkl
+#   predict.*    predict_proba satu baris dan per batch (mode pipeline, compiled & lookup)
+#   transform.*  preprocessor.transform satu baris dan per batch
+#   explain.*    penjelasan LIME pada beberapa jumlah sampel (+ mode fast/tree)
+#   memory.*     peak RSS proses worker (model + penjelasan) dan worker pool penjelasan
+#
+# Setiap metrik waktu berisi p50/p95/p99/mean dalam milidetik; memori dalam MB.
+# Hasil ditulis sebagai JSON dan bisa dibandingkan dengan baseline tersimpan:
+#
+#   python -m jantung.bench --output hasil.json
+#   python -m jantung.bench --baseline benchmarks/baseline.json --tolerance 0.2
+#   python -m jantung.bench --only predict transform explain.fast --quick
+#
+# Dengan --baseline, exit code 1 jika ada metrik yang lebih lambat (atau lebih
+# boros memori) dari baseline melebihi toleransi.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from jantung.schema import DATA_PATH, FITUR, ROOT_DIR
+
+BASELINE_PATH = ROOT_DIR / "benchmarks" / "baseline.json"
+UKURAN_BATCH = (1, 32, 256)
+SAMPEL_LIME = (500, 1000, 2000, 5000)
+
+
+def _statistik(durasi):
+    ms = np.asarray(durasi) * 1000
+    return {
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'mean_ms': float(ms.mean()),
+        'n': int(ms.size),
+    }
+
+
+def ukur(fungsi, repeat, warmup=1):
+    """Jalankan fungsi(i) `repeat` kali (setelah `warmup` kali) dan ringkas durasinya."""
+    for i in range(warmup):
+        fungsi(i)
+    durasi = []
+    for i in range(repeat):
+        mulai = time.perf_counter()
+        fungsi(i)
+        durasi.append(time.perf_counter() - mulai)
+    return _statistik(durasi)
+
+
+def bench_load(repeat):
+    import joblib
+
+    hasil = {}
+    for path in sorted(ROOT_DIR.glob('model_pipeline_terbaik*.pkl')):
+        hasil[f'load.{path.stem}'] = ukur(lambda i: joblib.load(path), repeat, warmup=1)
+    return hasil
+
+
+def _sampel_batch(df, ukuran, repeat):
+    rng = np.random.default_rng(0)
+    return [df.iloc[rng.integers(0, len(df), ukuran)] for _ in range(repeat)]
+
+
+def bench_predict_transform(pipeline, df, repeat):
+    from jantung.compiled import ModelTerkompilasi
+    from jantung.lookup import ModelTabel
+
+    model_per_mode = {'pipeline': pipeline}
+    for mode, kelas in (('compiled', ModelTerkompilasi), ('lookup', ModelTabel)):
+        try:
+            model_per_mode[mode] = kelas(pipeline)
+        except ValueError:
+            pass
+    hasil = {}
+    for ukuran in UKURAN_BATCH:
+        batch = _sampel_batch(df[FITUR], ukuran, repeat)
+        for mode, model in model_per_mode.items():
+            preprocessor = getattr(model, 'preprocessor', pipeline.named_steps['preprocessor'])
+            hasil[f'predict.{mode}.batch{ukuran}'] = ukur(lambda i: model.predict_proba(batch[i]), repeat)
+            hasil[f'transform.{mode}.batch{ukuran}'] = ukur(lambda i: preprocessor.transform(batch[i]), repeat)
+    return hasil
+
+
+def bench_explain(bundle, df, repeat):
+    from jantung.artifacts import buat_explainer
+    from jantung.explain import MODE_ACCURATE, MODE_FAST, MODE_TREE, MesinPenjelasan
+
+    classifier = bundle.model.named_steps['classifier']
+    mesin = MesinPenjelasan(buat_explainer(bundle), classifier)
+    rows = bundle.preprocessor.transform(_sampel_batch(df[FITUR], repeat + 1, 1)[0])
+    hasil = {}
+    for n in SAMPEL_LIME:
+        hasil[f'explain.accurate.samples{n}'] = ukur(
+            lambda i: mesin.explain(rows[i], mode=MODE_ACCURATE, num_samples=n), repeat)
+    hasil[f'explain.fast.samples{mesin.num_samples_fast}'] = ukur(
+        lambda i: mesin.explain(rows[i], mode=MODE_FAST), repeat)
+    if mesin.mode_efektif(MODE_TREE) == MODE_TREE:
+        hasil['explain.tree'] = ukur(lambda i: mesin.explain(rows[i], mode=MODE_TREE), repeat)
+    return hasil
+
+
+# Dijalankan di proses baru agar peak RSS mencerminkan satu worker aplikasi saja
+_SKRIP_MEMORI = """
+import json, resource, sys
+sys.path.insert(0, {root!r})
+from jantung.executor import EksekutorPenjelasan
+from jantung.resources import muat_sumber_daya
+from jantung.schema import FITUR
+
+sd = muat_sumber_daya()
+baris = sd.df[FITUR].iloc[[0]]
+sd.model.predict_proba(baris)
+row = sd.preprocessor.transform(baris)[0]
+sd.explainer.explain(row)
+worker = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+eksekutor = EksekutorPenjelasan(sd.explainer, sd.versi_model, processes=1)
+eksekutor.jelaskan(row, timeout=120)
+eksekutor.shutdown(wait=True)
+anak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+skala = 1024 * 1024 if sys.platform == 'darwin' else 1024
+print(json.dumps({{'worker_mb': worker / skala, 'explain_worker_mb': anak / skala}}))
+"""
+
+
+def bench_memory():
+    hasil = subprocess.run([sys.executable, '-c', _SKRIP_MEMORI.format(root=str(ROOT_DIR))],
+                           capture_output=True, text=True, cwd=ROOT_DIR)
+    if hasil.returncode != 0:
+        raise RuntimeError(f"Benchmark memori gagal:\n{hasil.stderr}")
+    rss = json.loads(hasil.stdout.strip().splitlines()[-1])
+    return {f'memory.{nama}': {'peak_mb': nilai} for nama, nilai in rss.items()}
+
+
+def _dipilih(nama, only):
+    return not only or any(nama.startswith(o) for o in only)
+
+
+def _tahap_dipilih(tahap, only):
+    # Tahap dijalankan jika ada prefix yang mencakupnya atau berada di dalamnya
+    return not only or any(tahap.startswith(o) or o.startswith(tahap) for o in only)
+
+
+def jalankan(only=None, repeat=200, repeat_explain=20, repeat_load=5):
+    """Jalankan suite (atau bagian yang cocok dengan prefix `only`); kembalikan dict hasil."""
+    import pandas as pd
+
+    from jantung.artifacts import load_bundle
+
+    hasil = {}
+    if _tahap_dipilih('load', only):
+        hasil.update(bench_load(repeat_load))
+    bundle = load_bundle()
+    df = pd.read_csv(DATA_PATH)
+    if _tahap_dipilih('predict', only) or _tahap_dipilih('transform', only):
+        hasil.update(bench_predict_transform(bundle.model, df, repeat))
+    if _tahap_dipilih('explain', only):
+        hasil.update(bench_explain(bundle, df, repeat_explain))
+    if _tahap_dipilih('memory', only):
+        hasil.update(bench_memory())
+    hasil = {nama: nilai for nama, nilai in hasil.items() if _dipilih(nama, only)}
+
+    import sklearn
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'model_version': bundle.version,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'sklearn': sklearn.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': hasil,
+    }
+
+
+def bandingkan(hasil, baseline, tolerance, statistik='p50_ms'):
+    """Daftar pesan regresi: metrik (p50 atau peak_mb) > baseline * (1 + tolerance)."""
+    regresi = []
+    acuan_semua = baseline.get('results', {})
+    for nama, nilai in hasil['results'].items():
+        acuan = acuan_semua.get(nama)
+        if acuan is None:
+            continue
+        kunci = 'peak_mb' if 'peak_mb' in nilai else statistik
+        if acuan.get(kunci) and nilai[kunci] > acuan[kunci] * (1 + tolerance):
+            regresi.append(f"{nama}.{kunci}: {nilai[kunci]:.3f} > baseline {acuan[kunci]:.3f} (+{tolerance:.0%})")
+    return regresi
+
+
+def _cetak(hasil, baseline=None):
+    acuan_semua = (baseline or {}).get('results', {})
+    print(f"{'metrik':<36}{'p50':>10}{'p95':>10}{'p99':>10}{'baseline p50':>14}")
+    for nama, nilai in hasil['results'].items():
+        acuan = acuan_semua.get(nama, {})
+        if 'peak_mb' in nilai:
+            baris = f"{nama:<36}{nilai['peak_mb']:>8.1f}MB{'':>20}"
+            if acuan:
+                baris += f"{acuan['peak_mb']:>12.1f}MB"
+        else:
+            baris = f"{nama:<36}{nilai['p50_ms']:>8.2f}ms{nilai['p95_ms']:>8.2f}ms{nilai['p99_ms']:>8.2f}ms"
+            if acuan:
+                baris += f"{acuan['p50_ms']:>12.2f}ms"
+        print(baris)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark latensi, throughput, dan memori jalur prediksi.")
+    parser.add_argument('--only', nargs='+', help="Prefix metrik (mis. predict explain.fast memory)")
+    parser.add_argument('--repeat', type=int, default=200, help="Ulangan untuk predict/transform")
+    parser.add_argument('--repeat-explain', type=int, default=20, help="Ulangan untuk penjelasan")
+    parser.add_argument('--repeat-load', type=int, default=5, help="Ulangan untuk joblib.load")
+    parser.add_argument('--quick', action='store_true', help="Ulangan dikurangi 4x (untuk cek cepat)")
+    parser.add_argument('--output', help="Tulis hasil JSON ke file ini")
+    parser.add_argument('--baseline', nargs='?', const=str(BASELINE_PATH),
+                        help=f"Bandingkan dengan baseline JSON (default {BASELINE_PATH.relative_to(ROOT_DIR)})")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Toleransi relatif terhadap baseline")
+    args = parser.parse_args(argv)
+
+    faktor = 4 if args.quick else 1
+    hasil = jalankan(args.only, repeat=max(args.repeat // faktor, 5),
+                     repeat_explain=max(args.repeat_explain // faktor, 3),
+                     repeat_load=max(args.repeat_load // faktor, 1))
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    _cetak(hasil, baseline)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(hasil, f, indent=2)
+    if baseline is not None:
+        regresi = bandingkan(hasil, baseline, args.tolerance)
+        for pesan in regresi:
+            print(f"REGRESI {pesan}", file=sys.stderr)
+        return 1 if regresi else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# jantung/cache.py
+#
+# Cache hasil prediksi (probabilitas, band risiko, penjelasan) yang dibagi
+# antar sesi dalam satu proses. Kunci = versi model + input 11 fitur yang
+# sudah dinormalisasi, sehingga pasien identik dari sesi mana pun memakai
+# hasil yang sama. Kapasitas dibatasi (LRU) dan setiap entri punya TTL.
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from jantung.schema import FITUR, KATEGORI
+
+CACHE_SIZE_DEFAULT = int(os.environ.get('HEART_CACHE_SIZE', 2048))
+CACHE_TTL_DEFAULT = float(os.environ.get('HEART_CACHE_TTL', 3600))
+
+
+@dataclass(frozen=True)
+class HasilPrediksi:
+    prob_sakit: float
+    risk_band: str
+    explanation: tuple = None    # payload penjelasan (fitur, bobot), lihat jantung/session.py
+
+
+def kunci_pasien(record, versi_model):
+    """Kunci kanonik: tipe diseragamkan, Oldpeak dibulatkan ke 0.1 (step form)."""
+    nilai = []
+    for kolom in FITUR:
+        v = record[kolom]
+        if kolom == 'Oldpeak':
+            v = round(float(v), 1)
+        elif kolom in KATEGORI and kolom != 'FastingBS':
+            v = str(v).strip()
+        else:
+            v = int(v)
+        nilai.append(v)
+    return (versi_model,) + tuple(nilai)
+
+
+class CacheHasil:
+    """Cache LRU + TTL yang thread-safe, dengan penghitung hit/miss/eviction."""
+
+    def __init__(self, maxsize=CACHE_SIZE_DEFAULT, ttl=CACHE_TTL_DEFAULT, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entri = self._data.get(key)
+            if entri is not None:
+                kedaluwarsa, nilai = entri
+                if kedaluwarsa >= self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return nilai
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, nilai):
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, nilai)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, fungsi):
+        # Dua sesi yang miss bersamaan bisa menghitung dua kali; hasilnya identik,
+        # jadi ini lebih murah daripada menahan lock selama prediksi berjalan
+        nilai = self.get(key)
+        if nilai is None:
+            nilai = fungsi()
+            self.put(key, nilai)
+        return nilai
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,294 @@
+# jantung/cohort.py
+#
+# Penjelasan kohort offline: penjelasan lokal untuk SETIAP baris heart.csv (atau
+# file kohort lain), dihitung paralel di process pool, lalu diringkas menjadi
+# rata-rata |kontribusi| per fitur, untuk seluruh kohort dan per subgrup (Sex,
+# ChestPainType, kelompok usia, HeartDisease, band risiko). Ringkasan ditulis ke
+# artifacts/<versi>/cohort_summary.json, sehingga tab Feature Importance di Home
+# cukup membaca satu file JSON kecil.
+#
+# Baris dibagi menjadi chunk dan setiap chunk yang selesai langsung ditulis ke
+# direktori checkpoint (artifacts/<versi>/cohort.parts-<kunci>-c<chunk>/). Job
+# yang terputus dilanjutkan dengan perintah yang sama: chunk yang sudah ada
+# dilewati. Kunci checkpoint = hash baris kohort + mode + budget sampel, dan
+# ukuran chunk ikut di nama direktori, jadi checkpoint kohort, mode, atau
+# --chunk lain tidak pernah tercampur.
+#
+#   python -m jantung.cohort                               # heart.csv, versi aktif
+#   python -m jantung.cohort --mode tree --workers 4
+#   python -m jantung.cohort --data kohort.csv --dest hasil_kohort/
+#
+# Kontribusi kolom one-hot (mis. nom__Sex_F dan nom__Sex_M) dijumlahkan ke fitur
+# asalnya sebelum diambil nilai absolutnya.
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from jantung.artifacts import BUNDLE_DIR, current_version, load_bundle
+from jantung.explain import (MODE_ACCURATE, MODE_DEFAULT, MODE_TREE, MODES, SAMPLES_ACCURATE_DEFAULT,
+                             SAMPLES_FAST_DEFAULT)
+from jantung.percentile import LABEL_USIA, hash_baris, kelompok_usia
+from jantung.schema import BAND_RISIKO, DATA_PATH, FITUR, TARGET, band_risiko, cek_kolom
+
+FORMAT_VERSION = 1
+RINGKASAN_FILE = "cohort_summary.json"
+PENJELASAN_FILE = "cohort_explanations.npz"
+CHUNK_DEFAULT = 32
+WORKERS_DEFAULT = os.cpu_count() or 1
+
+# Mesin penjelasan milik proses worker, dibuat oleh _inisialisasi_worker
+_mesin_worker = None
+
+
+def _inisialisasi_worker(out_dir, versi_model, mode, num_samples):
+    global _mesin_worker
+    from jantung.artifacts import buat_explainer
+    from jantung.explain import MesinPenjelasan
+
+    bundle = load_bundle(out_dir, version=versi_model)
+    _mesin_worker = MesinPenjelasan(buat_explainer(bundle), bundle.model.named_steps['classifier'], mode=mode,
+                                    num_samples_fast=num_samples, num_samples_accurate=num_samples)
+
+
+def jelaskan_chunk(mesin, X):
+    """(kontribusi (n, n_fitur), prob kelas 1 (n,)) untuk baris hasil preprocessor."""
+    X = np.asarray(X, dtype=float)
+    prob = mesin.classifier.predict_proba(X)[:, 1]
+    if mesin.mode_efektif() == MODE_TREE:
+        # TreeSHAP menghitung seluruh chunk dalam satu operasi array
+        return mesin.tree_shap.shap_values(X), prob
+    bobot = np.zeros(X.shape)
+    for i, baris in enumerate(X):
+        for idx, nilai in mesin.explain(baris, num_features=X.shape[1], label=1).local_exp[1]:
+            bobot[i, idx] = nilai
+    return bobot, prob
+
+
+def _jelaskan_di_worker(X):
+    return jelaskan_chunk(_mesin_worker, X)
+
+
+def peta_fitur_asal(feature_names):
+    """Indeks FITUR asal untuk tiap kolom hasil preprocessor ('nom__Sex_M' -> Sex)."""
+    peta = []
+    for nama in feature_names:
+        dasar = str(nama).split('__', 1)[-1]
+        asal = [i for i, fitur in enumerate(FITUR) if dasar == fitur or dasar.startswith(fitur + '_')]
+        if not asal:
+            raise ValueError(f"Kolom {nama!r} tidak bisa dipetakan ke fitur asal")
+        peta.append(max(asal, key=lambda i: len(FITUR[i])))
+    return np.asarray(peta)
+
+
+def ke_fitur_asal(bobot, feature_names):
+    """Jumlahkan kontribusi kolom hasil preprocessor per fitur asal: (n, len(FITUR))."""
+    gabungan = np.zeros((bobot.shape[0], len(FITUR)))
+    np.add.at(gabungan.T, peta_fitur_asal(feature_names), bobot.T)
+    return gabungan
+
+
+def _statistik(bobot):
+    return {'n': int(bobot.shape[0]), 'mean_abs': np.abs(bobot).mean(axis=0).round(6).tolist(),
+            'mean': bobot.mean(axis=0).round(6).tolist()}
+
+
+# Urutan tampil subgrup berjenjang; dimensi lain diurutkan alfabetis
+_URUTAN_GRUP = {'AgeBand': LABEL_USIA, 'RiskBand': tuple(BAND_RISIKO)}
+
+
+def ringkas(df, bobot, prob, feature_names):
+    """Ringkasan rata-rata |kontribusi| per fitur asal: keseluruhan dan per subgrup."""
+    per_fitur = ke_fitur_asal(bobot, feature_names)
+    dimensi = {'Sex': df['Sex'].astype(str).to_numpy(),
+               'ChestPainType': df['ChestPainType'].astype(str).to_numpy(),
+               'AgeBand': kelompok_usia(df['Age'].to_numpy()),
+               'RiskBand': band_risiko(prob)}
+    if TARGET in df.columns:
+        dimensi[TARGET] = df[TARGET].astype(str).to_numpy()
+    return {
+        'features': list(FITUR),
+        'overall': _statistik(per_fitur),
+        'groups': {nama: {str(nilai): _statistik(per_fitur[label == nilai])
+                          for nilai in _URUTAN_GRUP.get(nama, np.unique(label)) if (label == nilai).any()}
+                   for nama, label in dimensi.items()},
+    }
+
+
+def _kunci(hash_, versi_model, mode, num_samples):
+    h = hashlib.sha256(np.ascontiguousarray(hash_).tobytes())
+    h.update(f"{versi_model}|{mode}|{num_samples}".encode())
+    return h.hexdigest()[:16]
+
+
+def _tulis_atomik(path, tulis):
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        tulis(f)
+    tmp.replace(path)
+
+
+def _hapus_checkpoint(tujuan, kunci):
+    # Termasuk checkpoint dengan ukuran chunk lain untuk kunci yang sama
+    for parts in Path(tujuan).glob(f"cohort.parts-{kunci}-c*"):
+        shutil.rmtree(parts, ignore_errors=True)
+
+
+def _path_chunk(parts, idx):
+    return parts / f"chunk-{idx:05d}.npz"
+
+
+def jalankan(df, versi_model=None, out_dir=BUNDLE_DIR, tujuan=None, mode=MODE_DEFAULT, num_samples=None,
+             chunk=CHUNK_DEFAULT, workers=WORKERS_DEFAULT, progress=None, ulang=False):
+    """Jelaskan setiap baris `df` dan tulis penjelasan + ringkasan ke `tujuan` (default artifacts/<versi>/).
+
+    Chunk yang sudah ada di direktori checkpoint dipakai ulang. `progress`
+    opsional dipanggil dengan (chunk selesai, total chunk). Mengembalikan dict ringkasan.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Mode penjelasan tidak dikenal: {mode!r} (pilih {', '.join(MODES)})")
+    cek_kolom(df)
+    versi_model = versi_model or current_version(out_dir)
+    tujuan = Path(tujuan) if tujuan else Path(out_dir) / versi_model
+    num_samples = num_samples or (SAMPLES_ACCURATE_DEFAULT if mode == MODE_ACCURATE else SAMPLES_FAST_DEFAULT)
+    kunci = _kunci(hash_baris(df), versi_model, mode, num_samples)
+
+    lama = muat_ringkasan(path=tujuan / RINGKASAN_FILE)
+    if not ulang and lama is not None and lama.get('key') == kunci:
+        return lama
+
+    bundle = load_bundle(out_dir, version=versi_model)
+    X = bundle.preprocessor.transform(df[FITUR])
+    batas = list(range(0, len(X), chunk))
+    # Ukuran chunk ikut nama direktori checkpoint: chunk-i hanya bermakna untuk --chunk yang sama
+    parts = tujuan / f"cohort.parts-{kunci}-c{chunk}"
+    if ulang:
+        _hapus_checkpoint(tujuan, kunci)
+    parts.mkdir(parents=True, exist_ok=True)
+    sisa = [i for i, _ in enumerate(batas) if not _path_chunk(parts, i).exists()]
+
+    def simpan(idx, hasil):
+        bobot, prob = hasil
+        _tulis_atomik(_path_chunk(parts, idx), lambda f: np.savez(f, bobot=bobot, prob=prob))
+        if progress is not None:
+            progress(len(batas) - len(sisa), len(batas))
+
+    mulai = time.perf_counter()
+    if sisa and workers > 0:
+        # 'spawn' seperti jantung/executor.py; setiap worker memuat bundle & explainer sekali
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(sisa)), mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_inisialisasi_worker,
+                                   initargs=(str(out_dir), versi_model, mode, num_samples))
+        try:
+            berjalan = {pool.submit(_jelaskan_di_worker, X[batas[i]:batas[i] + chunk]): i for i in sisa}
+            while berjalan:
+                selesai, _ = wait(berjalan, return_when=FIRST_COMPLETED)
+                for future in selesai:
+                    idx = berjalan.pop(future)
+                    sisa.remove(idx)
+                    simpan(idx, future.result())
+        finally:
+            # Saat dihentikan (Ctrl-C/error) chunk yang belum mulai dibatalkan; yang selesai sudah di checkpoint
+            pool.shutdown(wait=True, cancel_futures=True)
+    elif sisa:
+        _inisialisasi_worker(str(out_dir), versi_model, mode, num_samples)
+        for idx in list(sisa):
+            hasil = _jelaskan_di_worker(X[batas[idx]:batas[idx] + chunk])
+            sisa.remove(idx)
+            simpan(idx, hasil)
+
+    bobot, prob = [], []
+    for idx in range(len(batas)):
+        with np.load(_path_chunk(parts, idx)) as data:
+            bobot.append(data['bobot'])
+            prob.append(data['prob'])
+    bobot, prob = np.concatenate(bobot), np.concatenate(prob)
+
+    ringkasan = {
+        'format': FORMAT_VERSION,
+        'key': kunci,
+        'version': versi_model,
+        'mode': mode,
+        'num_samples': None if mode == MODE_TREE else num_samples,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'seconds': round(time.perf_counter() - mulai, 3),
+        **ringkas(df, bobot, prob, bundle.feature_names),
+    }
+    _tulis_atomik(tujuan / PENJELASAN_FILE,
+                  lambda f: np.savez(f, hash=hash_baris(df), prob=prob, contributions=bobot,
+                                     feature_names=np.asarray(bundle.feature_names)))
+    # Ringkasan ditulis terakhir: pembaca tidak pernah melihat ringkasan tanpa penjelasannya
+    _tulis_atomik(tujuan / RINGKASAN_FILE, lambda f: f.write(json.dumps(ringkasan, indent=2).encode('utf-8')))
+    _hapus_checkpoint(tujuan, kunci)
+    return ringkasan
+
+
+def path_ringkasan(versi_model, out_dir=BUNDLE_DIR):
+    return Path(out_dir) / versi_model / RINGKASAN_FILE
+
+
+def muat_ringkasan(versi_model=None, out_dir=BUNDLE_DIR, path=None):
+    """Dict ringkasan tersimpan, atau None jika job kohort belum dijalankan untuk versi ini."""
+    path = Path(path) if path else path_ringkasan(versi_model or current_version(out_dir), out_dir)
+    if not path.exists():
+        return None
+    with open(path, encoding='utf-8') as f:
+        ringkasan = json.load(f)
+    return ringkasan if ringkasan.get('format') == FORMAT_VERSION else None
+
+
+def figur_kohort(ringkasan, judul, label_x, dimensi=None, grup=None):
+    """Bar horizontal rata-rata |kontribusi| per fitur untuk seluruh kohort atau satu subgrup."""
+    stat = ringkasan['overall'] if dimensi is None else ringkasan['groups'][dimensi][grup]
+    urutan = np.argsort(stat['mean_abs'])
+    fitur = [ringkasan['features'][i] for i in urutan]
+    fig = go.Figure(go.Bar(
+        x=[stat['mean_abs'][i] for i in urutan], y=fitur, orientation='h',
+        marker_color=['#FF4B4B' if stat['mean'][i] > 0 else '#1E88E5' for i in urutan],
+        customdata=[stat['mean'][i] for i in urutan],
+        hovertemplate='%{y}<br>|kontribusi| %{x:.4f}<br>rata-rata %{customdata:+.4f}<extra></extra>'))
+    fig.update_layout(title_text=f"{judul} (n={stat['n']})", xaxis_title=label_x, height=120 + 32 * len(fitur),
+                      margin=dict(l=10, r=10, t=50, b=10), yaxis={'automargin': True})
+    return fig
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Penjelasan lokal seluruh kohort + ringkasan per fitur/subgrup.")
+    parser.add_argument('--data', default=str(DATA_PATH), help="Path kohort CSV (default heart.csv)")
+    parser.add_argument('--version', help="Versi bundle (default: versi aktif)")
+    parser.add_argument('--out', default=str(BUNDLE_DIR), help="Direktori bundle")
+    parser.add_argument('--dest', help="Direktori hasil (default: <out>/<versi>/)")
+    parser.add_argument('--mode', choices=MODES, default=MODE_DEFAULT)
+    parser.add_argument('--samples', type=int, help="Budget sampel LIME per baris")
+    parser.add_argument('--chunk', type=int, default=CHUNK_DEFAULT, help="Baris per chunk/checkpoint")
+    parser.add_argument('--workers', type=int, default=WORKERS_DEFAULT, help="Jumlah proses (0 = tanpa pool)")
+    parser.add_argument('--fresh', action='store_true', help="Abaikan checkpoint & ringkasan yang ada")
+    args = parser.parse_args(argv)
+
+    def lapor(selesai, total):
+        print(f"\r{selesai}/{total} chunk", end='', file=sys.stderr)
+
+    ringkasan = jalankan(pd.read_csv(args.data), args.version, args.out, args.dest, mode=args.mode,
+                         num_samples=args.samples, chunk=args.chunk, workers=args.workers, progress=lapor,
+                         ulang=args.fresh)
+    print(file=sys.stderr)
+    print(f"Kohort {ringkasan['overall']['n']} baris, mode {ringkasan['mode']}, {ringkasan['seconds']:.1f} detik")
+    stat = ringkasan['overall']
+    for i in np.argsort(stat['mean_abs'])[::-1]:
+        print(f"  {ringkasan['features'][i]:<16}{stat['mean_abs'][i]:>9.4f}{stat['mean'][i]:>+10.4f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
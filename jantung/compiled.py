@@ -0,0 +1,286 @@
+# jantung/compiled.py
+#
+# Mode inferensi terkompilasi: preprocessor (ColumnTransformer) dan
+# RandomForest dari pipeline diekspor ke array NumPy datar, lalu semua pohon
+# dievaluasi sekaligus dalam satu traversal tervektorisasi. Ini menghilangkan
+# overhead Pipeline / ColumnTransformer / dispatch per pohon pada skoring satu
+# pasien.
+#
+# Diaktifkan di app.py dengan HEART_INFERENCE=compiled. HEART_INFERENCE=shared
+# memakai array forest yang sama, tetapi dibuka dengan mmap dari file yang
+# dibagi semua worker di node (lihat jantung/shared.py). HEART_INFERENCE=lookup
+# memakai preprocessor yang sama dengan forest berbentuk tabel lookup per bin
+# ambang (lihat jantung/lookup.py).
+#
+# Verifikasi + benchmark latensi p50/p99 terhadap pipeline asli:
+#   python -m jantung.compiled --repeat 500
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, OrdinalEncoder, StandardScaler
+
+from jantung.schema import FITUR
+
+INFERENCE_PIPELINE = 'pipeline'
+INFERENCE_COMPILED = 'compiled'
+INFERENCE_SHARED = 'shared'
+INFERENCE_LOOKUP = 'lookup'
+INFERENCE_MODE = os.environ.get('HEART_INFERENCE', INFERENCE_PIPELINE)
+
+_BATAS_BARIS_KECIL = 8
+
+
+def _nilai_python(nilai):
+    # Samakan kunci kategori: np.int64(1) -> 1, np.str_('M') -> 'M'
+    return nilai.item() if isinstance(nilai, np.generic) else nilai
+
+
+class PreprocessorTerkompilasi:
+    """Versi datar dari ColumnTransformer terlatih (scaler, one-hot, ordinal, passthrough)."""
+
+    def __init__(self, column_transformer):
+        with warnings.catch_warnings():
+            # sklearn 1.6 memperingatkan format kolom 'remainder' (indeks vs nama); keduanya ditangani
+            warnings.simplefilter('ignore', FutureWarning)
+            transformers = [(nama, t, list(kolom)) for nama, t, kolom in column_transformer.transformers_]
+        self.feature_names = list(column_transformer.get_feature_names_out())
+        self.n_output = len(self.feature_names)
+        self.langkah = []
+        nama_input = list(column_transformer.feature_names_in_)
+        for nama, transformer, kolom in transformers:
+            if transformer == 'drop' or len(kolom) == 0:
+                continue
+            kolom = [nama_input[k] if isinstance(k, (int, np.integer)) else k for k in kolom]
+            irisan = column_transformer.output_indices_[nama]
+            self.langkah.append(self._kompilasi_langkah(nama, transformer, kolom, irisan.start))
+
+    @staticmethod
+    def _kompilasi_langkah(nama, transformer, kolom, mulai):
+        if transformer == 'passthrough' or (isinstance(transformer, FunctionTransformer)
+                                            and transformer.func is None):
+            return ('passthrough', kolom, mulai, None)
+        if isinstance(transformer, StandardScaler):
+            mean = transformer.mean_ if transformer.with_mean else np.zeros(len(kolom))
+            scale = transformer.scale_ if transformer.with_std else np.ones(len(kolom))
+            return ('scale', kolom, mulai, (np.asarray(mean, dtype=float), np.asarray(scale, dtype=float)))
+        if isinstance(transformer, OneHotEncoder):
+            if transformer.drop is not None or transformer.handle_unknown != 'ignore':
+                raise ValueError(f"OneHotEncoder '{nama}' hanya didukung dengan drop=None, handle_unknown='ignore'")
+            peta, offset = [], mulai
+            for kategori in transformer.categories_:
+                peta.append({_nilai_python(k): offset + i for i, k in enumerate(kategori)})
+                offset += len(kategori)
+            return ('onehot', kolom, mulai, peta)
+        if isinstance(transformer, OrdinalEncoder):
+            peta = [{_nilai_python(k): float(i) for i, k in enumerate(kategori)}
+                    for kategori in transformer.categories_]
+            return ('ordinal', kolom, mulai, peta)
+        raise ValueError(f"Transformer '{nama}' ({type(transformer).__name__}) tidak bisa dikompilasi")
+
+    def transform_row(self, record):
+        """Transformasi satu pasien (dict kolom -> nilai) menjadi vektor 1D."""
+        out = np.zeros(self.n_output)
+        for jenis, kolom, mulai, param in self.langkah:
+            if jenis == 'scale':
+                nilai = np.array([record[k] for k in kolom], dtype=float)
+                out[mulai:mulai + len(kolom)] = (nilai - param[0]) / param[1]
+            elif jenis == 'onehot':
+                for k, peta in zip(kolom, param):
+                    posisi = peta.get(_nilai_python(record[k]))
+                    if posisi is not None:
+                        out[posisi] = 1.0
+            elif jenis == 'ordinal':
+                for i, (k, peta) in enumerate(zip(kolom, param)):
+                    out[mulai + i] = peta[_nilai_python(record[k])]
+            else:
+                for i, k in enumerate(kolom):
+                    out[mulai + i] = record[k]
+        return out
+
+    def transform(self, X):
+        """Transformasi DataFrame (atau dict satu pasien) menjadi matriks 2D."""
+        if isinstance(X, dict):
+            return self.transform_row(X).reshape(1, -1)
+        if len(X) <= _BATAS_BARIS_KECIL:
+            # Untuk beberapa baris, jalur per-record jauh lebih murah daripada operasi kolom pandas
+            return np.vstack([self.transform_row(r) for r in X.to_dict('records')]).reshape(len(X), -1)
+        out = np.zeros((len(X), self.n_output))
+        for jenis, kolom, mulai, param in self.langkah:
+            if jenis == 'scale':
+                out[:, mulai:mulai + len(kolom)] = (X[kolom].to_numpy(dtype=float) - param[0]) / param[1]
+            elif jenis == 'onehot':
+                for k, peta in zip(kolom, param):
+                    posisi = X[k].map(peta).to_numpy(dtype=float)
+                    dikenal = ~np.isnan(posisi)
+                    out[np.flatnonzero(dikenal), posisi[dikenal].astype(np.intp)] = 1.0
+            elif jenis == 'ordinal':
+                for i, (k, peta) in enumerate(zip(kolom, param)):
+                    kode = X[k].map(peta).to_numpy(dtype=float)
+                    if np.isnan(kode).any():
+                        raise ValueError(f"Kategori tidak dikenal pada kolom '{k}'")
+                    out[:, mulai + i] = kode
+            else:
+                out[:, mulai:mulai + len(kolom)] = X[kolom].to_numpy(dtype=float)
+        return out
+
+    def get_feature_names_out(self):
+        return np.array(self.feature_names, dtype=object)
+
+
+class ForestTerkompilasi:
+    """Semua pohon forest dikemas dalam array node datar (feature, threshold, anak, nilai daun)."""
+
+    def __init__(self, classifier):
+        if not hasattr(classifier, 'estimators_') or not hasattr(classifier.estimators_[0], 'tree_'):
+            raise ValueError(f"Hanya ensemble pohon yang bisa dikompilasi, bukan {type(classifier).__name__}")
+        trees = [estimator.tree_ for estimator in classifier.estimators_]
+        self.classes_ = classifier.classes_
+        self.n_trees = len(trees)
+        self.max_depth = max(tree.max_depth for tree in trees)
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        self.root = offsets[:-1].astype(np.intp)
+        n_nodes = offsets[-1]
+
+        self.feature = np.zeros(n_nodes, dtype=np.intp)
+        self.threshold = np.full(n_nodes, np.inf)
+        self.left = np.arange(n_nodes, dtype=np.intp)
+        self.right = np.arange(n_nodes, dtype=np.intp)
+        self.value = np.zeros((n_nodes, len(self.classes_)))
+        for offset, tree in zip(self.root, trees):
+            node = np.arange(tree.node_count)
+            split = tree.children_left != tree.children_right
+            self.feature[offset + node[split]] = tree.feature[split]
+            self.threshold[offset + node[split]] = tree.threshold[split]
+            # Daun menunjuk ke dirinya sendiri, sehingga traversal cukup berjalan max_depth langkah
+            self.left[offset + node[split]] = offset + tree.children_left[split]
+            self.right[offset + node[split]] = offset + tree.children_right[split]
+            value = tree.value[:, 0, :]
+            self.value[offset + node] = value / value.sum(axis=1, keepdims=True)
+
+    ARRAY = ('root', 'feature', 'threshold', 'left', 'right', 'value')
+
+    def ke_array(self):
+        """Array node datar (untuk disimpan sebagai .npy) + metadata kecil."""
+        return ({nama: getattr(self, nama) for nama in self.ARRAY},
+                {'classes': self.classes_.tolist(), 'n_trees': int(self.n_trees), 'max_depth': int(self.max_depth)})
+
+    @classmethod
+    def dari_array(cls, array, meta):
+        """Forest dari array yang sudah ada (mis. np.memmap read-only); tanpa salinan."""
+        forest = cls.__new__(cls)
+        for nama in cls.ARRAY:
+            setattr(forest, nama, array[nama])
+        forest.classes_ = np.asarray(meta['classes'])
+        forest.n_trees = meta['n_trees']
+        forest.max_depth = meta['max_depth']
+        return forest
+
+    def apply(self, X):
+        """Indeks node daun global (n_rows, n_trees)."""
+        # sklearn membandingkan fitur dalam float32
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        baris = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.root, (X.shape[0], self.n_trees))
+        for _ in range(self.max_depth):
+            kiri = X[baris, self.feature[node]] <= self.threshold[node]
+            node = np.where(kiri, self.left[node], self.right[node])
+        return node
+
+    def predict_proba(self, X):
+        return self.value[self.apply(np.atleast_2d(X))].mean(axis=1)
+
+
+class ModelTerkompilasi:
+    """Pengganti pipeline untuk inferensi: preprocessor + forest terkompilasi.
+
+    `named_steps` tetap menunjuk ke pipeline asli agar kode yang membaca
+    feature_importances_ atau get_feature_names_out() tidak berubah.
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.preprocessor = PreprocessorTerkompilasi(pipeline.named_steps['preprocessor'])
+        self.forest = ForestTerkompilasi(pipeline.named_steps['classifier'])
+        self.classes_ = self.forest.classes_
+
+    @property
+    def named_steps(self):
+        return self.pipeline.named_steps
+
+    def predict_proba(self, X):
+        return self.forest.predict_proba(self.preprocessor.transform(X))
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def siapkan_model(pipeline, mode=INFERENCE_MODE):
+    """Kembalikan ModelTerkompilasi (mode 'compiled') atau ModelTabel (mode 'lookup') jika model bisa dikompilasi.
+
+    Model yang tidak didukung (mis. SVC) tetap memakai pipeline asli.
+    """
+    if mode not in (INFERENCE_COMPILED, INFERENCE_LOOKUP):
+        return pipeline
+    try:
+        if mode == INFERENCE_LOOKUP:
+            from jantung.lookup import ModelTabel
+            return ModelTabel(pipeline)
+        return ModelTerkompilasi(pipeline)
+    except ValueError:
+        return pipeline
+
+
+def verifikasi(pipeline, compiled, X, atol=1e-9):
+    """Selisih absolut maksimum probabilitas compiled vs pipeline; AssertionError jika > atol."""
+    selisih = float(np.abs(compiled.predict_proba(X) - pipeline.predict_proba(X)).max())
+    if selisih > atol:
+        raise AssertionError(f"Probabilitas terkompilasi menyimpang {selisih:.3g} (> {atol:g})")
+    return selisih
+
+
+def _persentil_ms(durasi):
+    durasi = np.asarray(durasi) * 1000
+    return np.percentile(durasi, 50), np.percentile(durasi, 99)
+
+
+def main(argv=None):
+    from jantung.artifacts import load_bundle
+    from jantung.schema import DATA_PATH
+
+    parser = argparse.ArgumentParser(description="Verifikasi dan benchmark inferensi terkompilasi.")
+    parser.add_argument('--repeat', type=int, default=300, help="Jumlah panggilan satu baris per mode")
+    args = parser.parse_args(argv)
+
+    pipeline = load_bundle().model
+    compiled = ModelTerkompilasi(pipeline)
+    df = pd.read_csv(DATA_PATH)
+    print(f"Selisih maks. probabilitas (heart.csv): {verifikasi(pipeline, compiled, df[FITUR]):.2e}")
+
+    baris = df[FITUR].sample(n=args.repeat, replace=True, random_state=0)
+    frames = [baris.iloc[[i]] for i in range(len(baris))]
+    records = baris.to_dict('records')
+    kandidat = [
+        ("pipeline.predict_proba(DataFrame)", lambda i: pipeline.predict_proba(frames[i])),
+        ("compiled.predict_proba(DataFrame)", lambda i: compiled.predict_proba(frames[i])),
+        ("compiled.predict_proba(dict)", lambda i: compiled.predict_proba(records[i])),
+    ]
+    for nama, fungsi in kandidat:
+        fungsi(0)
+        durasi = []
+        for i in range(args.repeat):
+            mulai = time.perf_counter()
+            fungsi(i)
+            durasi.append(time.perf_counter() - mulai)
+        p50, p99 = _persentil_ms(durasi)
+        print(f"{nama:<36} p50 {p50:7.3f} ms | p99 {p99:7.3f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# jantung/executor.py
+#
+# Eksekutor penjelasan berbasis process pool. Penjelasan LIME berat di CPU dan
+# memegang GIL; bila dijalankan di thread skrip Streamlit, sesi lain pada
+# worker yang sama ikut tertahan. Di sini setiap proses worker memuat bundle
+# artefak (versi yang sama dengan server) dan membangun MesinPenjelasan sekali
+# di initializer, lalu pool dipanaskan dengan satu penjelasan dummy per proses.
+#
+# Halaman prediksi mengirim baris yang sudah ditransformasi preprocessor,
+# langsung menampilkan probabilitas + gauge, lalu menunggu hasil penjelasan
+# dengan batas waktu. Bila penjelasan melewati batas waktu (FALLBACK_TIMEOUT)
+# atau gagal dihitung (FALLBACK_GAGAL, dicatat di log), ditampilkan feature
+# importance global dari classifier sebagai gantinya, jika classifier punya.
+#
+# Eksekutor dibuat saat versi model dimuat (lampiran PengelolaModel, lihat
+# app.py), sehingga pool sudah panas sebelum permintaan penjelasan pertama.
+#
+#   HEART_EXPLAIN_PROCESSES  jumlah proses worker (default 2, 0 = tanpa pool)
+#   HEART_EXPLAIN_TIMEOUT    batas waktu tunggu dalam detik (default 10)
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+
+import numpy as np
+
+from jantung.treeshap import PenjelasanTree
+
+PROCESSES_DEFAULT = int(os.environ.get('HEART_EXPLAIN_PROCESSES', 2))
+TIMEOUT_DEFAULT = float(os.environ.get('HEART_EXPLAIN_TIMEOUT', 10))
+
+FALLBACK_TIMEOUT = 'timeout'
+FALLBACK_GAGAL = 'error'
+
+_log = logging.getLogger(__name__)
+
+# Mesin penjelasan milik proses worker, dibuat oleh _inisialisasi_worker
+_mesin_worker = None
+
+
+def _inisialisasi_worker(versi_model, mode):
+    global _mesin_worker
+    from jantung.artifacts import buat_explainer
+    from jantung.explain import MesinPenjelasan
+    from jantung.shared import muat_bundle
+
+    bundle = muat_bundle(version=versi_model)
+    _mesin_worker = MesinPenjelasan(buat_explainer(bundle), bundle.model.named_steps['classifier'], mode=mode)
+
+
+def _jelaskan_di_worker(data_row, num_features, label):
+    return _mesin_worker.explain(data_row, num_features=num_features, label=label)
+
+
+def _pemanasan(data_row):
+    # Satu penjelasan penuh: mengisi pool sampel mode 'fast' / tabel TreeShap
+    _jelaskan_di_worker(data_row, len(data_row), 1)
+    return os.getpid()
+
+
+class PenjelasanGlobal(PenjelasanTree):
+    """Feature importance global dengan API as_list/as_pyplot_figure; dipakai sebagai fallback."""
+
+    def __init__(self, importances, feature_names, num_features=None, label=1,
+                 class_names=('No Disease', 'Disease')):
+        importances = np.asarray(importances, dtype=float)
+        urutan = np.argsort(-importances, kind='stable')[:num_features]
+        self.label = label
+        self.class_names = list(class_names)
+        self.intercept = {label: 0.0}
+        self.local_exp = {label: [(int(idx), float(importances[idx])) for idx in urutan]}
+        self.predict_proba = None
+        self._names = [str(nama) for nama in feature_names]
+
+
+def penjelasan_global(classifier, feature_names, num_features=None, label=1):
+    """PenjelasanGlobal dari feature_importances_, atau None jika classifier tidak memilikinya."""
+    importances = getattr(classifier, 'feature_importances_', None)
+    if importances is None:
+        return None
+    return PenjelasanGlobal(importances, feature_names, num_features=num_features, label=label)
+
+
+class EksekutorPenjelasan:
+    """Process pool yang sudah dipanaskan dengan explainer + model untuk satu versi bundle.
+
+    Dengan processes=0 (atau jika pool gagal dibuat) penjelasan dihitung di
+    thread pemanggil memakai `mesin`, seperti sebelumnya.
+    """
+
+    def __init__(self, mesin, versi_model, processes=PROCESSES_DEFAULT, timeout=TIMEOUT_DEFAULT):
+        self.mesin = mesin
+        self.versi_model = versi_model
+        self.feature_names = list(mesin.explainer.feature_names)
+        self.timeout = timeout
+        self._pool = None
+        self._pemanasan = []
+        if processes > 0:
+            # 'spawn': proses server punya banyak thread (Streamlit, MicroBatcher), fork tidak aman
+            self._pool = ProcessPoolExecutor(
+                max_workers=processes, mp_context=multiprocessing.get_context('spawn'),
+                initializer=_inisialisasi_worker, initargs=(versi_model, mesin.mode))
+            baris_dummy = np.zeros(len(self.feature_names))
+            self._pemanasan = [self._pool.submit(_pemanasan, baris_dummy) for _ in range(processes)]
+
+    @property
+    def mode(self):
+        return self.mesin.mode
+
+    def submit(self, data_row, num_features=11, label=1):
+        """Future berisi objek penjelasan untuk satu baris hasil preprocessor."""
+        data_row = np.asarray(data_row, dtype=float)
+        if self._pool is not None:
+            try:
+                return self._pool.submit(_jelaskan_di_worker, data_row, num_features, label)
+            except RuntimeError:
+                # Pool rusak (worker mati) atau sudah shutdown: jatuh ke jalur lokal
+                self._pool = None
+        future = Future()
+        try:
+            future.set_result(self.mesin.explain(data_row, num_features=num_features, label=label))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def hasil(self, future, num_features=11, label=1, timeout=None):
+        """(penjelasan, fallback).
+
+        fallback False: penjelasan lokal. FALLBACK_TIMEOUT / FALLBACK_GAGAL:
+        batas waktu terlampaui / penjelasan gagal dihitung, dan penjelasan berisi
+        importance global (None jika classifier tidak memilikinya).
+        """
+        try:
+            return future.result(timeout=self.timeout if timeout is None else timeout), False
+        except TimeoutError:
+            future.cancel()
+            alasan = FALLBACK_TIMEOUT
+        except Exception as exc:
+            _log.warning("Penjelasan gagal dihitung (%s, mode %s): %r", self.versi_model, self.mode, exc, exc_info=exc)
+            alasan = FALLBACK_GAGAL
+        return penjelasan_global(self.mesin.classifier, self.feature_names,
+                                 num_features=num_features, label=label), alasan
+
+    def jelaskan(self, data_row, num_features=11, label=1, timeout=None):
+        return self.hasil(self.submit(data_row, num_features, label), num_features, label, timeout)
+
+    def siap(self):
+        """True jika semua proses worker sudah selesai pemanasan."""
+        return self._pool is None or all(f.done() for f in self._pemanasan)
+
+    def shutdown(self, wait=False):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,236 @@
+# jantung/explain.py
+#
+# Mesin penjelasan dengan tiga mode:
+#   - 'accurate': explain_instance LIME biasa, sampel baru tiap panggilan.
+#   - 'fast'    : matriks perturbasi dibuat sekali lalu dipakai ulang.
+#   - 'tree'    : TreeSHAP eksak dari array tree_ forest (jantung/treeshap.py),
+#                 tanpa sampling; hanya untuk classifier berbasis pohon. Untuk
+#                 classifier lain (mis. HistGradientBoosting, SVC) mode ini
+#                 turun ke 'fast' dan dicatat di log (lihat mode_efektif()).
+#
+# Dengan discretize_continuous=True (default di app.py), LIME mengambil sampel
+# perturbasi dari distribusi bin data latih, terlepas dari instance yang
+# dijelaskan. Instance hanya menentukan indikator biner "bin sama dengan
+# instance". Karena itu mode 'fast' cukup membangkitkan pool sampel (dan
+# memanggil predict_proba classifier untuk seluruh pool dalam satu panggilan)
+# satu kali, lalu per instance hanya menghitung ulang indikator biner, jarak,
+# dan regresi Ridge berbobot.
+#
+# Cek stabilitas ranking fitur terhadap mode 'accurate':
+#   python -m jantung.explain --rows 50 [--mode tree]
+
+import argparse
+import copy
+import logging
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+from lime import explanation as lime_explanation
+from lime.lime_tabular import TableDomainMapper
+
+from jantung.treeshap import TreeShap
+
+MODE_FAST = 'fast'
+MODE_ACCURATE = 'accurate'
+MODE_TREE = 'tree'
+MODES = (MODE_FAST, MODE_ACCURATE, MODE_TREE)
+
+# Default bisa diubah operator lewat environment variable
+SAMPLES_FAST_DEFAULT = int(os.environ.get('HEART_LIME_FAST_SAMPLES', 2000))
+SAMPLES_ACCURATE_DEFAULT = int(os.environ.get('HEART_LIME_SAMPLES', 5000))
+MODE_DEFAULT = os.environ.get('HEART_EXPLAIN_MODE', MODE_FAST)
+
+_log = logging.getLogger(__name__)
+
+
+class MesinPenjelasan:
+    """Pembungkus LimeTabularExplainer + classifier dengan mode 'fast' / 'accurate' / 'tree'."""
+
+    def __init__(self, explainer, classifier, mode=MODE_DEFAULT,
+                 num_samples_fast=SAMPLES_FAST_DEFAULT,
+                 num_samples_accurate=SAMPLES_ACCURATE_DEFAULT, random_state=42):
+        if mode not in MODES:
+            raise ValueError(f"Mode penjelasan tidak dikenal: {mode!r} (pilih {', '.join(MODES)})")
+        self.explainer = explainer
+        self.classifier = classifier
+        self.mode = mode
+        self.num_samples_fast = num_samples_fast
+        self.num_samples_accurate = num_samples_accurate
+        self.random_state = random_state
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._tree_shap = None
+        self._tree_shap_gagal = None
+
+    def explain(self, data_row, num_features=11, label=1, mode=None, num_samples=None):
+        """Jelaskan satu baris yang sudah ditransformasi preprocessor.
+
+        Mengembalikan objek lime Explanation (atau PenjelasanTree dengan API
+        yang sama), sehingga as_list() dan as_pyplot_figure() tetap bisa
+        dipakai seperti sebelumnya.
+        """
+        mode = self.mode_efektif(mode)
+        if mode == MODE_TREE:
+            return self.tree_shap.explain(data_row, self.explainer.feature_names, num_features=num_features)
+        if mode == MODE_ACCURATE:
+            return self.explainer.explain_instance(
+                data_row, self.classifier.predict_proba, num_features=num_features,
+                labels=(label,), num_samples=num_samples or self.num_samples_accurate)
+        if mode != MODE_FAST:
+            raise ValueError(f"Mode penjelasan tidak dikenal: {mode!r}")
+        return self._explain_fast(np.asarray(data_row, dtype=float), num_features, label,
+                                  num_samples or self.num_samples_fast)
+
+    def mode_efektif(self, mode=None):
+        """Mode yang benar-benar dipakai: 'tree' turun ke 'fast' jika TreeSHAP tidak tersedia."""
+        mode = mode or self.mode
+        if mode == MODE_TREE and self.tree_shap is None:
+            return MODE_FAST
+        return mode
+
+    @property
+    def tree_shap(self):
+        # Dibangun saat pertama dipakai; None jika TreeShap menolak classifier
+        # (bukan ensemble pohon, atau tabel kontribusinya melewati batas ukuran)
+        if self._tree_shap is None and self._tree_shap_gagal is None:
+            with self._pool_lock:
+                if self._tree_shap is None and self._tree_shap_gagal is None:
+                    try:
+                        self._tree_shap = TreeShap(self.classifier)
+                    except ValueError as exc:
+                        _log.warning("Mode 'tree' tidak tersedia, memakai mode 'fast': %s", exc)
+                        self._tree_shap_gagal = exc
+        return self._tree_shap
+
+    # ------------------------------------------------------------------
+    # Mode 'fast'
+    # ------------------------------------------------------------------
+
+    def _get_pool(self, num_samples):
+        # Pool dibangun malas dan dibagi antar sesi; dibangun ulang hanya jika
+        # budget sampel bertambah
+        pool = self._pool
+        if pool is not None and pool[0].shape[0] >= num_samples - 1:
+            return pool
+        with self._pool_lock:
+            if self._pool is None or self._pool[0].shape[0] < num_samples - 1:
+                self._pool = self._build_pool(num_samples - 1)
+            return self._pool
+
+    def _build_pool(self, n):
+        explainer = self.explainer
+        if explainer.discretizer is None:
+            raise ValueError("Mode 'fast' membutuhkan explainer dengan discretize_continuous=True")
+        rng = np.random.RandomState(self.random_state)
+        n_fitur = len(explainer.feature_names)
+        # Nilai diskret adalah nomor bin (0-3), jadi cukup uint8: 8x lebih kecil dari float64 per worker
+        discrete = np.zeros((n, n_fitur), dtype=np.uint8)
+        for kolom in range(n_fitur):
+            discrete[:, kolom] = rng.choice(explainer.feature_values[kolom], size=n, replace=True,
+                                            p=explainer.feature_frequencies[kolom])
+        # undiscretize memakai random_state milik discretizer; salin agar explainer asli tidak terganggu
+        discretizer = copy.copy(explainer.discretizer)
+        discretizer.random_state = rng
+        # undiscretize menulis nilai kontinu ke salinan berdtype sama, jadi harus float
+        inverse = discretizer.undiscretize(discrete.astype(np.float64))
+        proba = self.classifier.predict_proba(inverse)
+        return discrete, proba
+
+    def _explain_fast(self, data_row, num_features, label, num_samples):
+        explainer = self.explainer
+        pool_discrete, pool_proba = self._get_pool(num_samples)
+        pool_discrete = pool_discrete[:num_samples - 1]
+        pool_proba = pool_proba[:num_samples - 1]
+
+        # Re-centering: indikator biner relatif terhadap bin milik instance
+        discretized_instance = explainer.discretizer.discretize(data_row)
+        data = np.empty((num_samples, data_row.shape[0]))
+        data[0] = 1.0
+        data[1:] = pool_discrete == discretized_instance
+        yss = np.vstack([self.classifier.predict_proba(data_row.reshape(1, -1)), pool_proba])
+
+        scaled_data = (data - explainer.scaler.mean_) / explainer.scaler.scale_
+        distances = np.sqrt(((scaled_data - scaled_data[0]) ** 2).sum(axis=1))
+
+        feature_names = list(explainer.feature_names)
+        values = explainer.convert_and_round(data_row)
+        discretized_feature_names = list(feature_names)
+        for f in explainer.discretizer.names:
+            discretized_feature_names[f] = explainer.discretizer.names[f][int(discretized_instance[f])]
+        domain_mapper = TableDomainMapper(feature_names, values, scaled_data[0],
+                                          categorical_features=range(data.shape[1]),
+                                          discretized_feature_names=discretized_feature_names)
+        ret_exp = lime_explanation.Explanation(domain_mapper, mode='classification',
+                                               class_names=explainer.class_names)
+        ret_exp.predict_proba = yss[0]
+        (ret_exp.intercept[label],
+         ret_exp.local_exp[label],
+         ret_exp.score, ret_exp.local_pred) = explainer.base.explain_instance_with_data(
+            scaled_data, yss, distances, label, num_features,
+            feature_selection=explainer.feature_selection)
+        return ret_exp
+
+
+def ranking_fitur(explanation, label=1):
+    # Urutan indeks fitur berdasarkan |bobot| menurun
+    return [idx for idx, _ in sorted(explanation.local_exp[label], key=lambda x: -abs(x[1]))]
+
+
+def cek_stabilitas(mesin, rows, mode=MODE_FAST, top_k=5, label=1):
+    """Bandingkan ranking fitur `mode` vs 'accurate' untuk baris-baris `rows`.
+
+    Mengembalikan dict berisi rata-rata irisan top-k, persentase fitur teratas
+    yang sama, dan latensi rata-rata per mode (ms).
+    """
+    overlap, top1_sama = [], []
+    durasi = {mode: 0.0, MODE_ACCURATE: 0.0}
+    for row in rows:
+        ranking = {}
+        for m in durasi:
+            mulai = time.perf_counter()
+            ranking[m] = ranking_fitur(mesin.explain(row, num_features=len(row), label=label, mode=m), label)
+            durasi[m] += time.perf_counter() - mulai
+        overlap.append(len(set(ranking[mode][:top_k]) & set(ranking[MODE_ACCURATE][:top_k])) / top_k)
+        top1_sama.append(ranking[mode][0] == ranking[MODE_ACCURATE][0])
+    n = max(len(overlap), 1)
+    return {
+        'rows': len(overlap),
+        f'top{top_k}_overlap': float(np.mean(overlap)),
+        'top1_agreement': float(np.mean(top1_sama)),
+        f'{mode}_ms': 1000 * durasi[mode] / n,
+        'accurate_ms': 1000 * durasi[MODE_ACCURATE] / n,
+    }
+
+
+def main(argv=None):
+    import pandas as pd
+
+    from jantung.artifacts import buat_explainer, load_bundle
+    from jantung.schema import DATA_PATH, FITUR
+
+    parser = argparse.ArgumentParser(description="Cek stabilitas ranking fitur mode fast/tree vs accurate.")
+    parser.add_argument('--mode', choices=[MODE_FAST, MODE_TREE], default=MODE_FAST)
+    parser.add_argument('--rows', type=int, default=30, help="Jumlah pasien dari heart.csv yang diuji")
+    parser.add_argument('--fast-samples', type=int, default=SAMPLES_FAST_DEFAULT)
+    parser.add_argument('--accurate-samples', type=int, default=SAMPLES_ACCURATE_DEFAULT)
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--min-overlap', type=float, default=0.8,
+                        help="Gagal (exit 1) jika rata-rata irisan top-k di bawah nilai ini")
+    args = parser.parse_args(argv)
+
+    bundle = load_bundle()
+    mesin = MesinPenjelasan(buat_explainer(bundle), bundle.model.named_steps['classifier'],
+                            num_samples_fast=args.fast_samples, num_samples_accurate=args.accurate_samples)
+    df = pd.read_csv(DATA_PATH).sample(n=args.rows, random_state=0)
+    rows = bundle.preprocessor.transform(df[FITUR])
+    hasil = cek_stabilitas(mesin, rows, mode=args.mode, top_k=args.top_k)
+    for kunci, nilai in hasil.items():
+        print(f"{kunci}: {nilai:.3f}" if isinstance(nilai, float) else f"{kunci}: {nilai}")
+    return 0 if hasil[f'top{args.top_k}_overlap'] >= args.min_overlap else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# jantung/loadtest.py
+#
+# Load test sederhana untuk layanan REST (jantung/api.py), hanya memakai
+# pustaka standar. Jalankan layanan lokal terlebih dahulu:
+#
+#   uvicorn jantung.api:app --port 8000
+#   python -m jantung.loadtest --url http://127.0.0.1:8000 --requests 2000 --concurrency 32
+#
+# Pasien diambil acak dari heart.csv (dibatasi ke rentang form) dan dikirim ke
+# /predict; --explain-ratio mencampurkan sebagian permintaan /explain untuk
+# memastikan jalur penjelasan tidak memperlambat jalur probabilitas.
+
+import argparse
+import json
+import random
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from jantung.schema import DATA_PATH, FITUR, RENTANG_NUMERIK
+
+
+def muat_pasien(n, seed=0):
+    df = pd.read_csv(DATA_PATH)[FITUR].sample(n=n, replace=True, random_state=seed)
+    for kolom, (batas_bawah, batas_atas) in RENTANG_NUMERIK.items():
+        df[kolom] = df[kolom].clip(batas_bawah, batas_atas)
+    return [{k: (v.item() if hasattr(v, 'item') else v) for k, v in r.items()} for r in df.to_dict('records')]
+
+
+def kirim(url, payload, timeout):
+    data = json.dumps(payload).encode('utf-8')
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    mulai = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            ok = resp.status == 200
+    except Exception:
+        ok = False
+    return ok, time.perf_counter() - mulai
+
+
+def ringkas(nama, hasil, durasi_total):
+    latensi = np.array([d for _, d in hasil]) * 1000
+    gagal = sum(1 for ok, _ in hasil if not ok)
+    if not len(latensi):
+        return
+    p50, p95, p99 = np.percentile(latensi, [50, 95, 99])
+    print(f"{nama:<9} n={len(hasil):<6} gagal={gagal:<4} "
+          f"rps={len(hasil) / durasi_total:8.1f} p50={p50:7.2f}ms p95={p95:7.2f}ms p99={p99:7.2f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test layanan REST prediksi jantung.")
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--explain-ratio', type=float, default=0.0,
+                        help="Proporsi permintaan yang dikirim ke /explain (0-1)")
+    parser.add_argument('--timeout', type=float, default=30.0)
+    args = parser.parse_args(argv)
+
+    pasien = muat_pasien(args.requests)
+    rng = random.Random(0)
+    tugas = [('explain' if rng.random() < args.explain_ratio else 'predict', p) for p in pasien]
+
+    mulai = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        futures = [(jenis, pool.submit(kirim, f"{args.url}/{jenis}", p, args.timeout)) for jenis, p in tugas]
+        hasil = {'predict': [], 'explain': []}
+        for jenis, future in futures:
+            hasil[jenis].append(future.result())
+    durasi_total = time.perf_counter() - mulai
+
+    for jenis in ('predict', 'explain'):
+        ringkas(jenis, hasil[jenis], durasi_total)
+    total_gagal = sum(1 for daftar in hasil.values() for ok, _ in daftar if not ok)
+    return 1 if total_gagal else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,240 @@
+# jantung/lookup.py
+#
+# Mode inferensi tabel lookup (HEART_INFERENCE=lookup). Forest hanya
+# membandingkan fitur dengan sejumlah ambang tetap, jadi setiap fitur (hasil
+# preprocessor) cukup dipetakan ke interval di antara ambang-ambang yang dipakai
+# forest ("bin"). Input form terbatas (Age 15-80, Oldpeak per 0.1, kategori
+# tetap), sehingga jumlah bin per fitur kecil.
+#
+# Untuk setiap bin, per pohon, dihitung sekali bitmask daun yang masih bisa
+# dicapai: node yang ambangnya terlewati (nilai > ambang) membuang seluruh daun
+# di subpohon kirinya. Skoring = binning (searchsorted), satu gather tabel per
+# fitur, AND antar fitur, daun keluar = bit terendah yang tersisa (daun
+# diurutkan kiri ke kanan), lalu rata-rata nilai daun. Tidak ada traversal
+# node, jadi biayanya tidak bergantung pada kedalaman pohon dan probabilitasnya
+# persis sama dengan pipeline.
+#
+# Tabel gabungan per pohon (satu entri per kombinasi bin semua fitur yang
+# dipakai pohon) tidak dipakai: untuk RF 200 pohon x depth 5 ukurannya ~39 juta
+# entri, sedangkan bitmask per bin cukup ~2 MB. Pohon maksimal 64 daun (uint64).
+#
+#   python -m jantung.lookup --repeat 500                # ukuran tabel, verifikasi heart.csv, latensi
+#   python -m jantung.lookup --verify --samples 200000   # verifikasi saja: heart.csv + sampel domain form
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from jantung.compiled import ModelTerkompilasi, PreprocessorTerkompilasi, verifikasi
+from jantung.schema import FITUR, KATEGORI, RENTANG_NUMERIK
+
+MAKS_DAUN = 64
+_BATAS_BARIS_KECIL = 8
+_SEMUA_BIT = np.uint64(0xFFFF_FFFF_FFFF_FFFF)
+
+
+def _urutan_daun(tree):
+    """Peringkat kiri-ke-kanan tiap daun dan rentang [awal, akhir) daun di subpohon kiri tiap node split."""
+    peringkat = np.full(tree.node_count, -1, dtype=np.intp)
+    rentang_kiri = {}
+    awal, akhir = {}, {}
+    n_daun = 0
+    # DFS iteratif: node dikunjungi lagi (selesai=True) setelah kedua anaknya
+    tumpukan = [(0, False)]
+    while tumpukan:
+        node, selesai = tumpukan.pop()
+        kiri, kanan = tree.children_left[node], tree.children_right[node]
+        if kiri == kanan:
+            peringkat[node] = n_daun
+            awal[node], akhir[node] = n_daun, n_daun + 1
+            n_daun += 1
+        elif selesai:
+            awal[node], akhir[node] = awal[kiri], akhir[kanan]
+            rentang_kiri[node] = (awal[kiri], akhir[kiri])
+        else:
+            tumpukan.extend([(node, True), (kanan, False), (kiri, False)])
+    return peringkat, rentang_kiri
+
+
+class ForestTabel:
+    """Forest sebagai tabel bitmask daun per (bin fitur, pohon) + nilai daun per pohon."""
+
+    def __init__(self, classifier):
+        if not hasattr(classifier, 'estimators_') or not hasattr(classifier.estimators_[0], 'tree_'):
+            raise ValueError(f"Hanya ensemble pohon yang bisa dijadikan tabel, bukan {type(classifier).__name__}")
+        trees = [estimator.tree_ for estimator in classifier.estimators_]
+        n_daun = max(tree.n_leaves for tree in trees)
+        if n_daun > MAKS_DAUN:
+            raise ValueError(f"Pohon dengan {n_daun} daun tidak didukung (maks. {MAKS_DAUN})")
+        self.classes_ = classifier.classes_
+        self.n_trees = len(trees)
+        n_fitur = classifier.n_features_in_
+
+        split = [tree.children_left != tree.children_right for tree in trees]
+        self.ambang = [np.unique(np.concatenate([tree.threshold[s][tree.feature[s] == j] for tree, s in zip(trees, split)]))
+                       for j in range(n_fitur)]
+        # Fitur yang tidak pernah dipakai split tidak ikut gather
+        self.fitur_dipakai = np.array([j for j in range(n_fitur) if len(self.ambang[j])], dtype=np.intp)
+        self.offset = np.cumsum([0] + [len(a) + 1 for a in self.ambang]).astype(np.intp)
+        # Ambang fitur yang dipakai sebagai satu matriks (padding +inf) untuk binning beberapa baris sekaligus
+        self._matriks_ambang = np.full((len(self.fitur_dipakai), max(len(a) for a in self.ambang)), np.inf)
+        for i, j in enumerate(self.fitur_dipakai):
+            self._matriks_ambang[i, :len(self.ambang[j])] = self.ambang[j]
+
+        self.tabel = np.full((self.offset[-1], self.n_trees), _SEMUA_BIT, dtype=np.uint64)
+        self.nilai_daun = np.zeros((self.n_trees, n_daun, len(self.classes_)))
+        self.node_daun = np.zeros((self.n_trees, n_daun), dtype=np.intp)
+        for t, (tree, s) in enumerate(zip(trees, split)):
+            peringkat, rentang_kiri = _urutan_daun(tree)
+            for node, (awal, akhir) in rentang_kiri.items():
+                j = tree.feature[node]
+                k = np.searchsorted(self.ambang[j], tree.threshold[node])
+                buang = np.uint64(((1 << akhir) - 1) ^ ((1 << awal) - 1))
+                # Bin b > k berarti nilai > ambang node ini: daun subpohon kirinya tidak tercapai
+                self.tabel[self.offset[j] + k + 1:self.offset[j + 1], t] &= ~buang
+            daun = np.flatnonzero(~s)
+            value = tree.value[daun, 0, :]
+            self.nilai_daun[t, peringkat[daun]] = value / value.sum(axis=1, keepdims=True)
+            self.node_daun[t, peringkat[daun]] = daun
+        self._pohon = np.arange(self.n_trees)
+
+    @property
+    def n_bin(self):
+        return int(self.offset[-1])
+
+    @property
+    def nbytes(self):
+        return self.tabel.nbytes + self.nilai_daun.nbytes + sum(a.nbytes for a in self.ambang)
+
+    def bin(self, X):
+        """Indeks baris tabel (n_rows, n_fitur_dipakai) untuk matriks fitur hasil preprocessor."""
+        # sklearn membandingkan fitur dalam float32 (x <= ambang -> kiri)
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.shape[0] <= _BATAS_BARIS_KECIL:
+            # Satu perbandingan matriks lebih murah daripada satu searchsorted per fitur
+            kurang = self._matriks_ambang < X[:, self.fitur_dipakai, None]
+            return self.offset[self.fitur_dipakai] + kurang.sum(axis=2)
+        idx = np.empty((X.shape[0], len(self.fitur_dipakai)), dtype=np.intp)
+        for i, j in enumerate(self.fitur_dipakai):
+            idx[:, i] = self.offset[j] + np.searchsorted(self.ambang[j], X[:, j], side='left')
+        return idx
+
+    def peringkat_daun(self, X):
+        """Peringkat (kiri ke kanan) daun keluar per pohon, (n_rows, n_trees)."""
+        mask = np.bitwise_and.reduce(self.tabel[self.bin(np.atleast_2d(X))], axis=1)
+        bit_terendah = mask & (~mask + np.uint64(1))
+        # 2**k tepat di float64, jadi eksponen frexp - 1 = k
+        return np.frexp(bit_terendah.astype(np.float64))[1] - 1
+
+    def apply(self, X):
+        """Indeks node daun per pohon (n_rows, n_trees), sama seperti RandomForestClassifier.apply."""
+        return self.node_daun[self._pohon, self.peringkat_daun(X)]
+
+    def predict_proba(self, X):
+        return self.nilai_daun[self._pohon, self.peringkat_daun(X)].mean(axis=1)
+
+
+class ModelTabel(ModelTerkompilasi):
+    """ModelTerkompilasi dengan ForestTabel sebagai pengganti traversal pohon."""
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.preprocessor = PreprocessorTerkompilasi(pipeline.named_steps['preprocessor'])
+        self.forest = ForestTabel(pipeline.named_steps['classifier'])
+        self.classes_ = self.forest.classes_
+
+
+def sampel_domain(n, seed=0):
+    """`n` pasien acak dari ruang input form prediksi (rentang number_input & opsi selectbox)."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for kolom in FITUR:
+        if kolom == 'Oldpeak':
+            batas_bawah, batas_atas = RENTANG_NUMERIK[kolom]
+            data[kolom] = np.round(rng.integers(round(batas_bawah * 10), round(batas_atas * 10) + 1, n) / 10, 1)
+        elif kolom in RENTANG_NUMERIK:
+            batas_bawah, batas_atas = RENTANG_NUMERIK[kolom]
+            data[kolom] = rng.integers(batas_bawah, batas_atas + 1, n)
+        else:
+            data[kolom] = np.asarray(KATEGORI[kolom], dtype=object)[rng.integers(0, len(KATEGORI[kolom]), n)]
+    return pd.DataFrame(data)
+
+
+def verifikasi_daun(pipeline, model, X):
+    """Jumlah (baris, pohon) yang daunnya berbeda dari classifier sklearn; AssertionError jika ada."""
+    diproses = pipeline.named_steps['preprocessor'].transform(X)
+    beda = int((model.forest.apply(diproses) != pipeline.named_steps['classifier'].apply(diproses)).sum())
+    if beda:
+        raise AssertionError(f"{beda} daun tabel berbeda dari traversal sklearn")
+    return beda
+
+
+def _persentil_ms(durasi):
+    durasi = np.asarray(durasi) * 1000
+    return np.percentile(durasi, 50), np.percentile(durasi, 99)
+
+
+def main(argv=None):
+    from jantung.artifacts import load_bundle
+    from jantung.schema import DATA_PATH
+
+    parser = argparse.ArgumentParser(description="Verifikasi dan benchmark inferensi tabel lookup.")
+    parser.add_argument('--verify', action='store_true',
+                        help="Hanya verifikasi (heart.csv + sampel domain form); exit code 1 jika berbeda")
+    parser.add_argument('--samples', type=int, default=100_000, help="Jumlah sampel domain form untuk --verify")
+    parser.add_argument('--repeat', type=int, default=300, help="Jumlah panggilan per mode untuk benchmark")
+    args = parser.parse_args(argv)
+
+    pipeline = load_bundle().model
+    mulai = time.perf_counter()
+    model = ModelTabel(pipeline)
+    forest = model.forest
+    print(f"Tabel: {forest.n_trees} pohon, {forest.n_bin} bin, {forest.nbytes / 1e6:.2f} MB, "
+          f"dibangun dalam {time.perf_counter() - mulai:.2f} detik")
+    df = pd.read_csv(DATA_PATH)
+
+    if args.verify:
+        sumber = [("heart.csv", df[FITUR])]
+        if args.samples:
+            sumber.append((f"domain form ({args.samples:,})", sampel_domain(args.samples)))
+        for nama, X in sumber:
+            try:
+                verifikasi_daun(pipeline, model, X)
+                selisih = verifikasi(pipeline, model, X)
+            except AssertionError as exc:
+                print(f"{nama}: GAGAL - {exc}")
+                return 1
+            print(f"{nama}: daun identik, selisih maks. probabilitas {selisih:.2e}")
+        return 0
+
+    print(f"Selisih maks. probabilitas (heart.csv): {verifikasi(pipeline, model, df[FITUR]):.2e}")
+    compiled = ModelTerkompilasi(pipeline)
+    baris = df[FITUR].sample(n=args.repeat, replace=True, random_state=0)
+    frames = [baris.iloc[[i]] for i in range(len(baris))]
+    records = baris.to_dict('records')
+    batch = [df[FITUR].sample(n=256, replace=True, random_state=i) for i in range(args.repeat)]
+    kandidat = [
+        ("pipeline.predict_proba(DataFrame)", lambda i: pipeline.predict_proba(frames[i])),
+        ("compiled.predict_proba(dict)", lambda i: compiled.predict_proba(records[i])),
+        ("lookup.predict_proba(dict)", lambda i: model.predict_proba(records[i])),
+        ("pipeline.predict_proba(batch 256)", lambda i: pipeline.predict_proba(batch[i])),
+        ("compiled.predict_proba(batch 256)", lambda i: compiled.predict_proba(batch[i])),
+        ("lookup.predict_proba(batch 256)", lambda i: model.predict_proba(batch[i])),
+    ]
+    for nama, fungsi in kandidat:
+        fungsi(0)
+        durasi = []
+        for i in range(args.repeat):
+            mulai = time.perf_counter()
+            fungsi(i)
+            durasi.append(time.perf_counter() - mulai)
+        p50, p99 = _persentil_ms(durasi)
+        print(f"{nama:<36} p50 {p50:7.3f} ms | p99 {p99:7.3f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+# jantung/memori.py
+#
+# Laporan memori per worker: representasi lama (DataFrame read_csv dengan
+# string object, matriks latih LIME padat di memori, pool perturbasi float64)
+# dibandingkan dengan representasi ringkas saat ini (store kolumnar dengan
+# kategori uint8 & int8/int16, matriks latih mmap dari bundle, pool uint8).
+#
+#   python -m jantung.memori
+#   python -m jantung.memori --output memori.json
+#
+# Ukuran komponen diukur di proses ini; peak RSS satu worker (model + dataset
+# + satu prediksi + satu penjelasan) diukur di proses baru untuk tiap mode.
+
+import argparse
+import json
+import subprocess
+import sys
+
+import numpy as np
+
+from jantung.schema import DATA_PATH, ROOT_DIR
+
+MODE = ('legacy', 'lean')
+
+# Dijalankan di proses baru agar peak RSS hanya mencerminkan satu worker
+_SKRIP_RSS = """
+import json, resource, sys
+sys.path.insert(0, {root!r})
+from jantung.schema import FITUR, DATA_PATH, MODEL_PATH
+if {mode!r} == 'legacy':
+    import joblib, lime.lime_tabular, pandas as pd
+    from jantung.artifacts import CLASS_NAMES, split_data
+    from jantung.store import KOLOM_KATEGORI
+    model = joblib.load(MODEL_PATH)
+    df = pd.read_csv(DATA_PATH, dtype={{k: object for k in KOLOM_KATEGORI}})
+    preprocessor = model.named_steps['preprocessor']
+    X_train = preprocessor.transform(split_data(df)[0])
+    explainer = lime.lime_tabular.LimeTabularExplainer(
+        X_train, feature_names=preprocessor.get_feature_names_out(), class_names=CLASS_NAMES,
+        mode='classification')
+    baris = df[FITUR].iloc[[0]]
+    model.predict_proba(baris)
+    explainer.explain_instance(preprocessor.transform(baris)[0], model.named_steps['classifier'].predict_proba,
+                               num_features=11, num_samples=2000)
+else:
+    from jantung.resources import muat_sumber_daya
+    sd = muat_sumber_daya()
+    baris = sd.df[FITUR].iloc[[0]]
+    sd.model.predict_proba(baris)
+    sd.explainer.explain(sd.preprocessor.transform(baris)[0])
+skala = 1024 * 1024 if sys.platform == 'darwin' else 1024
+print(json.dumps({{'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / skala}}))
+"""
+
+
+def ukuran_df(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def ukur_komponen(data_path=DATA_PATH):
+    """Byte per komponen untuk mode 'legacy' dan 'lean' (di proses ini)."""
+    import pandas as pd
+
+    from jantung.artifacts import load_bundle
+    from jantung.resources import muat_sumber_daya
+    from jantung.store import KOLOM_KATEGORI
+
+    sd = muat_sumber_daya(data_path)
+    bundle = load_bundle(version=sd.versi_model)
+    sd.explainer.explain(sd.preprocessor.transform(sd.df.iloc[[0]])[0])
+    pool_discrete, pool_proba = sd.explainer._pool
+    return {
+        'dataset': {
+            'legacy': ukuran_df(pd.read_csv(data_path, dtype={k: object for k in KOLOM_KATEGORI})),
+            'lean': ukuran_df(sd.df),
+        },
+        'X_train_processed': {
+            'legacy': int(bundle.X_train_processed.nbytes),
+            # mmap read-only: page dibagi lewat page cache, bukan milik worker
+            'lean': 0 if isinstance(bundle.X_train_processed, np.memmap) else int(bundle.X_train_processed.nbytes),
+        },
+        'explain_pool': {
+            'legacy': int(pool_discrete.size * np.dtype(np.float64).itemsize + pool_proba.nbytes),
+            'lean': int(pool_discrete.nbytes + pool_proba.nbytes),
+        },
+    }
+
+
+def ukur_rss(mode):
+    hasil = subprocess.run([sys.executable, '-c', _SKRIP_RSS.format(root=str(ROOT_DIR), mode=mode)],
+                           capture_output=True, text=True, cwd=ROOT_DIR)
+    if hasil.returncode != 0:
+        raise RuntimeError(f"Pengukuran RSS ({mode}) gagal:\n{hasil.stderr}")
+    return json.loads(hasil.stdout.strip().splitlines()[-1])['peak_rss_mb']
+
+
+def laporan(data_path=DATA_PATH, rss=True):
+    komponen = ukur_komponen(data_path)
+    return {
+        'components_bytes': komponen,
+        'total_bytes': {mode: sum(k[mode] for k in komponen.values()) for mode in MODE},
+        'peak_rss_mb': {mode: ukur_rss(mode) for mode in MODE} if rss else None,
+    }
+
+
+def _cetak(hasil):
+    print(f"{'komponen':<22}{'legacy':>14}{'lean':>14}{'hemat':>10}")
+    baris = list(hasil['components_bytes'].items()) + [('total', hasil['total_bytes'])]
+    for nama, nilai in baris:
+        hemat = 1 - nilai['lean'] / nilai['legacy'] if nilai['legacy'] else 0.0
+        print(f"{nama:<22}{nilai['legacy'] / 1024:>11.1f} KB{nilai['lean'] / 1024:>11.1f} KB{hemat:>10.0%}")
+    if hasil['peak_rss_mb']:
+        rss = hasil['peak_rss_mb']
+        print(f"{'peak RSS worker':<22}{rss['legacy']:>11.1f} MB{rss['lean']:>11.1f} MB"
+              f"{rss['legacy'] - rss['lean']:>+8.1f}MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Laporan memori per worker: representasi lama vs ringkas.")
+    parser.add_argument('--data', default=str(DATA_PATH), help="Path dataset CSV")
+    parser.add_argument('--no-rss', action='store_true', help="Lewati pengukuran peak RSS di proses baru")
+    parser.add_argument('--output', help="Tulis laporan JSON ke file ini")
+    args = parser.parse_args(argv)
+    hasil = laporan(args.data, rss=not args.no_rss)
+    _cetak(hasil)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(hasil, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
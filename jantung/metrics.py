@@ -0,0 +1,192 @@
+# jantung/metrics.py
+#
+# Instrumentasi jalur panas per tahap. Setiap tahap halaman (pipeline, LIME,
+# figur Plotly, render matplotlib, ...) diukur dengan
+#
+#   with ukur_tahap('predict', 'pipeline'):
+#       ...
+#
+# dan diagregasi ke histogram per (halaman, tahap). Histogram diekspos dalam
+# format teks Prometheus lewat server HTTP lokal kecil:
+#
+#   HEART_METRICS_PORT=9464 streamlit run app.py
+#   curl localhost:9464/metrics
+#
+# HEART_METRICS_PORT=0 mematikan server. Jika port sudah dipakai (mis. worker
+# lain di host yang sama), server tidak dijalankan dan metrik tetap bisa dilihat
+# di panel admin sidebar (HEART_ADMIN_PANEL=1).
+
+import contextlib
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+METRICS_PORT_DEFAULT = int(os.environ.get('HEART_METRICS_PORT', 9464))
+ADMIN_PANEL = os.environ.get('HEART_ADMIN_PANEL', '0') == '1'
+
+# Batas bucket dalam detik (gaya default klien Prometheus, dirapatkan di rentang ms)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Jumlah sampel terakhir per histogram untuk persentil di panel admin
+_JENDELA = 1024
+
+
+class Histogram:
+    """Histogram kumulatif thread-safe + jendela sampel terakhir."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counts = [0] * len(self.buckets)
+        self._sum = 0.0
+        self._count = 0
+        self._terakhir = deque(maxlen=_JENDELA)
+
+    def observe(self, detik):
+        with self._lock:
+            for i, batas in enumerate(self.buckets):
+                if detik <= batas:
+                    self._counts[i] += 1
+                    break
+            self._sum += detik
+            self._count += 1
+            self._terakhir.append(detik)
+
+    def snapshot(self):
+        with self._lock:
+            kumulatif = np.cumsum(self._counts).tolist()
+            return {
+                'buckets': list(zip(self.buckets, kumulatif)),
+                'sum': self._sum,
+                'count': self._count,
+                'recent': list(self._terakhir),
+            }
+
+
+class RegistriMetrik:
+    """Kumpulan histogram per (halaman, tahap) plus gauge dari fungsi callback."""
+
+    def __init__(self, nama='heart_stage_seconds'):
+        self.nama = nama
+        self._lock = threading.Lock()
+        self._histogram = {}
+        self._gauge = {}
+
+    def histogram(self, halaman, tahap):
+        kunci = (halaman, tahap)
+        with self._lock:
+            if kunci not in self._histogram:
+                self._histogram[kunci] = Histogram()
+            return self._histogram[kunci]
+
+    def observe(self, halaman, tahap, detik):
+        self.histogram(halaman, tahap).observe(detik)
+
+    @contextlib.contextmanager
+    def ukur_tahap(self, halaman, tahap):
+        mulai = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(halaman, tahap, time.perf_counter() - mulai)
+
+    def daftarkan_gauge(self, nama, fungsi, bantuan=''):
+        """Gauge `nama` yang nilainya (angka atau dict label -> angka) dibaca dari fungsi() saat scrape."""
+        with self._lock:
+            self._gauge[nama] = (fungsi, bantuan)
+
+    def ringkasan(self):
+        """Baris per (halaman, tahap): count, mean, p50, p95 (ms) dari jendela terakhir."""
+        with self._lock:
+            item = sorted(self._histogram.items())
+        baris = []
+        for (halaman, tahap), histogram in item:
+            snap = histogram.snapshot()
+            terakhir = np.asarray(snap['recent']) * 1000
+            baris.append({
+                'page': halaman, 'stage': tahap, 'count': snap['count'],
+                'mean_ms': snap['sum'] * 1000 / snap['count'] if snap['count'] else 0.0,
+                'p50_ms': float(np.percentile(terakhir, 50)) if terakhir.size else 0.0,
+                'p95_ms': float(np.percentile(terakhir, 95)) if terakhir.size else 0.0,
+            })
+        return baris
+
+    def prometheus(self):
+        """Semua metrik dalam format teks eksposisi Prometheus 0.0.4."""
+        with self._lock:
+            item = sorted(self._histogram.items())
+            gauge = dict(self._gauge)
+        baris = [f"# HELP {self.nama} Durasi tahap halaman dalam detik.", f"# TYPE {self.nama} histogram"]
+        for (halaman, tahap), histogram in item:
+            snap = histogram.snapshot()
+            label = f'page="{halaman}",stage="{tahap}"'
+            for batas, jumlah in snap['buckets']:
+                baris.append(f'{self.nama}_bucket{{{label},le="{batas:g}"}} {jumlah}')
+            baris.append(f'{self.nama}_bucket{{{label},le="+Inf"}} {snap["count"]}')
+            baris.append(f'{self.nama}_sum{{{label}}} {snap["sum"]:.9g}')
+            baris.append(f'{self.nama}_count{{{label}}} {snap["count"]}')
+        for nama, (fungsi, bantuan) in sorted(gauge.items()):
+            try:
+                nilai = fungsi()
+            except Exception:
+                continue
+            baris += [f"# HELP {nama} {bantuan}", f"# TYPE {nama} gauge"]
+            if isinstance(nilai, dict):
+                for kunci, v in sorted(nilai.items()):
+                    if isinstance(v, (int, float)):
+                        baris.append(f'{nama}{{key="{kunci}"}} {float(v):.9g}')
+            else:
+                baris.append(f"{nama} {float(nilai):.9g}")
+        return "\n".join(baris) + "\n"
+
+
+METRIK = RegistriMetrik()
+
+
+def ukur_tahap(halaman, tahap):
+    """Context manager pengukur tahap pada registri global METRIK."""
+    return METRIK.ukur_tahap(halaman, tahap)
+
+
+_server = None
+_server_dicoba = False
+_server_lock = threading.Lock()
+
+
+def mulai_server(port=METRICS_PORT_DEFAULT, host='127.0.0.1', registri=METRIK):
+    """Jalankan server /metrics di thread latar (sekali per proses). None jika dimatikan/port terpakai."""
+    global _server, _server_dicoba
+    if not port:
+        return None
+    with _server_lock:
+        if _server_dicoba:
+            return _server
+        _server_dicoba = True
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                isi = registri.prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(isi)))
+                self.end_headers()
+                self.wfile.write(isi)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            server = ThreadingHTTPServer((host, port), Handler)
+        except OSError:
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        _server = server
+        return server
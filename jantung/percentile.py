@@ -0,0 +1,185 @@
+# jantung/percentile.py
+#
+# Indeks persentil populasi: probabilitas out-of-fold untuk setiap baris
+# heart.csv, disimpan sebagai array terurut plus sub-indeks per Sex,
+# ChestPainType, dan kelompok usia. Halaman prediksi cukup melakukan binary
+# search (np.searchsorted) untuk menyatakan "lebih berisiko dari 82% dataset".
+#
+# Probabilitas out-of-fold (K-fold, pipeline bundle di-clone dan di-fit per
+# fold) disimpan per versi model di artifacts/<versi>/population_index.npz
+# bersama hash tiap baris. Indeks penuh (K kali fit ulang, beberapa detik)
+# dibangun sekali saat bundle dibuat (build_bundle, termasuk `registry register`
+# dan `train --register`), bukan di permintaan pengguna. Jika hanya dataset
+# yang berubah, baris yang hash-nya sudah ada dipakai ulang dan hanya baris
+# baru yang diskor (satu predict_proba dengan model aktif, yang memang tidak
+# pernah melihat baris itu). app.py hanya membaca indeks dan melakukan
+# pembaruan inkremental itu di memori (bangun=False, simpan=False).
+#
+#   python -m jantung.percentile                 # versi aktif
+#   python -m jantung.percentile --version <versi> --folds 5
+
+import argparse
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from jantung.artifacts import BUNDLE_DIR, current_version, load_bundle
+from jantung.schema import DATA_PATH, FITUR, TARGET
+from jantung.store import bentuk_kanonik
+
+INDEKS_FILE = "population_index.npz"
+N_FOLD_DEFAULT = 5
+BATAS_USIA = (40, 50, 60)
+LABEL_USIA = ('<40', '40-49', '50-59', '60+')
+STRATA = ('Sex', 'ChestPainType', 'AgeBand')
+
+
+def kelompok_usia(usia):
+    """Label kelompok usia ('<40', '40-49', '50-59', '60+'); skalar atau array."""
+    idx = np.searchsorted(BATAS_USIA, np.asarray(usia, dtype=float), side='right')
+    hasil = np.asarray(LABEL_USIA)[idx]
+    return str(hasil) if hasil.ndim == 0 else hasil
+
+
+def hash_baris(df):
+    """Hash uint64 per baris (fitur + target), stabil terhadap urutan baris dan dtype kolom."""
+    kolom = FITUR + ([TARGET] if TARGET in df.columns else [])
+    return pd.util.hash_pandas_object(bentuk_kanonik(df[kolom]), index=False).to_numpy(dtype=np.uint64)
+
+
+def prob_out_of_fold(pipeline, df, n_folds=N_FOLD_DEFAULT, random_state=42):
+    """Probabilitas kelas 1 tiap baris dari model yang di-fit tanpa baris itu."""
+    from sklearn.base import clone
+    from sklearn.model_selection import StratifiedKFold, cross_val_predict
+
+    cv = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=random_state)
+    prob = cross_val_predict(clone(pipeline), df[FITUR], df[TARGET], cv=cv, method='predict_proba')
+    return prob[:, 1].astype(np.float64)
+
+
+@dataclass
+class IndeksPersentil:
+    versi_model: str
+    prob: np.ndarray                                   # terurut naik
+    strata: dict = field(default_factory=dict)         # (dimensi, nilai) -> array terurut
+    n_baru: int = 0                                    # baris yang diskor saat pembaruan inkremental
+
+    @classmethod
+    def dari_prob(cls, versi_model, df, prob, n_baru=0):
+        nilai_strata = {'Sex': df['Sex'].astype(str).to_numpy(),
+                        'ChestPainType': df['ChestPainType'].astype(str).to_numpy(),
+                        'AgeBand': kelompok_usia(df['Age'].to_numpy())}
+        strata = {}
+        for dimensi in STRATA:
+            for nilai in np.unique(nilai_strata[dimensi]):
+                strata[(dimensi, str(nilai))] = np.sort(prob[nilai_strata[dimensi] == nilai])
+        return cls(versi_model=versi_model, prob=np.sort(prob), strata=strata, n_baru=n_baru)
+
+    def __len__(self):
+        return int(self.prob.size)
+
+    @staticmethod
+    def _persentil(terurut, prob):
+        # Bagian populasi dengan probabilitas lebih rendah ("lebih berisiko dari x%")
+        return float(np.searchsorted(terurut, prob, side='left')) / terurut.size if terurut.size else None
+
+    def persentil(self, prob):
+        return self._persentil(self.prob, prob)
+
+    def konteks(self, prob, pasien):
+        """{'all': {...}, 'Sex': {...}, ...}; tiap entri berisi group, n, dan percentile (0-1)."""
+        hasil = {'all': {'group': None, 'n': len(self), 'percentile': self.persentil(prob)}}
+        grup = {'Sex': str(pasien['Sex']), 'ChestPainType': str(pasien['ChestPainType']),
+                'AgeBand': kelompok_usia(pasien['Age'])}
+        for dimensi in STRATA:
+            terurut = self.strata.get((dimensi, grup[dimensi]), np.empty(0))
+            hasil[dimensi] = {'group': grup[dimensi], 'n': int(terurut.size),
+                              'percentile': self._persentil(terurut, prob)}
+        return hasil
+
+
+def _baca(path):
+    if not path.exists():
+        return None
+    with np.load(path) as data:
+        return {'hash': data['hash'], 'prob': data['prob'], 'oof': data['oof']}
+
+
+def _tulis(path, hash_, prob, oof):
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        np.savez(f, hash=hash_, prob=prob, oof=oof)
+    tmp.replace(path)
+
+
+def bangun_indeks(bundle_path, pipeline, df, n_folds=N_FOLD_DEFAULT):
+    """Hitung probabilitas out-of-fold seluruh `df` dan tulis indeks ke direktori bundle."""
+    _tulis(Path(bundle_path) / INDEKS_FILE, hash_baris(df), prob_out_of_fold(pipeline, df, n_folds),
+           np.ones(len(df), dtype=bool))
+
+
+def muat_atau_bangun(versi_model=None, df=None, model=None, out_dir=BUNDLE_DIR, data_path=DATA_PATH,
+                     n_folds=N_FOLD_DEFAULT, simpan=True, bangun=True):
+    """IndeksPersentil untuk (versi model, dataset), memakai ulang probabilitas yang tersimpan.
+
+    `model` (opsional) dipakai untuk menskor baris baru; default pipeline bundle.
+    Dengan `bangun=False` indeks penuh tidak pernah dihitung di sini: None jika
+    bundle belum punya indeks (lihat `python -m jantung.percentile`).
+    """
+    versi_model = versi_model or current_version(out_dir)
+    if df is None:
+        df = pd.read_csv(data_path)
+    path = Path(out_dir) / versi_model / INDEKS_FILE
+    hash_ = hash_baris(df)
+    lama = _baca(path)
+
+    if lama is not None and np.array_equal(lama['hash'], hash_):
+        return IndeksPersentil.dari_prob(versi_model, df, lama['prob'])
+
+    if lama is None and not bangun:
+        return None
+    if lama is None:
+        prob = prob_out_of_fold(load_bundle(out_dir, version=versi_model).model, df, n_folds)
+        oof = np.ones(len(df), dtype=bool)
+        n_baru = 0
+    else:
+        # Dataset berubah: probabilitas baris lama dipakai ulang berdasarkan hash
+        posisi = {int(h): i for i, h in enumerate(lama['hash'])}
+        idx_lama = np.fromiter((posisi.get(int(h), -1) for h in hash_), dtype=np.int64, count=len(hash_))
+        baru = idx_lama < 0
+        prob = np.where(baru, np.nan, lama['prob'][np.maximum(idx_lama, 0)])
+        oof = np.where(baru, False, lama['oof'][np.maximum(idx_lama, 0)])
+        n_baru = int(baru.sum())
+        if n_baru:
+            model = model or load_bundle(out_dir, version=versi_model).model
+            prob[baru] = model.predict_proba(df.loc[baru, FITUR])[:, 1]
+    if simpan:
+        _tulis(path, hash_, prob, oof)
+    return IndeksPersentil.dari_prob(versi_model, df, prob, n_baru=n_baru)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bangun/perbarui indeks persentil risiko populasi.")
+    parser.add_argument('--version', help="Versi bundle (default: versi aktif)")
+    parser.add_argument('--data', default=str(DATA_PATH), help="Path dataset CSV")
+    parser.add_argument('--out', default=str(BUNDLE_DIR), help="Direktori bundle")
+    parser.add_argument('--folds', type=int, default=N_FOLD_DEFAULT, help="Jumlah fold out-of-fold")
+    parser.add_argument('--rebuild', action='store_true', help="Abaikan indeks tersimpan, hitung ulang semua")
+    args = parser.parse_args(argv)
+
+    versi = args.version or current_version(args.out)
+    path = Path(args.out) / versi / INDEKS_FILE
+    if args.rebuild and path.exists():
+        path.unlink()
+    indeks = muat_atau_bangun(versi, pd.read_csv(args.data), out_dir=args.out, n_folds=args.folds)
+    print(f"Indeks {versi}: {len(indeks)} baris ({indeks.n_baru} baru), {len(indeks.strata)} sub-indeks -> {path}")
+    for kuantil in (0.25, 0.5, 0.75, 0.9):
+        print(f"  p{kuantil * 100:.0f} probabilitas: {np.quantile(indeks.prob, kuantil):.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,360 @@
+# jantung/registry.py
+#
+# Registry model di atas bundle artefak (jantung/artifacts.py). Setiap pipeline
+# .pkl didaftarkan sebagai bundle sendiri, lalu dicatat di
+# artifacts/registry.json bersama ukuran file, waktu muat, latensi skoring satu
+# pasien (p50/p99), serta akurasi & recall pada heart.csv (split uji yang sama
+# dengan pelatihan, dan seluruh dataset). Dengan data itu operator bisa memilih
+# model yang lebih kecil/cepat bila selisih akurasinya bisa diterima.
+#
+#   python -m jantung.registry register model_pipeline_terbaik_1.pkl
+#   python -m jantung.registry register --all
+#   python -m jantung.registry list
+#   python -m jantung.registry activate <versi>
+#
+# `activate` hanya mengganti penunjuk CURRENT secara atomik. Worker yang sedang
+# berjalan (Streamlit maupun jantung/api.py) memakai PengelolaModel, yang
+# memeriksa CURRENT paling sering tiap HEART_MODEL_POLL_S detik dan menukar
+# model aktif tanpa restart. Model lama tetap di memori sampai semua permintaan
+# yang sedang memakainya selesai, baru kemudian dilepas. Jika versi baru gagal
+# dimuat (bundle rusak/tidak kompatibel), kesalahannya dicatat di log dan di
+# status(), model lama tetap dilayani, dan versi itu tidak dicoba lagi di setiap
+# poll (hanya lewat sinkron(paksa=True) atau tukar()).
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from jantung.artifacts import BUNDLE_DIR, aktifkan_versi, build_bundle, current_version
+from jantung.schema import DATA_PATH, FITUR, ROOT_DIR, TARGET
+
+REGISTRY_FILE = "registry.json"
+POLL_DEFAULT = float(os.environ.get('HEART_MODEL_POLL_S', 5))
+
+_log = logging.getLogger(__name__)
+
+
+def _path_registry(out_dir):
+    return Path(out_dir) / REGISTRY_FILE
+
+
+def baca_registry(out_dir=BUNDLE_DIR):
+    """Isi registry: {versi: entri}. Kosong jika belum ada model yang didaftarkan."""
+    path = _path_registry(out_dir)
+    if not path.exists():
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _tulis_registry(registry, out_dir):
+    path = _path_registry(out_dir)
+    tmp = path.with_suffix('.json.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(registry, f, indent=2)
+    tmp.replace(path)
+
+
+def _metrik_klasifikasi(model, X, y):
+    pred = np.asarray(model.predict(X))
+    y = np.asarray(y)
+    positif = y == 1
+    return {
+        'accuracy': float((pred == y).mean()),
+        'recall': float((pred[positif] == 1).mean()) if positif.any() else None,
+    }
+
+
+def evaluasi_bundle(version, data_path=DATA_PATH, out_dir=BUNDLE_DIR, repeat=200):
+    """Ukuran, waktu muat, latensi satu pasien, dan akurasi bundle `version`."""
+    import pandas as pd
+
+    from jantung.artifacts import load_bundle, split_data
+    from jantung.compiled import INFERENCE_MODE, siapkan_model
+
+    mulai = time.perf_counter()
+    bundle = load_bundle(out_dir, version=version)
+    waktu_muat = time.perf_counter() - mulai
+    model = siapkan_model(bundle.model)
+
+    df = pd.read_csv(data_path)
+    _, X_test, _, y_test = split_data(df)
+    baris = df[FITUR].sample(n=repeat, replace=True, random_state=0)
+    frames = [baris.iloc[[i]] for i in range(len(baris))]
+    model.predict_proba(frames[0])
+    durasi = []
+    for frame in frames:
+        t0 = time.perf_counter()
+        model.predict_proba(frame)
+        durasi.append(time.perf_counter() - t0)
+    durasi = np.asarray(durasi) * 1000
+
+    sumber = ROOT_DIR / bundle.manifest['model_file']
+    return {
+        'version': version,
+        'model_file': bundle.manifest['model_file'],
+        'classifier': type(bundle.model.named_steps['classifier']).__name__,
+        'model_bytes': sumber.stat().st_size if sumber.exists() else None,
+        'bundle_bytes': sum(p.stat().st_size for p in bundle.path.iterdir() if p.is_file()),
+        'load_s': waktu_muat,
+        'inference_mode': INFERENCE_MODE if model is not bundle.model else 'pipeline',
+        'latency_ms_p50': float(np.percentile(durasi, 50)),
+        'latency_ms_p99': float(np.percentile(durasi, 99)),
+        'test': _metrik_klasifikasi(model, X_test[FITUR], y_test),
+        'full': _metrik_klasifikasi(model, df[FITUR], df[TARGET]),
+        'evaluated': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+def daftarkan(model_path, data_path=DATA_PATH, out_dir=BUNDLE_DIR, aktifkan=False, repeat=200):
+    """Bangun bundle untuk `model_path`, ukur, dan catat di registry. Mengembalikan entrinya."""
+    bundle_path = build_bundle(model_path, data_path, out_dir, aktifkan=aktifkan)
+    entri = evaluasi_bundle(bundle_path.name, data_path, out_dir, repeat=repeat)
+    registry = baca_registry(out_dir)
+    registry[entri['version']] = entri
+    _tulis_registry(registry, out_dir)
+    return entri
+
+
+def aktifkan(version, out_dir=BUNDLE_DIR):
+    """Jadikan `version` model aktif; worker yang berjalan menukarnya pada poll berikutnya."""
+    aktifkan_versi(version, out_dir)
+
+
+class _Entri:
+    def __init__(self, sumber_daya):
+        self.sd = sumber_daya
+        self.inflight = 0
+        self.pensiun = False
+        self.lampiran = {}
+
+
+class PengelolaModel:
+    """Pemegang SumberDaya aktif dengan hot-swap dan pelepasan setelah drain.
+
+    Pemakaian per permintaan:
+
+        with pengelola.sewa() as sd:
+            sd.model.predict_proba(...)
+
+    Objek per versi yang butuh dibersihkan (batcher, process pool penjelasan)
+    dibuat oleh `pabrik_lampiran` ({nama: pabrik(sumber_daya)}) saat versi
+    dimuat, di luar lock, lalu dibaca lewat lampiran(); close()/shutdown()
+    miliknya dipanggil saat versi itu dilepas.
+    """
+
+    def __init__(self, sumber_daya=None, out_dir=BUNDLE_DIR, poll_s=POLL_DEFAULT, pemuat=None,
+                 pabrik_lampiran=None):
+        if pemuat is None:
+            from jantung.resources import muat_sumber_daya as pemuat
+        self.out_dir = out_dir
+        self.poll_s = poll_s
+        self._pemuat = pemuat
+        self._lock = threading.Lock()
+        self._lock_tukar = threading.Lock()
+        self._cek_terakhir = time.monotonic()
+        self._pabrik_lampiran = dict(pabrik_lampiran or {})
+        awal = self._entri_baru(sumber_daya or pemuat(version=current_version(out_dir)))
+        self._aktif = awal
+        self._entri = {awal.sd.versi_model: awal}
+        # {versi: pesan kesalahan} untuk versi yang gagal dimuat; tidak dicoba ulang tiap poll
+        self._gagal = {}
+        self.swaps = 0
+
+    def _entri_baru(self, sumber_daya):
+        # Lampiran dibuat sebelum versi aktif (mis. process pool penjelasan langsung dipanaskan)
+        entri = _Entri(sumber_daya)
+        try:
+            for nama, pabrik in self._pabrik_lampiran.items():
+                entri.lampiran[nama] = pabrik(sumber_daya)
+        except Exception:
+            for objek in entri.lampiran.values():
+                _tutup(objek)
+            raise
+        return entri
+
+    @property
+    def aktif(self):
+        return self._aktif.sd
+
+    @contextlib.contextmanager
+    def sewa(self):
+        """Pinjam SumberDaya aktif; versi ini tidak dilepas selama blok berjalan."""
+        self.sinkron()
+        with self._lock:
+            entri = self._aktif
+            entri.inflight += 1
+        try:
+            yield entri.sd
+        finally:
+            with self._lock:
+                entri.inflight -= 1
+                lepas = entri.pensiun and entri.inflight == 0
+            if lepas:
+                self._lepas(entri)
+
+    def sinkron(self, paksa=False):
+        """Tukar model bila CURRENT menunjuk versi lain (paling sering tiap poll_s detik)."""
+        if not paksa and (self.poll_s <= 0 or time.monotonic() - self._cek_terakhir < self.poll_s):
+            return False
+        self._cek_terakhir = time.monotonic()
+        try:
+            versi = current_version(self.out_dir)
+        except FileNotFoundError:
+            return False
+        if versi == self._aktif.sd.versi_model or (versi in self._gagal and not paksa):
+            return False
+        return self.tukar(versi, blok=paksa)
+
+    def tukar(self, versi, blok=True):
+        """Muat `versi` lalu jadikan aktif secara atomik.
+
+        False jika penukaran lain sedang berjalan atau `versi` gagal dimuat
+        (dicatat di log dan status(); model aktif tetap dilayani).
+        """
+        if not self._lock_tukar.acquire(blocking=blok):
+            return False
+        try:
+            with self._lock:
+                entri = self._entri.get(versi)
+            if entri is None:
+                # Muat di luar lock: permintaan lain tetap dilayani model lama selama pemuatan
+                try:
+                    entri = self._entri_baru(self._pemuat(version=versi))
+                except Exception as exc:
+                    _log.error("Versi model %s gagal dimuat, tetap memakai %s: %r", versi,
+                               self._aktif.sd.versi_model, exc, exc_info=exc)
+                    with self._lock:
+                        self._gagal[versi] = repr(exc)
+                    return False
+            with self._lock:
+                self._gagal.pop(versi, None)
+                if entri is self._aktif:
+                    return False
+                lama, self._aktif = self._aktif, entri
+                entri.pensiun = False
+                self._entri[versi] = entri
+                lama.pensiun = True
+                lepas = lama.inflight == 0
+                self.swaps += 1
+            if lepas:
+                self._lepas(lama)
+            return True
+        finally:
+            self._lock_tukar.release()
+
+    def _lepas(self, entri):
+        with self._lock:
+            if not entri.pensiun or entri.inflight or self._entri.get(entri.sd.versi_model) is not entri:
+                return
+            del self._entri[entri.sd.versi_model]
+            lampiran, entri.lampiran = entri.lampiran, {}
+        for objek in lampiran.values():
+            _tutup(objek)
+
+    def lampiran(self, versi, nama, pabrik):
+        """Objek per versi, dibersihkan saat versi dilepas. KeyError jika `versi` sudah dilepas.
+
+        Lampiran yang tidak dibuat saat versi dimuat (lihat `pabrik_lampiran`)
+        dibuat sekali dengan pabrik(), di luar lock agar sewa() lain tidak tertahan.
+        """
+        with self._lock:
+            entri = self._entri.get(versi)
+            objek = entri.lampiran.get(nama) if entri is not None else None
+        if entri is None:
+            raise KeyError(f"Versi model {versi} sudah dilepas")
+        if objek is not None:
+            return objek
+        baru = pabrik()
+        with self._lock:
+            dilepas = self._entri.get(versi) is not entri
+            objek = None if dilepas else entri.lampiran.setdefault(nama, baru)
+        if objek is not baru:
+            # Kalah balapan dengan pemanggil lain, atau versi dilepas selama pembuatan
+            _tutup(baru)
+        if dilepas:
+            raise KeyError(f"Versi model {versi} sudah dilepas")
+        return objek
+
+    def status(self):
+        with self._lock:
+            return {
+                'active': self._aktif.sd.versi_model,
+                'swaps': self.swaps,
+                'resident': {versi: {'inflight': e.inflight, 'retired': e.pensiun}
+                             for versi, e in self._entri.items()},
+                'failed': dict(self._gagal),
+            }
+
+
+def _tutup(objek):
+    for nama in ('close', 'shutdown'):
+        if hasattr(objek, nama):
+            getattr(objek, nama)()
+            break
+
+
+def _cetak_registry(registry, aktif):
+    print(f"{'':2}{'versi':<24}{'model':<30}{'kelas':<24}{'ukuran':>10}{'muat':>8}"
+          f"{'p50 ms':>9}{'p99 ms':>9}{'acc uji':>9}{'recall':>8}")
+    for versi, e in sorted(registry.items()):
+        ukuran = f"{e['model_bytes'] / 1024:.0f} KB" if e.get('model_bytes') else '-'
+        print(f"{'*' if versi == aktif else '':2}{versi:<24}{e['model_file']:<30}{e['classifier']:<24}"
+              f"{ukuran:>10}{e['load_s']:>7.2f}s{e['latency_ms_p50']:>9.2f}{e['latency_ms_p99']:>9.2f}"
+              f"{e['test']['accuracy']:>9.3f}{e['test']['recall']:>8.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Registry model: daftarkan, bandingkan, dan aktifkan bundle.")
+    parser.add_argument('--out', default=str(BUNDLE_DIR), help="Direktori bundle")
+    sub = parser.add_subparsers(dest='perintah', required=True)
+
+    p_reg = sub.add_parser('register', help="Bangun bundle + ukur satu atau semua pipeline .pkl")
+    p_reg.add_argument('models', nargs='*', help="Path pipeline .pkl")
+    p_reg.add_argument('--all', action='store_true', help="Semua model_pipeline_terbaik*.pkl di root repo")
+    p_reg.add_argument('--data', default=str(DATA_PATH), help="Path dataset CSV")
+    p_reg.add_argument('--activate', action='store_true', help="Jadikan model (terakhir) aktif")
+    p_reg.add_argument('--repeat', type=int, default=200, help="Jumlah panggilan untuk latensi")
+
+    sub.add_parser('list', help="Tampilkan registry")
+
+    p_act = sub.add_parser('activate', help="Ganti model aktif (atomik, tanpa restart worker)")
+    p_act.add_argument('version')
+
+    args = parser.parse_args(argv)
+    if args.perintah == 'register':
+        models = list(args.models)
+        if args.all:
+            models += [str(p) for p in sorted(ROOT_DIR.glob('model_pipeline_terbaik*.pkl'))]
+        if not models:
+            parser.error("sebutkan path model atau --all")
+        for i, model_path in enumerate(models):
+            entri = daftarkan(model_path, args.data, args.out,
+                              aktifkan=args.activate and i == len(models) - 1, repeat=args.repeat)
+            print(f"Terdaftar: {entri['version']} ({entri['model_file']})")
+    elif args.perintah == 'activate':
+        if args.version not in baca_registry(args.out):
+            print(f"Peringatan: {args.version} belum diukur (jalankan 'register')", file=sys.stderr)
+        aktifkan(args.version, args.out)
+        print(f"Model aktif: {args.version}")
+        return 0
+
+    registry = baca_registry(args.out)
+    try:
+        aktif = current_version(args.out)
+    except FileNotFoundError:
+        aktif = None
+    _cetak_registry(registry, aktif)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
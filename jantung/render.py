@@ -0,0 +1,32 @@
+# jantung/render.py
+#
+# Renderer penjelasan tanpa matplotlib. Grafik kontribusi fitur dibangun
+# langsung dari explanation.as_list(label) sebagai bar Plotly (dirender di
+# browser), atau sebagai payload JSON ringkas untuk API/klien lain. Berlaku
+# untuk semua objek dengan API as_list: lime Explanation, PenjelasanTree, dan
+# PenjelasanGlobal.
+
+import plotly.graph_objects as go
+
+WARNA_MENDUKUNG = '#FF4B4B'   # bobot > 0: mendukung kelas yang dijelaskan
+WARNA_MENENTANG = '#1E88E5'
+
+
+def payload_penjelasan(explanation, label=1):
+    """[{'feature': ..., 'weight': ...}, ...] berurutan dari kontribusi terbesar."""
+    return [{'feature': str(nama), 'weight': float(bobot)} for nama, bobot in explanation.as_list(label=label)]
+
+
+def figur_penjelasan(explanation, judul, label=1):
+    """Bar horizontal Plotly; fitur paling berpengaruh di atas, merah = mendukung."""
+    payload = explanation if isinstance(explanation, list) else payload_penjelasan(explanation, label)
+    # Sumbu kategori Plotly digambar dari bawah, jadi urutan dibalik
+    baris = payload[::-1]
+    bobot = [b['weight'] for b in baris]
+    fig = go.Figure(go.Bar(
+        x=bobot, y=[b['feature'] for b in baris], orientation='h',
+        marker_color=[WARNA_MENDUKUNG if w > 0 else WARNA_MENENTANG for w in bobot],
+        hovertemplate='%{y}<br>%{x:.4f}<extra></extra>'))
+    fig.update_layout(title_text=judul, height=120 + 32 * len(baris), margin=dict(l=10, r=10, t=50, b=10),
+                      yaxis={'automargin': True}, xaxis={'zeroline': True, 'zerolinecolor': 'gray'})
+    return fig
@@ -0,0 +1,49 @@
+# jantung/resources.py
+#
+# Pemuatan sumber daya bersama (model, mesin penjelasan, preprocessor, dataset)
+# tanpa ketergantungan ke Streamlit. Dipakai lewat PengelolaModel
+# (jantung/registry.py) oleh sewa_sumber_daya() di app.py maupun oleh layanan
+# REST (jantung/api.py), sehingga keduanya memuat model dengan cara yang
+# persis sama. Dataset dibaca dari store kolumnar
+# (jantung/store.py), yang meng-ingest baris baru heart.csv secara inkremental.
+
+from dataclasses import dataclass
+
+import pandas as pd
+
+from jantung.artifacts import buat_explainer
+from jantung.compiled import siapkan_model
+from jantung.explain import MesinPenjelasan
+from jantung.schema import DATA_PATH
+from jantung.shared import muat_bundle
+from jantung.store import STORE_DIR, AgregatBerjalan, buka_store
+
+
+@dataclass
+class SumberDaya:
+    model: object
+    explainer: MesinPenjelasan
+    preprocessor: object
+    df: pd.DataFrame
+    versi_model: str
+    agregat: AgregatBerjalan = None
+
+
+def muat_sumber_daya(data_path=DATA_PATH, version=None, store_dir=STORE_DIR):
+    """Muat bundle artefak (default: versi aktif) + dataset. FileNotFoundError jika salah satunya tidak ada."""
+    # HEART_INFERENCE=shared -> forest & matriks latih dibuka mmap dari file bersama (jantung/shared.py)
+    bundle = muat_bundle(version=version)
+    store = buka_store(data_path, store_dir)
+    if not len(store):
+        raise FileNotFoundError(f"Dataset tidak ditemukan: {data_path}")
+    # df.attrs['sha256'] berisi sidik store (berubah di setiap append), dipakai sebagai kunci cache
+    df = store.dataframe()
+    # HEART_INFERENCE=compiled -> forest & preprocessor dalam array datar (jantung/compiled.py),
+    # HEART_INFERENCE=lookup -> forest sebagai tabel lookup per bin ambang (jantung/lookup.py)
+    model = siapkan_model(bundle.model)
+    preprocessor = getattr(model, 'preprocessor', bundle.preprocessor)
+    # Mode 'fast'/'accurate'/'tree' dan budget sampel diatur lewat HEART_EXPLAIN_MODE,
+    # HEART_LIME_FAST_SAMPLES, dan HEART_LIME_SAMPLES (lihat jantung/explain.py)
+    explainer = MesinPenjelasan(buat_explainer(bundle), model.named_steps['classifier'])
+    return SumberDaya(model=model, explainer=explainer, preprocessor=preprocessor, df=df,
+                      versi_model=bundle.version, agregat=store.agregat)
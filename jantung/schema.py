@@ -0,0 +1,157 @@
+# jantung/schema.py
+
+from pathlib import Path
+
+import numpy as np
+
+# ==============================================================================
+# SKEMA INPUT, PATH DEFAULT, DAN AMBANG RISIKO
+# ==============================================================================
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+MODEL_PATH = ROOT_DIR / "model_pipeline_terbaik.pkl"
+DATA_PATH = ROOT_DIR / "heart.csv"
+
+TARGET = 'HeartDisease'
+
+# Urutan kolom sama dengan DataFrame yang dibuat di halaman prediksi
+FITUR = ['Age', 'Sex', 'ChestPainType', 'RestingBP', 'Cholesterol', 'FastingBS',
+         'RestingECG', 'MaxHR', 'ExerciseAngina', 'Oldpeak', 'ST_Slope']
+
+# Rentang yang sama dengan number_input pada 'prediction_form'
+RENTANG_NUMERIK = {
+    'Age': (15, 80),
+    'RestingBP': (80, 200),
+    'Cholesterol': (100, 600),
+    'MaxHR': (70, 205),
+    'Oldpeak': (-2.0, 6.5),
+}
+
+# Batas nilai yang masih mungkin secara fisiologis untuk skoring file
+# (validasi_baris). Lebih longgar dari RENTANG_NUMERIK karena heart.csv memuat
+# nilai di luar rentang form (mis. RestingBP/Cholesterol 0 untuk data kosong).
+BATAS_FISIOLOGIS = {
+    'Age': (0, 120),
+    'RestingBP': (0, 300),
+    'Cholesterol': (0, 1000),
+    'MaxHR': (0, 250),
+    'Oldpeak': (-10.0, 10.0),
+}
+
+# Opsi yang sama dengan selectbox pada 'prediction_form'
+KATEGORI = {
+    'Sex': ['M', 'F'],
+    'ChestPainType': ['ATA', 'NAP', 'ASY', 'TA'],
+    'FastingBS': [0, 1],
+    'RestingECG': ['Normal', 'ST', 'LVH'],
+    'ExerciseAngina': ['Y', 'N'],
+    'ST_Slope': ['Up', 'Flat', 'Down'],
+}
+
+# Ambang kategori risiko (lihat 'risk_key_*' pada TRANSLATIONS)
+AMBANG_SEDANG = 0.25
+AMBANG_TINGGI = 0.46
+BAND_RISIKO = np.array(['low', 'medium', 'high'])
+
+
+def band_risiko(prob):
+    """Petakan probabilitas sakit jantung (0-1) ke 'low' / 'medium' / 'high'.
+
+    Menerima skalar maupun array; untuk skalar mengembalikan string.
+    """
+    idx = np.searchsorted([AMBANG_SEDANG, AMBANG_TINGGI], np.asarray(prob, dtype=float), side='right')
+    hasil = BAND_RISIKO[idx]
+    return str(hasil) if hasil.ndim == 0 else hasil
+
+
+def cek_kolom(df):
+    """Pastikan semua kolom FITUR ada; lempar ValueError jika ada yang hilang."""
+    hilang = [kolom for kolom in FITUR if kolom not in df.columns]
+    if hilang:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {', '.join(hilang)}")
+
+
+def validasi_pasien(record):
+    """Validasi satu pasien terhadap rentang & opsi form prediksi.
+
+    Mengembalikan dict bertipe bersih (urutan FITUR). Semua kesalahan
+    dikumpulkan dan dilempar sekaligus sebagai ValueError.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Data pasien harus berupa objek JSON")
+    bersih, kesalahan = {}, []
+    for kolom in FITUR:
+        if kolom not in record or record[kolom] is None:
+            kesalahan.append(f"{kolom}: wajib diisi")
+            continue
+        nilai = record[kolom]
+        if kolom in RENTANG_NUMERIK:
+            batas_bawah, batas_atas = RENTANG_NUMERIK[kolom]
+            try:
+                angka = float(nilai)
+            except (TypeError, ValueError):
+                kesalahan.append(f"{kolom}: harus berupa angka")
+                continue
+            if kolom != 'Oldpeak' and not angka.is_integer():
+                kesalahan.append(f"{kolom}: harus bilangan bulat")
+                continue
+            nilai = angka if kolom == 'Oldpeak' else int(angka)
+            if not batas_bawah <= nilai <= batas_atas:
+                kesalahan.append(f"{kolom}: harus di antara {batas_bawah} dan {batas_atas}")
+                continue
+        elif nilai not in KATEGORI[kolom]:
+            kesalahan.append(f"{kolom}: harus salah satu dari {KATEGORI[kolom]}")
+            continue
+        bersih[kolom] = nilai
+    if kesalahan:
+        raise ValueError("; ".join(kesalahan))
+    return bersih
+
+
+def validasi_baris(df):
+    """Validasi skema per baris untuk satu DataFrame (mis. chunk file unggahan).
+
+    Kolom FITUR harus ada (cek_kolom). Berbeda dengan validasi_pasien(),
+    rentang number_input tidak diperiksa: heart.csv sendiri memuat nilai di
+    luar rentang form (mis. Cholesterol 0) dan model dilatih dengannya. Yang
+    diperiksa: wajib diisi, numerik hingga (bulat kecuali Oldpeak) di dalam
+    BATAS_FISIOLOGIS, dan opsi kategori.
+    Mengembalikan (bersih, kesalahan):
+    DataFrame FITUR bertipe bersih dan Series pesan kesalahan per baris
+    ('' untuk baris yang valid). Nilai baris yang tidak valid di `bersih`
+    tidak bermakna dan tidak boleh diskor.
+    """
+    import pandas as pd
+
+    cek_kolom(df)
+    bersih = pd.DataFrame(index=df.index)
+    kesalahan = pd.Series('', index=df.index, dtype=object)
+
+    def catat(salah, pesan):
+        kesalahan[salah] = kesalahan[salah] + pesan + "; "
+
+    for kolom in FITUR:
+        nilai = df[kolom]
+        kosong = nilai.isna()
+        catat(kosong, f"{kolom}: wajib diisi")
+        if kolom in RENTANG_NUMERIK:
+            angka = pd.to_numeric(nilai, errors='coerce')
+            bukan_angka = angka.isna() & ~kosong
+            catat(bukan_angka, f"{kolom}: harus berupa angka")
+            hingga = angka.notna() & np.isfinite(angka)
+            catat(angka.notna() & ~hingga, f"{kolom}: harus berupa angka hingga")
+            batas_bawah, batas_atas = BATAS_FISIOLOGIS[kolom]
+            catat(hingga & ~angka.between(batas_bawah, batas_atas),
+                  f"{kolom}: di luar batas wajar ({batas_bawah} sampai {batas_atas})")
+            if kolom != 'Oldpeak':
+                catat(hingga & (angka % 1 != 0), f"{kolom}: harus bilangan bulat")
+            # Nilai tak hingga/di luar batas diganti 0 sebelum cast (baris itu tidak diskor)
+            angka = angka.where(hingga & angka.between(batas_bawah, batas_atas), 0)
+            bersih[kolom] = angka.astype(float) if kolom == 'Oldpeak' else angka.astype(int)
+        else:
+            opsi = KATEGORI[kolom]
+            if isinstance(opsi[0], int):
+                nilai = pd.to_numeric(nilai, errors='coerce')
+            catat(~nilai.isin(opsi) & ~kosong, f"{kolom}: harus salah satu dari {opsi}")
+            bersih[kolom] = nilai.fillna(0).astype(int) if isinstance(opsi[0], int) else nilai
+    return bersih, kesalahan.str.removesuffix("; ")
@@ -0,0 +1,74 @@
+# jantung/session.py
+#
+# Penyimpan hasil prediksi per sesi Streamlit. Setiap interaksi widget
+# menjalankan ulang skrip dari atas; tanpa penyimpan ini hasil prediksi hanya
+# tampil pada run yang men-submit form dan hilang pada rerun berikutnya (ganti
+# bahasa, widget lain, pindah halaman lalu kembali).
+#
+# st.session_state hidup di memori server selama sesi terbuka, jadi yang
+# disimpan dibuat ringkas: input pasien, probabilitas, band risiko, dan payload
+# penjelasan (pasangan fitur/bobot dari jantung/render.py, bukan objek lime
+# Explanation). Konteks persentil cukup dihitung ulang (binary search). Figur
+# Plotly dibangun dari nilai-nilai ini lewat cache figur tingkat proses di
+# app.py, bukan disimpan per sesi.
+# Kapasitas per sesi kecil (LRU), sehingga submit ulang input yang baru saja
+# dipakai (klik ganda, kembali ke input sebelumnya) tidak menghitung ulang.
+
+from collections import OrderedDict
+from dataclasses import dataclass
+
+KAPASITAS_DEFAULT = 4
+
+
+@dataclass
+class HasilSesi:
+    kunci: tuple                 # kunci_pasien(pasien, '<versi model>/<mode penjelasan>')
+    pasien: dict
+    prob_sakit: float
+    risk_band: str
+    penjelasan: tuple = None     # payload_tuple(payload_penjelasan(...)); None = belum selesai
+    fallback: str = False        # False, atau alasan fallback dari EksekutorPenjelasan.hasil() ('timeout' / 'error')
+
+    @property
+    def versi(self):
+        return self.kunci[0]
+
+
+def payload_tuple(payload):
+    """Payload penjelasan (list dict) -> tuple (fitur, bobot) yang hashable, untuk kunci cache figur."""
+    return tuple((b['feature'], b['weight']) for b in payload)
+
+
+def payload_list(penjelasan):
+    return [{'feature': fitur, 'weight': bobot} for fitur, bobot in penjelasan]
+
+
+class PenyimpanSesi:
+    """LRU kecil {kunci: HasilSesi} + hasil yang terakhir ditampilkan."""
+
+    def __init__(self, kapasitas=KAPASITAS_DEFAULT):
+        self.kapasitas = kapasitas
+        self._data = OrderedDict()
+        self._terakhir = None
+
+    @property
+    def terakhir(self):
+        return self._data.get(self._terakhir)
+
+    def pilih(self, kunci):
+        """Jadikan hasil untuk `kunci` yang terakhir; None jika belum pernah dihitung di sesi ini."""
+        hasil = self._data.get(kunci)
+        if hasil is not None:
+            self._data.move_to_end(kunci)
+            self._terakhir = kunci
+        return hasil
+
+    def simpan(self, hasil):
+        self._data[hasil.kunci] = hasil
+        self._data.move_to_end(hasil.kunci)
+        self._terakhir = hasil.kunci
+        while len(self._data) > self.kapasitas:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,208 @@
+# jantung/shared.py
+#
+# Pemuat bundle untuk banyak proses Streamlit di satu node (HEART_INFERENCE=shared).
+# @st.cache_resource hanya berbagi di dalam satu proses; tanpa pemuat ini
+# setiap worker meng-unpickle forest (~1 MB), membaca dataset, dan membangun
+# salinan matriks latih LIME sendiri.
+#
+# Array node forest (jantung/compiled.py) dan feature importance diekspor
+# sekali ke artifacts/<versi>/shared/*.npy, lalu setiap worker membukanya dengan
+# np.load(mmap_mode='r'). Matriks latih LIME (X_train_processed.npy) dan kolom
+# dataset (partisi store, jantung/store.py) sudah berupa .npy yang dibuka dengan
+# mmap. Page file tersebut ada satu kali di page cache dan dipetakan read-only
+# oleh semua worker: worker tambahan menempel ke data yang sama tanpa salinan.
+# Yang tetap di-unpickle per worker hanya ColumnTransformer kecil.
+#
+#   python -m jantung.shared export                   # opsional; dibuat otomatis saat dimuat
+#   python -m jantung.shared report --workers 3       # memori per worker: pipeline vs shared
+#
+# Model yang bukan ensemble pohon (mis. SVC) tetap dimuat dari pipeline.joblib.
+# Mode penjelasan 'tree' (TreeSHAP) membutuhkan forest sklearn, jadi tidak
+# tersedia dengan HEART_INFERENCE=shared; mode 'fast' dan 'accurate' tetap bisa.
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from jantung.artifacts import BUNDLE_DIR, ArtefakBundle, current_version, load_bundle
+from jantung.compiled import INFERENCE_MODE, INFERENCE_PIPELINE, INFERENCE_SHARED, ForestTerkompilasi
+from jantung.schema import ROOT_DIR
+
+SHARED_DIR = "shared"
+_META_FILE = "meta.json"
+_PREPROCESSOR_FILE = "preprocessor.joblib"
+_IMPORTANCE_FILE = "feature_importances.npy"
+
+
+class ForestBersama(ForestTerkompilasi):
+    """ForestTerkompilasi di atas array mmap, dengan atribut yang dibaca kode lain dari classifier sklearn."""
+
+    feature_importances_ = None
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+class ModelBersama:
+    """Pengganti pipeline untuk inferensi: preprocessor sklearn + forest dari array bersama."""
+
+    def __init__(self, preprocessor, forest):
+        self.preprocessor = preprocessor
+        self.forest = forest
+        self.classes_ = forest.classes_
+        self.named_steps = {'preprocessor': preprocessor, 'classifier': forest}
+
+    def predict_proba(self, X):
+        return self.forest.predict_proba(self.preprocessor.transform(X))
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def _path_shared(bundle_path):
+    return Path(bundle_path) / SHARED_DIR
+
+
+def ekspor(bundle_path):
+    """Tulis array forest + preprocessor ke <bundle>/shared (atomik). False jika model tidak didukung."""
+    bundle_path = Path(bundle_path)
+    tujuan = _path_shared(bundle_path)
+    if (tujuan / _META_FILE).exists():
+        with open(tujuan / _META_FILE, encoding='utf-8') as f:
+            return json.load(f)['supported']
+    pipeline = joblib.load(bundle_path / "pipeline.joblib")
+    classifier = pipeline.named_steps['classifier']
+    tmp = bundle_path / f"{SHARED_DIR}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+    try:
+        forest = ForestTerkompilasi(classifier)
+    except ValueError:
+        meta = {'supported': False, 'classifier': type(classifier).__name__}
+    else:
+        array, meta = forest.ke_array()
+        for nama, nilai in array.items():
+            np.save(tmp / f"forest_{nama}.npy", np.ascontiguousarray(nilai))
+        np.save(tmp / _IMPORTANCE_FILE, np.asarray(classifier.feature_importances_, dtype=np.float64))
+        joblib.dump(pipeline.named_steps['preprocessor'], tmp / _PREPROCESSOR_FILE)
+        meta.update({'supported': True, 'classifier': type(classifier).__name__})
+    with open(tmp / _META_FILE, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    try:
+        tmp.rename(tujuan)
+    except OSError:
+        # Worker lain sudah lebih dulu mengekspor; pakai miliknya
+        shutil.rmtree(tmp, ignore_errors=True)
+    return meta['supported']
+
+
+def muat_bundle_bersama(out_dir=BUNDLE_DIR, version=None):
+    """Seperti load_bundle(), tetapi forest & matriks latih dibuka dengan mmap dari file bersama."""
+    bundle_path = Path(out_dir) / (version or current_version(out_dir))
+    if not ekspor(bundle_path):
+        return load_bundle(out_dir, version=bundle_path.name)
+    shared = _path_shared(bundle_path)
+    with open(shared / _META_FILE, encoding='utf-8') as f:
+        meta = json.load(f)
+    array = {nama: np.load(shared / f"forest_{nama}.npy", mmap_mode='r') for nama in ForestTerkompilasi.ARRAY}
+    forest = ForestBersama.dari_array(array, meta)
+    forest.feature_importances_ = np.load(shared / _IMPORTANCE_FILE, mmap_mode='r')
+    model = ModelBersama(joblib.load(shared / _PREPROCESSOR_FILE), forest)
+    with open(bundle_path / "manifest.json", encoding='utf-8') as f:
+        manifest = json.load(f)
+    return ArtefakBundle(path=bundle_path, model=model,
+                         X_train_processed=np.load(bundle_path / "X_train_processed.npy", mmap_mode='r'),
+                         feature_names=manifest['feature_names'], class_names=manifest['class_names'],
+                         manifest=manifest)
+
+
+def muat_bundle(out_dir=BUNDLE_DIR, version=None, mode=INFERENCE_MODE):
+    """load_bundle() biasa, atau muat_bundle_bersama() jika mode 'shared'."""
+    if mode == INFERENCE_SHARED:
+        return muat_bundle_bersama(out_dir, version=version)
+    return load_bundle(out_dir, version=version)
+
+
+# Worker untuk `report`: muat sumber daya, skor satu pasien, lalu tunggu sampai stdin ditutup
+_SKRIP_WORKER = """
+import os, sys
+os.environ['HEART_INFERENCE'] = {mode!r}
+sys.path.insert(0, {root!r})
+from jantung.resources import muat_sumber_daya
+from jantung.schema import FITUR
+sd = muat_sumber_daya()
+baris = sd.df[FITUR].iloc[[0]]
+sd.model.predict_proba(baris)
+sd.explainer.explain(sd.preprocessor.transform(baris)[0])
+print(type(sd.model).__name__, flush=True)
+sys.stdin.read()
+"""
+
+
+def _memori_proses(pid):
+    # kB dari /proc/<pid>/smaps_rollup: Rss, Pss, dan Private (clean + dirty)
+    nilai = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding='utf-8') as f:
+        for baris in f:
+            bagian = baris.split()
+            if len(bagian) >= 2 and bagian[0].endswith(':') and bagian[1].isdigit():
+                nilai[bagian[0][:-1]] = int(bagian[1])
+    return {'rss_mb': nilai['Rss'] / 1024, 'pss_mb': nilai['Pss'] / 1024,
+            'private_mb': (nilai['Private_Clean'] + nilai['Private_Dirty']) / 1024}
+
+
+def ukur_worker(mode, n_workers):
+    """Jalankan n worker bersamaan dalam `mode` dan ukur memori tiap worker."""
+    proses = [subprocess.Popen([sys.executable, '-c', _SKRIP_WORKER.format(mode=mode, root=str(ROOT_DIR))],
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, cwd=ROOT_DIR)
+              for _ in range(n_workers)]
+    try:
+        kelas = [p.stdout.readline().strip() for p in proses]
+        time.sleep(0.2)
+        memori = [_memori_proses(p.pid) for p in proses]
+    finally:
+        for p in proses:
+            p.stdin.close()
+            p.wait()
+    return {'model_class': kelas[0], 'workers': memori,
+            'total_pss_mb': sum(m['pss_mb'] for m in memori),
+            'mean_private_mb': sum(m['private_mb'] for m in memori) / len(memori)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bundle bersama (mmap) untuk banyak worker di satu node.")
+    parser.add_argument('--out', default=str(BUNDLE_DIR), help="Direktori bundle")
+    sub = parser.add_subparsers(dest='perintah', required=True)
+    p_export = sub.add_parser('export', help="Ekspor array forest bundle ke <bundle>/shared")
+    p_export.add_argument('--version', help="Versi bundle (default: versi aktif)")
+    p_report = sub.add_parser('report', help="Bandingkan memori worker mode pipeline vs shared")
+    p_report.add_argument('--workers', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.perintah == 'export':
+        bundle_path = Path(args.out) / (args.version or current_version(args.out))
+        didukung = ekspor(bundle_path)
+        print(f"{_path_shared(bundle_path)}: {'siap' if didukung else 'model tidak didukung, memakai pipeline.joblib'}")
+        return 0
+
+    ekspor(Path(args.out) / current_version(args.out))
+    print(f"{'mode':<10}{'worker':>8}{'RSS':>10}{'PSS':>10}{'private':>10}")
+    for mode in (INFERENCE_PIPELINE, INFERENCE_SHARED):
+        hasil = ukur_worker(mode, args.workers)
+        for i, m in enumerate(hasil['workers']):
+            print(f"{mode:<10}{i:>8}{m['rss_mb']:>8.1f}MB{m['pss_mb']:>8.1f}MB{m['private_mb']:>8.1f}MB")
+        print(f"{mode:<10}{'total':>8}{'':>10}{hasil['total_pss_mb']:>8.1f}MB"
+              f"{hasil['mean_private_mb'] * args.workers:>8.1f}MB  ({hasil['model_class']})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
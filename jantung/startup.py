@@ -0,0 +1,215 @@
+# jantung/startup.py
+#
+# Cold start app.py. Pustaka berat (sklearn/imblearn untuk unpickle model,
+# lime, matplotlib, plotly.express, seaborn, pandas) tidak lagi diimpor di
+# level modul app.py; masing-masing dimuat oleh halaman/fitur pertama yang
+# membutuhkannya. Setelah render pertama, panaskan_latar() mengimpor sisanya
+# di thread latar, sehingga pindah halaman berikutnya tidak menunggu impor.
+#
+# Benchmark startup (waktu impor app.py + waktu render pertama per halaman,
+# masing-masing di proses Python baru):
+#
+#   python -m jantung.startup --repeat 3 --save startup_baseline.json
+#   python -m jantung.startup --baseline startup_baseline.json --tolerance 0.25
+#
+# Dengan --baseline, exit code 1 jika ada metrik yang lebih lambat dari
+# baseline melebihi toleransi.
+#
+# Biaya rerun dalam satu sesi (render pertama, submit form, rerun polos, dan
+# submit ulang input yang sama; median beberapa rerun, diukur di sisi skrip):
+#
+#   python -m jantung.startup --rerun --repeat 5
+
+import argparse
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+
+from jantung.schema import ROOT_DIR
+
+# Urutan kira-kira sesuai kebutuhan: unpickle model dulu, lalu penjelasan & grafik
+MODUL_BERAT = (
+    'pandas',
+    'sklearn.ensemble',
+    'imblearn.pipeline',
+    'lime.lime_tabular',
+    'plotly.express',
+    'matplotlib.pyplot',
+    'seaborn',
+)
+# Dengan HEART_INFERENCE=shared model tidak di-unpickle dari pipeline.joblib,
+# jadi sklearn.ensemble/imblearn tidak perlu dipanaskan (hemat memori per worker)
+MODUL_PIPELINE = ('sklearn.ensemble', 'imblearn.pipeline')
+
+HALAMAN = ('home', 'predict', 'about')
+
+_lock = threading.Lock()
+_thread = None
+
+
+def _impor_semua(modul):
+    for nama in modul:
+        try:
+            importlib.import_module(nama)
+        except ImportError:
+            pass
+
+
+def panaskan_latar(modul=None):
+    """Impor `modul` di thread latar (sekali per proses); kembalikan thread-nya."""
+    global _thread
+    if modul is None:
+        # Dibaca langsung dari env: jantung.compiled mengimpor sklearn
+        shared = os.environ.get('HEART_INFERENCE') == 'shared'
+        modul = tuple(m for m in MODUL_BERAT if not (shared and m in MODUL_PIPELINE))
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_impor_semua, args=(modul,), name='warm-imports', daemon=True)
+            _thread.start()
+    return _thread
+
+
+# Dijalankan di proses baru: impor app lalu render satu halaman lewat AppTest
+_SKRIP_UKUR = """
+import json, sys, time
+mulai = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+siap = time.perf_counter()
+at = AppTest.from_string('''
+import sys, time
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+app.render_halaman(app.TRANSLATIONS['id'], {halaman!r})
+t2 = time.perf_counter()
+import streamlit as st
+st.session_state['_ukur'] = (t1 - t0, t2 - t1)
+''', default_timeout=300)
+at.session_state['lang'] = 'id'
+at.run()
+if at.exception:
+    sys.exit(str(at.exception))
+impor_app, render = at.session_state['_ukur']
+print(json.dumps({{'streamlit_import_s': siap - mulai, 'app_import_s': impor_app,
+                  'first_render_s': render, 'total_s': time.perf_counter() - mulai}}))
+"""
+
+
+# Satu sesi AppTest: render pertama, (submit form prediksi), lalu rerun berulang.
+# Waktu render_halaman tiap run dicatat di session_state; 'charts' = jumlah grafik
+# Plotly yang tampil setelah rerun polos (0 berarti hasil prediksi hilang).
+_SKRIP_RERUN = """
+import json, statistics, sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_string('''
+import sys, time
+sys.path.insert(0, {root!r})
+import streamlit as st
+import app
+t0 = time.perf_counter()
+app.render_halaman(app.TRANSLATIONS['id'], {halaman!r})
+st.session_state.setdefault('_ukur', []).append(time.perf_counter() - t0)
+''', default_timeout=300)
+at.session_state['lang'] = 'id'
+
+def jalan(aksi=None):
+    (aksi() if aksi else at).run()
+    if at.exception:
+        sys.exit(str(at.exception))
+    return at.session_state['_ukur'][-1]
+
+hasil = {{'first_render_s': jalan()}}
+submit = (lambda: at.button[0].click()) if {halaman!r} == 'predict' else None
+if submit:
+    hasil['submit_s'] = jalan(submit)
+hasil['rerun_s'] = statistics.median(jalan() for _ in range({repeat}))
+hasil['charts'] = len(at.get('plotly_chart'))
+if submit:
+    hasil['resubmit_s'] = statistics.median(jalan(submit) for _ in range({repeat}))
+print(json.dumps(hasil))
+"""
+
+
+def ukur_rerun(halaman, repeat=5):
+    """Waktu render pertama, submit, rerun, dan submit ulang `halaman` dalam satu sesi (proses baru)."""
+    skrip = _SKRIP_RERUN.format(root=str(ROOT_DIR), halaman=halaman, repeat=repeat)
+    env = dict(os.environ, HEART_EXPLAIN_PROCESSES=os.environ.get('HEART_EXPLAIN_PROCESSES', '0'))
+    hasil = subprocess.run([sys.executable, '-c', skrip], capture_output=True, text=True, cwd=ROOT_DIR, env=env)
+    if hasil.returncode != 0:
+        raise RuntimeError(f"Benchmark rerun '{halaman}' gagal:\n{hasil.stderr or hasil.stdout}")
+    return json.loads(hasil.stdout.strip().splitlines()[-1])
+
+
+def ukur_halaman(halaman):
+    """Satu pengukuran cold start untuk `halaman` di proses Python baru."""
+    skrip = _SKRIP_UKUR.format(root=str(ROOT_DIR), halaman=halaman)
+    env = dict(os.environ, HEART_EXPLAIN_PROCESSES=os.environ.get('HEART_EXPLAIN_PROCESSES', '0'))
+    hasil = subprocess.run([sys.executable, '-c', skrip], capture_output=True, text=True, cwd=ROOT_DIR, env=env)
+    if hasil.returncode != 0:
+        raise RuntimeError(f"Benchmark halaman '{halaman}' gagal:\n{hasil.stderr or hasil.stdout}")
+    return json.loads(hasil.stdout.strip().splitlines()[-1])
+
+
+def benchmark(halaman=HALAMAN, repeat=3):
+    """Median tiap metrik per halaman, dari `repeat` proses baru."""
+    ringkasan = {}
+    for nama in halaman:
+        ukuran = [ukur_halaman(nama) for _ in range(repeat)]
+        ringkasan[nama] = {metrik: statistics.median(u[metrik] for u in ukuran) for metrik in ukuran[0]}
+    return ringkasan
+
+
+def bandingkan(hasil, baseline, tolerance):
+    """Daftar pesan regresi (metrik > baseline * (1 + tolerance))."""
+    regresi = []
+    for halaman, metrik in hasil.items():
+        for nama, nilai in metrik.items():
+            acuan = baseline.get(halaman, {}).get(nama)
+            if acuan and nilai > acuan * (1 + tolerance):
+                regresi.append(f"{halaman}.{nama}: {nilai:.3f}s > baseline {acuan:.3f}s (+{tolerance:.0%})")
+    return regresi
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cold start app.py per halaman.")
+    parser.add_argument('--pages', nargs='+', choices=HALAMAN, default=list(HALAMAN))
+    parser.add_argument('--repeat', type=int, default=3, help="Jumlah proses baru per halaman (diambil median)")
+    parser.add_argument('--save', help="Simpan hasil sebagai baseline JSON")
+    parser.add_argument('--baseline', help="Bandingkan dengan baseline JSON; exit 1 jika ada regresi")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Toleransi relatif terhadap baseline")
+    parser.add_argument('--rerun', action='store_true', help="Ukur biaya rerun dalam satu sesi, bukan cold start")
+    args = parser.parse_args(argv)
+
+    if args.rerun:
+        print(f"{'halaman':<10}{'pertama':>10}{'submit':>10}{'rerun':>10}{'grafik':>8}{'submit ulang':>14}")
+        for nama in args.pages:
+            m = ukur_rerun(nama, args.repeat)
+            kolom = [f"{m[k] * 1000:>8.1f}ms" if k in m else f"{'-':>10}" for k in ('first_render_s', 'submit_s', 'rerun_s')]
+            ulang = f"{m['resubmit_s'] * 1000:>12.1f}ms" if 'resubmit_s' in m else f"{'-':>14}"
+            print(f"{nama:<10}{''.join(kolom)}{m['charts']:>8}{ulang}")
+        return 0
+
+    hasil = benchmark(args.pages, args.repeat)
+    print(f"{'halaman':<10}{'streamlit':>12}{'impor app':>12}{'render':>12}{'total':>12}")
+    for nama, m in hasil.items():
+        print(f"{nama:<10}{m['streamlit_import_s']:>11.3f}s{m['app_import_s']:>11.3f}s"
+              f"{m['first_render_s']:>11.3f}s{m['total_s']:>11.3f}s")
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(hasil, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regresi = bandingkan(hasil, json.load(f), args.tolerance)
+        for pesan in regresi:
+            print(f"REGRESI {pesan}", file=sys.stderr)
+        return 1 if regresi else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
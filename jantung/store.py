@@ -0,0 +1,564 @@
+# jantung/store.py
+#
+# Penyimpanan dataset kolumnar append-only. Setiap ingest menulis satu
+# partisi baru (store/part-NNNNNN/<kolom>.npy); partisi lama tidak pernah
+# diubah. Kolom kategori (Sex, ChestPainType, RestingECG, ExerciseAngina,
+# ST_Slope) disimpan sebagai kode uint8 dengan kamus tetap dari schema, kolom
+# bilangan bulat dengan dtype terkecil yang cukup untuk rentangnya (int8/
+# int16). Oldpeak tetap float64: ambang split forest (hasil SMOTE) bisa
+# sangat dekat dengan nilai data, sehingga pembulatan float32 sudah mengubah
+# probabilitas hingga 0.02. Partisi dibuka dengan mmap, jadi memuat dataset tidak lagi
+# mem-parse CSV, dan DataFrame hasilnya ~5x lebih kecil dari hasil read_csv.
+#
+# manifest.json mencatat daftar partisi dan agregat berjalan (jumlah per
+# kelas, hitungan nilai per kelas, hitungan kategori per kelas, serta mean &
+# co-moment kolom numerik untuk korelasi). Agregat digabung per partisi, jadi
+# halaman Home tidak pernah memindai baris dataset.
+#
+#   python -m jantung.store ingest skrining_baru.csv
+#   python -m jantung.store sync                  # ikuti baris baru di heart.csv
+#   python -m jantung.store info
+#
+#   python -m jantung.store rebuild               # hapus semua (termasuk hasil ingest), bangun ulang dari heart.csv
+#
+# heart.csv tetap sumber awal: buka_store() membangun store darinya sekali,
+# lalu hanya meng-ingest baris yang di-append ke file itu sejak sinkron
+# terakhir. Setiap partisi mencatat asalnya ('csv' atau 'ingest'): jika isi
+# lama heart.csv berubah, hanya partisi asal CSV yang dibangun ulang; partisi
+# hasil `ingest` tidak pernah dihapus otomatis.
+#
+# Setiap worker Streamlit/REST menyinkronkan store saat memuat model, jadi
+# beberapa proses bisa menulis bersamaan (mis. bootstrap deploy baru). Semua
+# penulisan (sinkron, ingest, rebuild) memegang kunci eksklusif fcntl.flock
+# pada store/.lock dan membaca ulang manifest setelah kunci didapat. Pembaca
+# tidak perlu kunci: manifest selalu diganti secara atomik.
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa kunci antar proses, jalankan satu penulis saja
+    fcntl = None
+
+from jantung.schema import DATA_PATH, FITUR, KATEGORI, ROOT_DIR, TARGET, cek_kolom
+
+FORMAT_VERSION = 2
+STORE_DIR = ROOT_DIR / "store"
+
+_MANIFEST_FILE = "manifest.json"
+_LOCK_FILE = ".lock"
+_log = logging.getLogger(__name__)
+
+ASAL_CSV = 'csv'
+ASAL_INGEST = 'ingest'
+
+KOLOM = FITUR + [TARGET]
+KOLOM_KATEGORI = [k for k in KATEGORI if k != 'FastingBS']
+KOLOM_NUMERIK = [k for k in KOLOM if k not in KOLOM_KATEGORI]
+# Rentang data & form: Age 15-80, RestingBP/Cholesterol/MaxHR < 32768
+DTYPE_NUMERIK = {'Age': 'int8', 'RestingBP': 'int16', 'Cholesterol': 'int16', 'FastingBS': 'int8',
+                 'MaxHR': 'int16', 'Oldpeak': 'float64', TARGET: 'int8'}
+# Kolom bilangan bulat yang hitungan nilainya disimpan per kelas (kuartil & histogram eksak)
+KOLOM_HITUNG = ['Age', 'RestingBP', 'Cholesterol', 'MaxHR']
+KELAS = {'sakit': 1, 'sehat': 0}
+
+
+class AgregatBerjalan:
+    """Agregat dataset yang bisa digabung per batch tanpa memindai ulang baris lama."""
+
+    def __init__(self, n=0, per_kelas=None, hitungan=None, kategori=None, mean=None, comoment=None):
+        d = len(KOLOM_NUMERIK)
+        self.n = n
+        self.per_kelas = per_kelas or {kelas: 0 for kelas in KELAS}
+        # hitungan[kelas][kolom] = {nilai: jumlah}; kategori[kelas][kolom] = {opsi: jumlah}
+        self.hitungan = hitungan or {kelas: {k: {} for k in KOLOM_HITUNG} for kelas in KELAS}
+        self.kategori = kategori or {kelas: {k: {} for k in KOLOM_KATEGORI} for kelas in KELAS}
+        self.mean = np.zeros(d) if mean is None else np.asarray(mean, dtype=np.float64)
+        self.comoment = np.zeros((d, d)) if comoment is None else np.asarray(comoment, dtype=np.float64)
+
+    @classmethod
+    def dari_df(cls, df):
+        agregat = cls()
+        if len(df):
+            target = df[TARGET].to_numpy()
+            for kelas, nilai_target in KELAS.items():
+                bagian = df[target == nilai_target]
+                agregat.per_kelas[kelas] = int(len(bagian))
+                for kolom in KOLOM_HITUNG:
+                    nilai, jumlah = np.unique(bagian[kolom].to_numpy(), return_counts=True)
+                    agregat.hitungan[kelas][kolom] = {int(v): int(c) for v, c in zip(nilai, jumlah)}
+                for kolom in KOLOM_KATEGORI:
+                    nilai, jumlah = np.unique(bagian[kolom].astype(str).to_numpy(), return_counts=True)
+                    agregat.kategori[kelas][kolom] = {str(v): int(c) for v, c in zip(nilai, jumlah)}
+            X = matriks_numerik(df)
+            agregat.n = int(len(df))
+            agregat.mean = X.mean(axis=0)
+            pusat = X - agregat.mean
+            agregat.comoment = pusat.T @ pusat
+        return agregat
+
+    def gabung(self, lain):
+        """Agregat gabungan self + lain (co-moment digabung dengan rumus Chan et al.)."""
+        n = self.n + lain.n
+        if not lain.n or not self.n:
+            sumber = lain if lain.n else self
+            return AgregatBerjalan.dari_dict(sumber.ke_dict())
+        delta = lain.mean - self.mean
+        mean = self.mean + delta * lain.n / n
+        comoment = self.comoment + lain.comoment + np.outer(delta, delta) * self.n * lain.n / n
+
+        def tambah(a, b):
+            hasil = dict(a)
+            for kunci, jumlah in b.items():
+                hasil[kunci] = hasil.get(kunci, 0) + jumlah
+            return hasil
+
+        return AgregatBerjalan(
+            n=n,
+            per_kelas={kelas: self.per_kelas[kelas] + lain.per_kelas[kelas] for kelas in KELAS},
+            hitungan={kelas: {k: tambah(self.hitungan[kelas][k], lain.hitungan[kelas][k]) for k in KOLOM_HITUNG}
+                      for kelas in KELAS},
+            kategori={kelas: {k: tambah(self.kategori[kelas][k], lain.kategori[kelas][k]) for k in KOLOM_KATEGORI}
+                      for kelas in KELAS},
+            mean=mean, comoment=comoment)
+
+    def korelasi(self):
+        """Matriks korelasi Pearson kolom KOLOM_NUMERIK dari co-moment."""
+        std = np.sqrt(np.diag(self.comoment))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.comoment / np.outer(std, std)
+
+    def ke_dict(self):
+        return {
+            'n': self.n,
+            'per_kelas': self.per_kelas,
+            # Kunci JSON harus string
+            'hitungan': {kelas: {k: {str(v): c for v, c in sorted(h.items())} for k, h in kolom.items()}
+                         for kelas, kolom in self.hitungan.items()},
+            'kategori': self.kategori,
+            'mean': self.mean.tolist(),
+            'comoment': self.comoment.tolist(),
+        }
+
+    @classmethod
+    def dari_dict(cls, data):
+        hitungan = {kelas: {k: {int(v): int(c) for v, c in h.items()} for k, h in kolom.items()}
+                    for kelas, kolom in data['hitungan'].items()}
+        return cls(n=data['n'], per_kelas=dict(data['per_kelas']), hitungan=hitungan,
+                   kategori={kelas: {k: dict(h) for k, h in kolom.items()} for kelas, kolom in data['kategori'].items()},
+                   mean=data['mean'], comoment=data['comoment'])
+
+
+def matriks_numerik(df):
+    """KOLOM_NUMERIK sebagai satu matriks float64 (dtype kolom int8/int16 diseragamkan)."""
+    return df[KOLOM_NUMERIK].to_numpy(dtype=np.float64)
+
+
+def bentuk_kanonik(df):
+    """Salinan `df` dengan tipe seperti hasil read_csv (int64, float64, str), untuk hashing baris."""
+    kanonik = {}
+    for nama in df.columns:
+        if nama in KOLOM_KATEGORI:
+            kanonik[nama] = df[nama].astype(str)
+        elif nama in KOLOM_NUMERIK:
+            kanonik[nama] = df[nama].to_numpy(dtype=np.float64 if nama == 'Oldpeak' else np.int64)
+        else:
+            kanonik[nama] = df[nama]
+    return pd.DataFrame(kanonik, columns=df.columns)
+
+
+def _kodekan(df):
+    """Validasi & ubah batch menjadi {kolom: array}; kategori menjadi kode uint8."""
+    cek_kolom(df)
+    if TARGET not in df.columns:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {TARGET}")
+    kolom = {}
+    for nama in KOLOM_KATEGORI:
+        opsi = KATEGORI[nama]
+        nilai = df[nama].astype(str).str.strip()
+        kode = pd.Categorical(nilai, categories=opsi).codes
+        if (kode < 0).any():
+            salah = sorted(set(nilai[kode < 0]))
+            raise ValueError(f"{nama}: nilai tidak dikenal {salah} (harus salah satu dari {opsi})")
+        kolom[nama] = kode.astype(np.uint8)
+    for nama in KOLOM_NUMERIK:
+        nilai = pd.to_numeric(df[nama], errors='raise')
+        if nilai.isna().any():
+            raise ValueError(f"{nama}: ada nilai kosong")
+        dtype = np.dtype(DTYPE_NUMERIK[nama])
+        if dtype.kind == 'i':
+            batas = np.iinfo(dtype)
+            if (nilai % 1 != 0).any():
+                raise ValueError(f"{nama}: harus bilangan bulat")
+            if nilai.min() < batas.min or nilai.max() > batas.max:
+                raise ValueError(f"{nama}: di luar rentang {dtype} ({batas.min}..{batas.max})")
+        kolom[nama] = nilai.to_numpy(dtype=dtype)
+    if not np.isin(kolom[TARGET], (0, 1)).all():
+        raise ValueError(f"{TARGET}: harus 0 atau 1")
+    return kolom
+
+
+def _baris_valid(df):
+    """Mask baris yang lolos _kodekan() (kolom wajib harus sudah ada)."""
+    valid = np.ones(len(df), dtype=bool)
+    for nama in KOLOM_KATEGORI:
+        valid &= df[nama].astype(str).str.strip().isin(KATEGORI[nama]).to_numpy()
+    for nama in KOLOM_NUMERIK:
+        nilai = pd.to_numeric(df[nama], errors='coerce').to_numpy(dtype=np.float64)
+        ok = np.isfinite(nilai)
+        dtype = np.dtype(DTYPE_NUMERIK[nama])
+        if dtype.kind == 'i':
+            batas = np.iinfo(dtype)
+            with np.errstate(invalid='ignore'):
+                ok &= (nilai % 1 == 0) & (nilai >= batas.min) & (nilai <= batas.max)
+        if nama == TARGET:
+            ok &= np.isin(nilai, (0, 1))
+        valid &= ok
+    return valid
+
+
+def _dekodekan(kolom):
+    # Tanpa salinan: kode uint8 dilihat sebagai int8 (jumlah opsi < 128) dan kolom numerik dipakai
+    # apa adanya, sehingga DataFrame dari partisi mmap berbagi page yang sama antar worker
+    data = {}
+    for nama in KOLOM:
+        if nama in KOLOM_KATEGORI:
+            data[nama] = pd.Categorical.from_codes(np.asarray(kolom[nama]).view(np.int8), categories=KATEGORI[nama])
+        else:
+            data[nama] = kolom[nama]
+    return pd.DataFrame(data, columns=KOLOM, copy=False)
+
+
+def _sidik_prefix(path, n_bytes):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        sisa = n_bytes
+        while sisa > 0:
+            blok = f.read(min(1 << 20, sisa))
+            if not blok:
+                break
+            h.update(blok)
+            sisa -= len(blok)
+    return h.hexdigest()
+
+
+@contextlib.contextmanager
+def _kunci_direktori(path):
+    """Kunci penulis eksklusif antar proses untuk store di `path` (flock pada <path>/.lock)."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    with open(path / _LOCK_FILE, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class StoreKonflik(ValueError):
+    """Isi lama dataset sumber berubah, tetapi asal sebagian partisi store tidak tercatat."""
+
+
+def asal_partisi(manifest):
+    """Asal tiap partisi ('csv' / 'ingest'), atau None jika ada yang tidak bisa dipastikan.
+
+    Store lama tidak mencatat asal. Partisi pertama store yang punya 'source'
+    pasti dibangun dari CSV (sinkron lama selalu membangun ulang dari part-000000);
+    partisi lama lainnya bisa tail CSV atau hasil ingest.
+    """
+    asal = []
+    for i, partisi in enumerate(manifest['partitions']):
+        if 'origin' in partisi:
+            asal.append(partisi['origin'])
+        elif i == 0 and manifest.get('source'):
+            asal.append(ASAL_CSV)
+        else:
+            return None
+    return asal
+
+
+class KolomStore:
+    """Store kolumnar append-only di direktori `path`."""
+
+    def __init__(self, path=STORE_DIR):
+        self.path = Path(path)
+        self.manifest = self._baca_manifest()
+        self._lock_penulis = threading.RLock()
+        self._memegang_kunci = False
+
+    @contextlib.contextmanager
+    def _penulis(self):
+        # Reentran: sinkron_csv memanggil _lepas_partisi_csv dan tambah di bawah kunci yang sama
+        with self._lock_penulis:
+            if self._memegang_kunci:
+                yield
+                return
+            with _kunci_direktori(self.path):
+                self._memegang_kunci = True
+                try:
+                    # Penulis lain mungkin sudah mengubah store sejak manifest terakhir dibaca
+                    self.manifest = self._baca_manifest()
+                    yield
+                finally:
+                    self._memegang_kunci = False
+
+    def _baca_manifest(self):
+        path = self.path / _MANIFEST_FILE
+        if not path.exists():
+            return {'format': FORMAT_VERSION, 'rows': 0, 'partitions': [], 'source': None,
+                    'aggregates': AgregatBerjalan().ke_dict()}
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Format store {manifest.get('format')} tidak didukung (butuh {FORMAT_VERSION})")
+        return manifest
+
+    def _tulis_manifest(self, manifest):
+        tmp = self.path / (_MANIFEST_FILE + ".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        tmp.replace(self.path / _MANIFEST_FILE)
+        self.manifest = manifest
+
+    def __len__(self):
+        return self.manifest['rows']
+
+    @property
+    def fingerprint(self):
+        """Identitas isi store (berubah di setiap append); dipakai sebagai kunci cache."""
+        partisi = ",".join(f"{p['name']}:{p['rows']}" for p in self.manifest['partitions'])
+        return "store-" + hashlib.sha256(partisi.encode('utf-8')).hexdigest()[:16]
+
+    @property
+    def agregat(self):
+        return AgregatBerjalan.dari_dict(self.manifest['aggregates'])
+
+    def _nama_partisi_baru(self):
+        # Indeks setelah partisi terakhir di manifest maupun di disk (sisa partisi yang sudah dilepas)
+        indeks = [int(p['name'].split('-')[1]) for p in self.manifest['partitions']]
+        indeks += [int(d.name.split('-')[1]) for d in self.path.glob('part-*') if d.name.split('-')[1].isdigit()]
+        return f"part-{max(indeks, default=-1) + 1:06d}"
+
+    def tambah(self, df, source=None, asal=ASAL_INGEST):
+        """Append satu batch sebagai partisi baru dan gabungkan agregatnya. Mengembalikan jumlah baris.
+
+        `asal` dicatat di manifest: ASAL_CSV untuk baris dari dataset sumber (lihat sinkron_csv).
+        """
+        kolom = _kodekan(df)
+        with self._penulis():
+            return self._tambah(kolom, len(df), source, asal)
+
+    def _tambah(self, kolom, n, source, asal):
+        if n == 0:
+            if source is not None:
+                self._tulis_manifest(dict(self.manifest, source=source))
+            return 0
+        nama = self._nama_partisi_baru()
+        # Di bawah kunci tidak ada penulis lain, jadi direktori tmp yang tersisa milik proses yang mati
+        for sisa in self.path.glob('part-*.tmp*'):
+            shutil.rmtree(sisa, ignore_errors=True)
+        tmp = self.path / f"{nama}.tmp-{os.getpid()}"
+        tmp.mkdir()
+        for kolom_nama, nilai in kolom.items():
+            np.save(tmp / f"{kolom_nama}.npy", nilai)
+        tmp.rename(self.path / nama)
+
+        agregat = self.agregat.gabung(AgregatBerjalan.dari_df(_dekodekan(kolom)))
+        manifest = dict(self.manifest)
+        manifest['partitions'] = self.manifest['partitions'] + [
+            {'name': nama, 'rows': n, 'origin': asal, 'created': time.strftime('%Y-%m-%dT%H:%M:%S%z')}]
+        manifest['rows'] = self.manifest['rows'] + n
+        manifest['aggregates'] = agregat.ke_dict()
+        if source is not None:
+            manifest['source'] = source
+        # Manifest ditulis terakhir: pembaca tidak pernah melihat partisi setengah jadi
+        self._tulis_manifest(manifest)
+        return n
+
+    def kolom(self, nama, mmap=True):
+        """Satu kolom (kode uint8 untuk kategori) dari semua partisi."""
+        bagian = [np.load(self.path / p['name'] / f"{nama}.npy", mmap_mode='r' if mmap else None)
+                  for p in self.manifest['partitions']]
+        if not bagian:
+            return np.empty(0, dtype=np.uint8 if nama in KOLOM_KATEGORI else DTYPE_NUMERIK[nama])
+        return bagian[0] if len(bagian) == 1 else np.concatenate(bagian)
+
+    def dataframe(self):
+        """Seluruh dataset sebagai DataFrame (kolom kategori bertipe category).
+
+        Dengan satu partisi, kolom DataFrame adalah view read-only atas file
+        mmap; dengan beberapa partisi, kolom digabung (disalin) sekali.
+        """
+        df = _dekodekan({nama: self.kolom(nama) for nama in KOLOM})
+        df.attrs['sha256'] = self.fingerprint
+        return df
+
+    def sinkron_csv(self, data_path=DATA_PATH):
+        """Ingest baris heart.csv yang belum ada di store. Mengembalikan jumlah baris baru.
+
+        Jika ukuran & mtime file tidak berubah, tidak ada yang dibaca. Jika file
+        hanya bertambah di akhir, hanya bagian baru yang di-parse. Jika isi lama
+        berubah, hanya partisi asal CSV yang dibangun ulang; StoreKonflik jika
+        asal partisi tidak tercatat (store tidak diubah, lihat `rebuild`).
+        Baris CSV yang tidak valid dilewati dan dicatat di log.
+        """
+        with self._penulis():
+            return self._sinkron_csv(data_path)
+
+    def _sinkron_csv(self, data_path):
+        stat = Path(data_path).stat()
+        sumber = self.manifest.get('source') or {}
+        if sumber.get('size') == stat.st_size and sumber.get('mtime_ns') == stat.st_mtime_ns:
+            return 0
+        baru = {'path': Path(data_path).name, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        lama_size = sumber.get('size', 0)
+        if (sumber and 0 < lama_size <= stat.st_size
+                and _sidik_prefix(data_path, lama_size) == sumber.get('prefix_sha256')):
+            baru['prefix_sha256'] = _sidik_prefix(data_path, stat.st_size)
+            with open(data_path, 'rb') as f:
+                header = f.readline().decode('utf-8').strip().split(',')
+                f.seek(lama_size)
+                ekor = f.read()
+            df = pd.read_csv(io.BytesIO(ekor), names=header, header=None) if ekor.strip() else pd.DataFrame(columns=header)
+            return self.tambah(_saring_baris(df, data_path), source=baru, asal=ASAL_CSV)
+        df = pd.read_csv(data_path)
+        self._lepas_partisi_csv()
+        baru['prefix_sha256'] = _sidik_prefix(data_path, stat.st_size)
+        return self.tambah(_saring_baris(df, data_path), source=baru, asal=ASAL_CSV)
+
+    def _lepas_partisi_csv(self):
+        """Keluarkan partisi asal CSV dari store (di bawah _penulis()); partisi ingest dipertahankan."""
+        if not self.manifest['partitions']:
+            return
+        asal = asal_partisi(self.manifest)
+        if asal is None:
+            raise StoreKonflik(
+                f"Isi lama dataset sumber berubah, tetapi asal sebagian partisi di {self.path} tidak tercatat "
+                "(store lama). Store tidak diubah; jalankan `python -m jantung.store rebuild` untuk membangunnya "
+                "ulang dari dataset sumber (partisi hasil ingest ikut terhapus).")
+        pertahankan, lepas = [], []
+        for partisi, a in zip(self.manifest['partitions'], asal):
+            (lepas if a == ASAL_CSV else pertahankan).append(dict(partisi, origin=a))
+        agregat = AgregatBerjalan()
+        for partisi in pertahankan:
+            kolom = {nama: np.load(self.path / partisi['name'] / f"{nama}.npy") for nama in KOLOM}
+            agregat = agregat.gabung(AgregatBerjalan.dari_df(_dekodekan(kolom)))
+        # Manifest ditulis dulu; direktori partisi yang dilepas baru dihapus setelahnya
+        self._tulis_manifest(dict(self.manifest, partitions=pertahankan, source=None,
+                                  rows=sum(p['rows'] for p in pertahankan), aggregates=agregat.ke_dict()))
+        for partisi in lepas:
+            shutil.rmtree(self.path / partisi['name'], ignore_errors=True)
+
+
+def _saring_baris(df, data_path):
+    # Baris rusak di dataset sumber dilewati (dicatat di log), agar satu baris tidak menggagalkan setiap pemuatan
+    cek_kolom(df)
+    if TARGET not in df.columns:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {TARGET}")
+    valid = _baris_valid(df)
+    if not valid.all():
+        _log.warning("%s: %d baris tidak valid dilewati, mis. %s", data_path, int((~valid).sum()),
+                     df[~valid].head(3).to_dict('records'))
+    return df[valid]
+
+
+def _bangun_ulang(path, hanya_format_lama=False):
+    # Isi store dihapus di bawah kunci penulis (berkas .lock sendiri dipertahankan).
+    # `hanya_format_lama`: proses lain mungkin sudah membangun ulang selagi kita menunggu kunci
+    path = Path(path)
+    with _kunci_direktori(path):
+        if hanya_format_lama:
+            try:
+                return KolomStore(path)
+            except ValueError:
+                pass
+        for isi in path.iterdir():
+            if isi.name == _LOCK_FILE:
+                continue
+            if isi.is_dir():
+                shutil.rmtree(isi, ignore_errors=True)
+            else:
+                isi.unlink(missing_ok=True)
+    return KolomStore(path)
+
+
+def buka_store(data_path=DATA_PATH, path=STORE_DIR, sinkron=True):
+    """Buka store (dibangun dari `data_path` jika belum ada) dan ingest baris baru di CSV.
+
+    Jika sinkron gagal (CSV tidak terbaca, konflik asal partisi), store terakhir
+    yang valid tetap dipakai dan kesalahannya dicatat di log.
+    """
+    try:
+        store = KolomStore(path)
+    except ValueError as exc:
+        # Format lama hanya dibangun ulang otomatis jika seluruh isinya turunan dataset sumber
+        with open(Path(path) / _MANIFEST_FILE, encoding='utf-8') as f:
+            manifest = json.load(f)
+        asal = asal_partisi(manifest)
+        if not Path(data_path).exists() or asal is None or ASAL_INGEST in asal:
+            raise ValueError(f"{exc}. Store berisi partisi hasil ingest (atau asalnya tidak tercatat); "
+                             "jalankan `python -m jantung.store rebuild` untuk membangunnya ulang.") from exc
+        store = _bangun_ulang(path, hanya_format_lama=True)
+    if sinkron and Path(data_path).exists():
+        try:
+            store.sinkron_csv(data_path)
+        except ValueError as exc:
+            if not len(store):
+                raise
+            _log.warning("Sinkron %s gagal, memakai store terakhir (%d baris): %s", data_path, len(store), exc)
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Store dataset kolumnar append-only.")
+    parser.add_argument('--store', default=str(STORE_DIR), help="Direktori store")
+    sub = parser.add_subparsers(dest='perintah', required=True)
+    p_ingest = sub.add_parser('ingest', help="Append baris dari CSV/Parquet sebagai partisi baru")
+    p_ingest.add_argument('files', nargs='+')
+    p_sync = sub.add_parser('sync', help="Ingest baris yang di-append ke dataset sumber")
+    p_sync.add_argument('--data', default=str(DATA_PATH), help="Path dataset CSV")
+    p_rebuild = sub.add_parser('rebuild', help="Hapus seluruh store (termasuk partisi ingest) dan bangun ulang dari CSV")
+    p_rebuild.add_argument('--data', default=str(DATA_PATH), help="Path dataset CSV")
+    sub.add_parser('info', help="Ringkasan store")
+    args = parser.parse_args(argv)
+
+    if args.perintah == 'rebuild':
+        store = _bangun_ulang(args.store)
+        print(f"{store.sinkron_csv(args.data)} baris dari {args.data}")
+    else:
+        store = KolomStore(args.store)
+    if args.perintah == 'ingest':
+        from jantung.batch import baca_bertahap
+        for path in args.files:
+            n = sum(store.tambah(chunk) for chunk in baca_bertahap(path))
+            print(f"{path}: {n} baris ditambahkan")
+    elif args.perintah == 'sync':
+        try:
+            print(f"{store.sinkron_csv(args.data)} baris baru dari {args.data}")
+        except StoreKonflik as exc:
+            print(exc, file=sys.stderr)
+            return 1
+    agregat = store.agregat
+    print(f"{store.path}: {len(store)} baris, {len(store.manifest['partitions'])} partisi, "
+          f"{agregat.per_kelas['sakit']} sakit / {agregat.per_kelas['sehat']} sehat ({store.fingerprint})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
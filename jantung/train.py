@@ -0,0 +1,237 @@
+# jantung/train.py
+#
+# Latih ulang pipeline dari heart.csv dan cari varian yang lebih kecil/cepat.
+# Setiap kandidat dibangun dengan 11 FITUR, preprocessor, dan SMOTE yang sama
+# dengan model_pipeline_terbaik.pkl, dilatih pada split stratified
+# train_test_split(random_state=42) yang sama (jantung/artifacts.split_data),
+# lalu diukur:
+#   - akurasi cross-validation (StratifiedKFold pada split latih) & akurasi split uji
+#   - latensi predict_proba satu baris dan satu batch (HEART_INFERENCE berlaku,
+#     seperti jantung/registry.py)
+#   - ukuran artefak pipeline hasil joblib.dump
+#
+# Kandidat yang tidak didominasi pada (akurasi CV, latensi satu baris, latensi
+# batch, ukuran) membentuk front Pareto. Model terpilih adalah kandidat front
+# tercepat yang akurasi CV-nya paling jauh --tolerance di bawah kandidat
+# terbaik (atau --pick <nama>), diekspor dengan format yang sama dengan
+# model_pipeline_terbaik.pkl (langkah preprocessor, smote, classifier):
+#
+#   python -m jantung.train --report benchmarks/pareto.json
+#   python -m jantung.train --tolerance 0.01 --output model_pipeline_cepat.pkl --register
+#   python -m jantung.train --pick rf-n50-d5 --output model_pipeline_cepat.pkl
+#
+# Classifier selain RandomForest (HistGradientBoosting, LogisticRegression)
+# dilayani lewat pipeline biasa: HEART_INFERENCE=compiled/shared/lookup memakai
+# pipeline aslinya, dan mode penjelasan 'tree' turun ke LIME 'fast'
+# (MesinPenjelasan.mode_efektif). Model tersebut tidak punya importance global,
+# sehingga Home dan fallback penjelasan tidak menampilkan grafik importance.
+#
+# Kedalaman RandomForest selalu dibatasi: pohon tanpa max_depth membuat
+# artefak besar dan tabel TreeSHAP (jantung/treeshap.py) tumbuh 2^kedalaman.
+
+import argparse
+import io
+import json
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from jantung.artifacts import BUNDLE_DIR, split_data
+from jantung.bench import ukur
+from jantung.schema import DATA_PATH, FITUR
+
+N_FOLD_DEFAULT = 5
+TOLERANSI_DEFAULT = 0.01
+UKURAN_BATCH = 256
+REPEAT_DEFAULT = 200
+
+# (kunci metrik, arah): +1 lebih besar lebih baik, -1 lebih kecil lebih baik
+SUMBU_PARETO = (('cv_accuracy', 1), ('latency_ms_p50', -1), ('batch_ms_p50', -1), ('model_bytes', -1))
+
+
+def buat_preprocessor():
+    """ColumnTransformer yang sama dengan langkah 'preprocessor' model produksi."""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+
+    return ColumnTransformer(
+        transformers=[
+            ('num', StandardScaler(), ['Age', 'RestingBP', 'Cholesterol', 'MaxHR', 'Oldpeak']),
+            ('nom', OneHotEncoder(handle_unknown='ignore'), ['Sex']),
+            ('ord', OrdinalEncoder(categories=[['ATA', 'NAP', 'TA', 'ASY'], ['Normal', 'LVH', 'ST'],
+                                               ['N', 'Y'], ['Up', 'Flat', 'Down']]),
+             ['ChestPainType', 'RestingECG', 'ExerciseAngina', 'ST_Slope']),
+        ],
+        remainder='passthrough')
+
+
+def buat_pipeline(classifier):
+    """Pipeline imblearn preprocessor -> SMOTE -> classifier (format model_pipeline_terbaik.pkl)."""
+    from imblearn.over_sampling import SMOTE
+    from imblearn.pipeline import Pipeline
+
+    return Pipeline([('preprocessor', buat_preprocessor()), ('smote', SMOTE(random_state=42)),
+                     ('classifier', classifier)])
+
+
+def daftar_kandidat(cepat=False):
+    """{nama: classifier belum di-fit}; `cepat` memakai grid yang lebih kecil."""
+    from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+
+    n_pohon = (25, 100, 200) if cepat else (10, 25, 50, 100, 200)
+    kedalaman = (3, 5) if cepat else (3, 5, 8, 12)
+    n_iterasi = (50, 100) if cepat else (25, 50, 100, 200)
+    kandidat = {}
+    for n in n_pohon:
+        for d in kedalaman:
+            kandidat[f"rf-n{n}-d{d}"] = RandomForestClassifier(n_estimators=n, max_depth=d, random_state=42)
+    for n in n_iterasi:
+        for d in (3, None):
+            kandidat[f"hgb-i{n}-d{d or 'max'}"] = HistGradientBoostingClassifier(
+                max_iter=n, max_depth=d, early_stopping=False, random_state=42)
+    kandidat['logreg'] = LogisticRegression(max_iter=1000)
+    return kandidat
+
+
+def ukuran_artefak(pipeline):
+    buffer = io.BytesIO()
+    joblib.dump(pipeline, buffer)
+    return buffer.tell()
+
+
+def evaluasi_kandidat(nama, classifier, X_train, y_train, X_test, y_test, n_folds=N_FOLD_DEFAULT,
+                      repeat=REPEAT_DEFAULT):
+    """(metrik, pipeline ter-fit) satu kandidat: akurasi CV & uji, latensi, dan ukuran artefak."""
+    from sklearn.model_selection import StratifiedKFold, cross_val_score
+
+    from jantung.compiled import siapkan_model
+
+    pipeline = buat_pipeline(classifier)
+    cv = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=42)
+    mulai = time.perf_counter()
+    skor = cross_val_score(pipeline, X_train, y_train, cv=cv, scoring='accuracy')
+    pipeline.fit(X_train, y_train)
+    waktu_latih = time.perf_counter() - mulai
+
+    # Latensi diukur pada model seperti yang akan dilayani (compiled jika HEART_INFERENCE=compiled)
+    model = siapkan_model(pipeline)
+    rng = np.random.default_rng(0)
+    baris = [X_test.iloc[[i]] for i in rng.integers(0, len(X_test), repeat)]
+    batch = [X_test.iloc[rng.integers(0, len(X_test), UKURAN_BATCH)] for _ in range(max(repeat // 10, 5))]
+    tunggal = ukur(lambda i: model.predict_proba(baris[i]), len(baris))
+    per_batch = ukur(lambda i: model.predict_proba(batch[i]), len(batch))
+    return {
+        'name': nama,
+        'classifier': type(classifier).__name__,
+        'params': {k: v for k, v in classifier.get_params().items() if k in ('n_estimators', 'max_depth', 'max_iter')},
+        'cv_accuracy': float(skor.mean()),
+        'cv_std': float(skor.std()),
+        'test_accuracy': float((pipeline.predict(X_test) == np.asarray(y_test)).mean()),
+        'latency_ms_p50': tunggal['p50_ms'],
+        'latency_ms_p99': tunggal['p99_ms'],
+        'batch_ms_p50': per_batch['p50_ms'],
+        'model_bytes': ukuran_artefak(pipeline),
+        'fit_s': waktu_latih,
+    }, pipeline
+
+
+def front_pareto(hasil, sumbu=SUMBU_PARETO):
+    """Nama kandidat yang tidak didominasi kandidat lain pada semua `sumbu`."""
+    nilai = {h['name']: np.array([arah * h[kunci] for kunci, arah in sumbu]) for h in hasil}
+    front = []
+    for nama, v in nilai.items():
+        didominasi = any(np.all(w >= v) and np.any(w > v) for lain, w in nilai.items() if lain != nama)
+        if not didominasi:
+            front.append(nama)
+    return front
+
+
+def pilih_kandidat(hasil, front, toleransi=TOLERANSI_DEFAULT):
+    """Kandidat front tercepat (satu baris) dengan akurasi CV >= terbaik - toleransi."""
+    terbaik = max(h['cv_accuracy'] for h in hasil)
+    layak = [h for h in hasil if h['name'] in front and h['cv_accuracy'] >= terbaik - toleransi]
+    return min(layak, key=lambda h: (h['latency_ms_p50'], h['model_bytes']))['name']
+
+
+def cari(data_path=DATA_PATH, kandidat=None, n_folds=N_FOLD_DEFAULT, repeat=REPEAT_DEFAULT, progress=None):
+    """Latih & ukur semua kandidat. Mengembalikan (daftar metrik, {nama: pipeline ter-fit}, front)."""
+    kandidat = kandidat if kandidat is not None else daftar_kandidat()
+    df = pd.read_csv(data_path)
+    X_train, X_test, y_train, y_test = split_data(df)
+    X_train, X_test = X_train[FITUR], X_test[FITUR]
+    hasil, pipelines = [], {}
+    for nama, classifier in kandidat.items():
+        with warnings.catch_warnings():
+            # LogisticRegression/HGB bisa memberi peringatan konvergensi pada fold kecil
+            warnings.simplefilter('ignore')
+            metrik, pipelines[nama] = evaluasi_kandidat(nama, classifier, X_train, y_train, X_test, y_test,
+                                                        n_folds=n_folds, repeat=repeat)
+        hasil.append(metrik)
+        if progress is not None:
+            progress(metrik)
+    return hasil, pipelines, front_pareto(hasil)
+
+
+def _cetak(hasil, front, terpilih):
+    print(f"{'':2}{'kandidat':<16}{'CV acc':>9}{'± std':>7}{'uji':>7}{'1 baris':>10}{'batch':>10}{'ukuran':>10}")
+    for h in sorted(hasil, key=lambda h: h['latency_ms_p50']):
+        tanda = '>' if h['name'] == terpilih else ('*' if h['name'] in front else '')
+        print(f"{tanda:2}{h['name']:<16}{h['cv_accuracy']:>9.3f}{h['cv_std']:>7.3f}{h['test_accuracy']:>7.3f}"
+              f"{h['latency_ms_p50']:>7.2f} ms{h['batch_ms_p50']:>7.2f} ms{h['model_bytes'] / 1024:>7.0f} KB")
+    print("* = front Pareto, > = terpilih")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latih ulang pipeline & cari front Pareto akurasi/latensi/ukuran.")
+    parser.add_argument('--data', default=str(DATA_PATH), help="Path dataset CSV")
+    parser.add_argument('--folds', type=int, default=N_FOLD_DEFAULT, help="Jumlah fold cross-validation")
+    parser.add_argument('--repeat', type=int, default=REPEAT_DEFAULT, help="Jumlah panggilan satu baris per kandidat")
+    parser.add_argument('--quick', action='store_true', help="Grid kandidat yang lebih kecil")
+    parser.add_argument('--tolerance', type=float, default=TOLERANSI_DEFAULT,
+                        help="Selisih akurasi CV maksimum terhadap kandidat terbaik")
+    parser.add_argument('--pick', help="Nama kandidat yang diekspor (abaikan --tolerance)")
+    parser.add_argument('--output', help="Ekspor pipeline terpilih ke path .pkl ini")
+    parser.add_argument('--register', action='store_true', help="Daftarkan model hasil ekspor ke registry")
+    parser.add_argument('--out', default=str(BUNDLE_DIR), help="Direktori bundle (untuk --register)")
+    parser.add_argument('--report', help="Tulis seluruh hasil + front ke file JSON ini")
+    args = parser.parse_args(argv)
+    if args.register and not args.output:
+        parser.error("--register membutuhkan --output")
+
+    kandidat = daftar_kandidat(cepat=args.quick)
+    if args.pick and args.pick not in kandidat:
+        parser.error(f"kandidat tidak dikenal: {args.pick} (pilih dari {', '.join(kandidat)})")
+
+    def lapor(metrik):
+        print(f"\r{metrik['name']:<16}", end='', file=sys.stderr)
+
+    hasil, pipelines, front = cari(args.data, kandidat, n_folds=args.folds, repeat=args.repeat, progress=lapor)
+    print(file=sys.stderr)
+    terpilih = args.pick or pilih_kandidat(hasil, front, args.tolerance)
+    _cetak(hasil, front, terpilih)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'candidates': hasil, 'pareto_front': front, 'selected': terpilih,
+                       'tolerance': args.tolerance, 'created': time.strftime('%Y-%m-%dT%H:%M:%S%z')}, f, indent=2)
+    if args.output:
+        output = Path(args.output)
+        joblib.dump(pipelines[terpilih], output)
+        print(f"Diekspor: {terpilih} -> {output}")
+        if args.register:
+            from jantung.registry import daftarkan
+
+            entri = daftarkan(output, args.data, args.out)
+            print(f"Terdaftar: {entri['version']} (aktifkan dengan: python -m jantung.registry activate "
+                  f"{entri['version']})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,198 @@
+# jantung/treeshap.py
+#
+# TreeSHAP eksak (path-dependent) untuk RandomForestClassifier, dihitung
+# langsung dari array tree_ milik tiap estimator tanpa paket 'shap'.
+#
+# Setiap daun dipandang sebagai satu jalur: untuk tiap fitur unik di jalur itu
+# disimpan interval (lo, hi] yang harus dipenuhi x agar sampai ke daun, dan
+# z = fraksi cover data latih yang melewati split pada fitur tersebut. Nilai
+# Shapley kontribusi daun terhadap fitur i adalah
+#
+#   v * (o_i - z_i) * sum_k c_k * k! (d-k-1)! / d!
+#
+# dengan o_j = 1 jika x memenuhi interval fitur j, dan c_k koefisien polinom
+# prod_{j != i} (z_j + o_j t). Jalur yang lebih pendek dari d diisi fitur
+# dummy (o = z = 1) yang merupakan null player, jadi tidak mengubah hasil.
+# Karena o biner, kontribusi untuk semua 2^d pola o diprakomputasi per daun;
+# skoring tinggal membandingkan interval, lookup tabel, dan satu matmul,
+# divektorkan untuk banyak baris sekaligus.
+#
+# Tabel itu berukuran daun x 2^d x d float64, dengan d = jumlah fitur unik
+# terbanyak di satu jalur. Untuk forest yang dalam (mis. tanpa max_depth)
+# ukurannya bisa mencapai gigabyte, sehingga TreeShap menolak forest yang
+# tabelnya melewati HEART_TREESHAP_MAX_MB (default 256) dengan ValueError;
+# MesinPenjelasan lalu memakai LIME (lihat jantung/explain.py).
+
+import os
+from math import factorial
+
+import numpy as np
+
+# Batas elemen array (baris x daun x d) per chunk agar memori tetap terkendali
+_MAX_ELEMEN_CHUNK = 1_000_000
+# Batas ukuran tabel kontribusi (MB) yang boleh dibangun
+MAX_TABEL_MB = float(os.environ.get('HEART_TREESHAP_MAX_MB', 256))
+
+
+class TreeShap:
+    """Penjelas SHAP eksak untuk classifier berbasis pohon (RandomForest/ExtraTrees)."""
+
+    def __init__(self, classifier, label=1, max_tabel_mb=MAX_TABEL_MB):
+        if not hasattr(classifier, 'estimators_') or not hasattr(classifier.estimators_[0], 'tree_'):
+            raise ValueError(f"TreeShap hanya mendukung ensemble pohon, bukan {type(classifier).__name__}")
+        self.classifier = classifier
+        self.label = label
+        self.n_features = classifier.n_features_in_
+        self._build(classifier.estimators_, max_tabel_mb)
+
+    def _build(self, estimators, max_tabel_mb):
+        leaves = []
+        bobot_pohon = 1.0 / len(estimators)
+        for estimator in estimators:
+            leaves.extend(self._daun_pohon(estimator.tree_, bobot_pohon))
+        d = max(1, max(len(jalur) for _, jalur in leaves))
+        n_leaves = len(leaves)
+        ukuran_mb = n_leaves * (1 << d) * d * 8 / 2**20
+        if ukuran_mb > max_tabel_mb:
+            raise ValueError(f"Tabel TreeSHAP terlalu besar: {n_leaves} daun x 2^{d} pola x {d} slot "
+                             f"= {ukuran_mb:.0f} MB (batas {max_tabel_mb:.0f} MB, HEART_TREESHAP_MAX_MB)")
+
+        self.d = d
+        self.leaf_value = np.empty(n_leaves)
+        # Slot kosong menunjuk ke kolom dummy (indeks n_features)
+        self.leaf_feature = np.full((n_leaves, d), self.n_features, dtype=np.intp)
+        self.leaf_lo = np.full((n_leaves, d), -np.inf)
+        self.leaf_hi = np.full((n_leaves, d), np.inf)
+        self.leaf_z = np.ones((n_leaves, d))
+        for idx, (value, jalur) in enumerate(leaves):
+            self.leaf_value[idx] = value
+            for slot, (fitur, (lo, hi, z)) in enumerate(jalur.items()):
+                self.leaf_feature[idx, slot] = fitur
+                self.leaf_lo[idx, slot] = lo
+                self.leaf_hi[idx, slot] = hi
+                self.leaf_z[idx, slot] = z
+
+        self.expected_value = float(np.sum(self.leaf_value * np.prod(self.leaf_z, axis=1)))
+        # Tabel diratakan menjadi (daun * 2^d, d) agar lookup cukup satu np.take
+        self._tabel = self._tabel_kontribusi().reshape(n_leaves << d, d)
+        self._offset_daun = np.arange(n_leaves, dtype=np.intp) << d
+        # Slot dummy boleh membaca kolom mana saja karena intervalnya (-inf, inf]
+        self._kolom_x = np.minimum(self.leaf_feature, self.n_features - 1)
+        # Matriks one-hot (daun, slot) -> fitur untuk menjumlahkan kontribusi dengan satu matmul
+        self._ke_fitur = np.zeros((n_leaves * d, self.n_features + 1))
+        self._ke_fitur[np.arange(n_leaves * d), self.leaf_feature.ravel()] = 1.0
+
+    def _tabel_kontribusi(self):
+        # o_j hanya bernilai 0/1, jadi tiap daun hanya punya 2^d pola o yang mungkin.
+        # Kontribusi tiap slot untuk semua pola dihitung sekali di sini; saat
+        # skoring cukup lookup tabel[daun, pola].
+        n_leaves, d = self.leaf_z.shape
+        z = self.leaf_z
+        bobot_k = np.array([factorial(k) * factorial(d - k - 1) / factorial(d) for k in range(d)])
+        tabel = np.empty((n_leaves, 1 << d, d))
+        for pola in range(1 << d):
+            o = np.array([(pola >> j) & 1 for j in range(d)], dtype=float)
+            for i in range(d):
+                # Koefisien polinom prod_{j != i} (z_j + o_j t), per daun
+                coef = np.zeros((n_leaves, d))
+                coef[:, 0] = 1.0
+                for j in range(d):
+                    if j == i:
+                        continue
+                    coef[:, 1:] = coef[:, 1:] * z[:, j, None] + coef[:, :-1] * o[j]
+                    coef[:, 0] *= z[:, j]
+                tabel[:, pola, i] = self.leaf_value * (o[i] - z[:, i]) * (coef @ bobot_k)
+        return tabel
+
+    def _daun_pohon(self, tree, bobot_pohon):
+        value = tree.value[:, 0, :]
+        prob = value[:, self.label] / value.sum(axis=1)
+        cover = tree.weighted_n_node_samples
+        daun = []
+        stack = [(0, {})]
+        while stack:
+            node, jalur = stack.pop()
+            kiri, kanan = tree.children_left[node], tree.children_right[node]
+            if kiri == kanan:
+                daun.append((prob[node] * bobot_pohon, jalur))
+                continue
+            fitur, ambang = int(tree.feature[node]), float(tree.threshold[node])
+            lo, hi, z = jalur.get(fitur, (-np.inf, np.inf, 1.0))
+            # sklearn: ke kiri jika x <= threshold
+            jalur_kiri = dict(jalur)
+            jalur_kiri[fitur] = (lo, min(hi, ambang), z * cover[kiri] / cover[node])
+            jalur_kanan = dict(jalur)
+            jalur_kanan[fitur] = (max(lo, ambang), hi, z * cover[kanan] / cover[node])
+            stack.append((kanan, jalur_kanan))
+            stack.append((kiri, jalur_kiri))
+        return daun
+
+    def shap_values(self, X):
+        """Nilai SHAP (n_rows, n_features) untuk probabilitas kelas `label`.
+
+        sum(shap_values[r]) + expected_value == predict_proba(X)[r, label].
+        """
+        # sklearn membandingkan fitur dalam float32; ikuti agar jalur ke daun identik
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32)).astype(np.float64)
+        n_leaves = self.leaf_value.shape[0]
+        chunk = max(1, _MAX_ELEMEN_CHUNK // (n_leaves * self.d))
+        hasil = np.empty((X.shape[0], self.n_features))
+        for mulai in range(0, X.shape[0], chunk):
+            hasil[mulai:mulai + chunk] = self._shap_chunk(X[mulai:mulai + chunk])
+        return hasil
+
+    def _shap_chunk(self, X):
+        n = X.shape[0]
+        xf = X[:, self._kolom_x]
+        o = (xf > self.leaf_lo) & (xf <= self.leaf_hi)
+        pola = self._offset_daun + o[:, :, 0]
+        for j in range(1, self.d):
+            pola |= o[:, :, j].astype(np.intp) << j
+        kontribusi = np.take(self._tabel, pola, axis=0)
+        phi = kontribusi.reshape(n, -1) @ self._ke_fitur
+        return phi[:, :self.n_features]
+
+    def explain(self, data_row, feature_names, num_features=None):
+        phi = self.shap_values(data_row)[0]
+        return PenjelasanTree(phi, np.asarray(data_row, dtype=float), list(feature_names),
+                              self.expected_value, label=self.label, num_features=num_features)
+
+    def predict(self, X):
+        # Probabilitas kelas `label` hasil rekonstruksi; untuk verifikasi aditivitas
+        return self.expected_value + self.shap_values(X).sum(axis=1)
+
+
+class PenjelasanTree:
+    """Hasil TreeShap untuk satu baris dengan API yang sama seperti lime Explanation.
+
+    Mendukung local_exp, as_list(label) dan as_pyplot_figure(label), sehingga
+    bisa menggantikan objek LIME di halaman prediksi tanpa mengubah kode grafik.
+    """
+
+    def __init__(self, phi, data_row, feature_names, expected_value, label=1,
+                 num_features=None, class_names=('No Disease', 'Disease')):
+        urutan = np.argsort(-np.abs(phi), kind='stable')[:num_features]
+        self.label = label
+        self.class_names = list(class_names)
+        self.intercept = {label: expected_value}
+        self.local_exp = {label: [(int(idx), float(phi[idx])) for idx in urutan]}
+        prob_label = expected_value + phi.sum()
+        self.predict_proba = np.array([1 - prob_label, prob_label] if label == 1 else [prob_label, 1 - prob_label])
+        self._names = [f"{feature_names[idx]} = {data_row[idx]:.2f}" for idx in range(len(feature_names))]
+
+    def as_list(self, label=1):
+        return [(self._names[idx], bobot) for idx, bobot in self.local_exp[label]]
+
+    def as_pyplot_figure(self, label=1, **kwargs):
+        # Tata letak sama dengan lime Explanation.as_pyplot_figure
+        import matplotlib.pyplot as plt
+        exp = self.as_list(label=label)
+        fig = plt.figure(**kwargs)
+        vals = [x[1] for x in exp][::-1]
+        names = [x[0] for x in exp][::-1]
+        colors = ['green' if x > 0 else 'red' for x in vals]
+        pos = np.arange(len(exp)) + .5
+        plt.barh(pos, vals, align='center', color=colors)
+        plt.yticks(pos, names)
+        plt.title(f"Local explanation for class {self.class_names[label]}")
+        return fig
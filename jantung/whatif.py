@@ -0,0 +1,136 @@
+# jantung/whatif.py
+#
+# Sapuan sensitivitas "what-if": satu pasien, satu atau dua fitur digeser di
+# sepanjang rentang form prediksi (RENTANG_NUMERIK / KATEGORI). Seluruh grid
+# baris pasien termodifikasi dibangun sekaligus lalu diskor dengan SATU
+# panggilan predict_proba, bukan ratusan panggilan satu baris.
+#
+# Hasil sapuan disimpan di CacheHasil (kunci = versi model + pasien + fitur +
+# resolusi), sehingga menggeser slider di halaman prediksi hanya membaca grid
+# yang sudah ada (nilai_di) tanpa menghitung ulang.
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from jantung.cache import kunci_pasien
+from jantung.schema import AMBANG_SEDANG, AMBANG_TINGGI, FITUR, KATEGORI, RENTANG_NUMERIK
+
+N_TITIK_DEFAULT = 60
+N_TITIK_2D_DEFAULT = 40
+FITUR_SAPUAN = list(RENTANG_NUMERIK) + list(KATEGORI)
+
+
+@dataclass(frozen=True)
+class HasilSapuan:
+    fitur_x: str
+    nilai_x: tuple
+    prob: np.ndarray            # (len(nilai_x),) atau (len(nilai_y), len(nilai_x))
+    fitur_y: str = None
+    nilai_y: tuple = None
+
+    def titik_x(self, x):
+        """Titik grid sumbu x yang paling dekat dengan x."""
+        return self.nilai_x[_indeks_terdekat(self.nilai_x, x)]
+
+    def titik_y(self, y):
+        return self.nilai_y[_indeks_terdekat(self.nilai_y, y)]
+
+    def nilai_di(self, x, y=None):
+        """Probabilitas pada titik grid terdekat dengan (x, y); tanpa skoring ulang."""
+        ix = _indeks_terdekat(self.nilai_x, x)
+        if self.fitur_y is None:
+            return float(self.prob[ix])
+        return float(self.prob[_indeks_terdekat(self.nilai_y, y), ix])
+
+
+def _indeks_terdekat(nilai, target):
+    if isinstance(nilai[0], str) or isinstance(target, str):
+        return list(nilai).index(target)
+    return int(np.abs(np.asarray(nilai, dtype=float) - float(target)).argmin())
+
+
+def nilai_grid(fitur, n_titik=N_TITIK_DEFAULT):
+    """Titik grid untuk satu fitur: opsi kategori, atau n_titik di rentang form (dibulatkan ke step form)."""
+    if fitur in KATEGORI:
+        return tuple(KATEGORI[fitur])
+    if fitur not in RENTANG_NUMERIK:
+        raise ValueError(f"Fitur tidak bisa disapu: {fitur!r}")
+    bawah, atas = RENTANG_NUMERIK[fitur]
+    titik = np.linspace(bawah, atas, n_titik)
+    if fitur == 'Oldpeak':
+        return tuple(float(v) for v in np.unique(np.round(titik, 1)))
+    return tuple(int(v) for v in np.unique(np.round(titik)))
+
+
+def bangun_grid(pasien, fitur_x, nilai_x, fitur_y=None, nilai_y=None):
+    """DataFrame semua kombinasi (nilai_y x nilai_x), fitur lain tetap seperti `pasien`."""
+    n_x, n_y = len(nilai_x), len(nilai_y) if fitur_y else 1
+    kolom = {k: np.repeat(np.asarray([pasien[k]], dtype=object), n_x * n_y) for k in FITUR}
+    kolom[fitur_x] = np.tile(np.asarray(nilai_x, dtype=object), n_y)
+    if fitur_y:
+        kolom[fitur_y] = np.repeat(np.asarray(nilai_y, dtype=object), n_x)
+    df = pd.DataFrame(kolom, columns=FITUR)
+    # Tipe kolom sama dengan input form: numerik sebagai angka, kategori apa adanya
+    for k in RENTANG_NUMERIK:
+        df[k] = pd.to_numeric(df[k])
+    df['FastingBS'] = df['FastingBS'].astype(int)
+    return df
+
+
+def sapuan(model, pasien, fitur_x, fitur_y=None, n_titik=None):
+    """Skor grid what-if satu/dua fitur dengan satu panggilan predict_proba."""
+    if fitur_y == fitur_x:
+        fitur_y = None
+    n_titik = n_titik or (N_TITIK_2D_DEFAULT if fitur_y else N_TITIK_DEFAULT)
+    nilai_x = nilai_grid(fitur_x, n_titik)
+    nilai_y = nilai_grid(fitur_y, n_titik) if fitur_y else None
+    grid = bangun_grid(pasien, fitur_x, nilai_x, fitur_y, nilai_y)
+    prob = np.asarray(model.predict_proba(grid)[:, 1], dtype=float)
+    if fitur_y:
+        prob = prob.reshape(len(nilai_y), len(nilai_x))
+    return HasilSapuan(fitur_x=fitur_x, nilai_x=nilai_x, prob=prob, fitur_y=fitur_y, nilai_y=nilai_y)
+
+
+def sapuan_cache(cache, model, versi_model, pasien, fitur_x, fitur_y=None, n_titik=None):
+    """sapuan() lewat CacheHasil; grid yang sama untuk pasien & model yang sama tidak dihitung ulang."""
+    kunci = ('whatif', kunci_pasien(pasien, versi_model), fitur_x, fitur_y, n_titik)
+    return cache.get_or_compute(kunci, lambda: sapuan(model, pasien, fitur_x, fitur_y, n_titik))
+
+
+def figur_sapuan(hasil, judul, label_risiko, nilai_pasien=None, nilai_pilih=None):
+    """Kurva risiko (1 fitur) atau heatmap (2 fitur), dalam persen, dengan ambang risiko aplikasi.
+
+    `nilai_pasien` / `nilai_pilih` adalah nilai x (atau (x, y)) pasien asli dan
+    posisi slider; keduanya ditandai pada grafik.
+    """
+    persen = hasil.prob * 100
+    if hasil.fitur_y is None:
+        x = list(hasil.nilai_x)
+        fig = go.Figure(go.Scatter(x=x, y=persen, mode='lines+markers' if len(x) < 10 else 'lines',
+                                   line={'color': '#0d6efd', 'width': 3}, name=label_risiko,
+                                   hovertemplate=f'{hasil.fitur_x}=%{{x}}<br>%{{y:.1f}}%<extra></extra>'))
+        for ambang, warna in ((AMBANG_SEDANG, '#F9A825'), (AMBANG_TINGGI, '#FF4B4B')):
+            fig.add_hline(y=ambang * 100, line_dash='dot', line_color=warna)
+        for nilai, warna, simbol in ((nilai_pasien, '#212529', 'circle'), (nilai_pilih, '#FF4B4B', 'diamond')):
+            if nilai is not None:
+                fig.add_trace(go.Scatter(x=[nilai], y=[hasil.nilai_di(nilai) * 100], mode='markers',
+                                         marker={'size': 12, 'color': warna, 'symbol': simbol},
+                                         showlegend=False, hoverinfo='skip'))
+        fig.update_layout(yaxis={'title': f'{label_risiko} (%)', 'range': [0, 100]}, xaxis_title=hasil.fitur_x)
+    else:
+        fig = go.Figure(go.Heatmap(z=persen, x=list(hasil.nilai_x), y=list(hasil.nilai_y), zmin=0, zmax=100,
+                                   colorscale=[[0, '#E9F5E9'], [AMBANG_SEDANG, '#FFF8E1'],
+                                               [AMBANG_TINGGI, '#FFEBEE'], [1, '#FF4B4B']],
+                                   colorbar={'title': '%'},
+                                   hovertemplate=(f'{hasil.fitur_x}=%{{x}}<br>{hasil.fitur_y}=%{{y}}'
+                                                  '<br>%{z:.1f}%<extra></extra>')))
+        for nilai, warna, simbol in ((nilai_pasien, '#212529', 'circle'), (nilai_pilih, '#0d6efd', 'diamond')):
+            if nilai is not None:
+                fig.add_trace(go.Scatter(x=[nilai[0]], y=[nilai[1]], mode='markers', showlegend=False,
+                                         marker={'size': 12, 'color': warna, 'symbol': simbol}, hoverinfo='skip'))
+        fig.update_layout(xaxis_title=hasil.fitur_x, yaxis_title=hasil.fitur_y)
+    fig.update_layout(title_text=judul, height=420, margin=dict(l=10, r=10, t=50, b=10))
+    return fig
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+import pytest
+
+from jantung.artifacts import aktifkan_versi
+from jantung.registry import PengelolaModel
+
+
+def _aktifkan(out_dir, versi):
+    (out_dir / versi).mkdir(exist_ok=True)
+    (out_dir / versi / "manifest.json").write_text("{}")
+    aktifkan_versi(versi, out_dir)
+
+
+@pytest.fixture
+def pengelola(tmp_path):
+    _aktifkan(tmp_path, 'v-lama')
+    dimuat = []
+
+    def pemuat(version):
+        dimuat.append(version)
+        if version == 'v-rusak':
+            raise FileNotFoundError(f"{version}/pipeline.joblib")
+        return SimpleNamespace(versi_model=version)
+
+    pm = PengelolaModel(out_dir=tmp_path, poll_s=1e-9, pemuat=pemuat)
+    return pm, dimuat, tmp_path
+
+
+def test_versi_gagal_dimuat_model_lama_tetap_dilayani(pengelola):
+    pm, dimuat, out_dir = pengelola
+    _aktifkan(out_dir, 'v-rusak')
+    for _ in range(3):
+        with pm.sewa() as sd:
+            assert sd.versi_model == 'v-lama'
+    # Versi rusak dicoba sekali saja, bukan di setiap poll
+    assert dimuat == ['v-lama', 'v-rusak']
+    assert 'v-rusak' in pm.status()['failed']
+    assert pm.swaps == 0
+
+
+def test_versi_gagal_lalu_versi_lain_diaktifkan(pengelola):
+    pm, dimuat, out_dir = pengelola
+    _aktifkan(out_dir, 'v-rusak')
+    with pm.sewa():
+        pass
+    _aktifkan(out_dir, 'v-baru')
+    with pm.sewa() as sd:
+        assert sd.versi_model == 'v-baru'
+    assert pm.swaps == 1
+    # Dipaksa: versi yang pernah gagal dicoba lagi
+    _aktifkan(out_dir, 'v-rusak')
+    assert pm.sinkron(paksa=True) is False
+    assert dimuat.count('v-rusak') == 2
+    assert pm.aktif.versi_model == 'v-baru'
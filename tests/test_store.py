@@ -0,0 +1,101 @@
+import json
+import multiprocessing
+
+import pandas as pd
+import pytest
+
+from jantung.schema import DATA_PATH, TARGET
+from jantung.store import ASAL_CSV, ASAL_INGEST, buka_store
+
+
+@pytest.fixture
+def sumber(tmp_path):
+    df = pd.read_csv(DATA_PATH).head(100)
+    path = tmp_path / "heart.csv"
+    df.to_csv(path, index=False)
+    return path, df
+
+
+def _ubah_baris_lama(path):
+    df = pd.read_csv(path)
+    df.loc[3, 'Cholesterol'] += 1
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_csv_berubah_partisi_ingest_dipertahankan(tmp_path, sumber):
+    path, df = sumber
+    store = buka_store(path, tmp_path / "store")
+    store.tambah(pd.read_csv(DATA_PATH).tail(50))
+    assert len(store) == 150
+
+    diubah = _ubah_baris_lama(path)
+    store = buka_store(path, tmp_path / "store")
+    assert len(store) == 150
+    assert [p['origin'] for p in store.manifest['partitions']] == [ASAL_INGEST, ASAL_CSV]
+    assert store.dataframe()['Cholesterol'].sum() == diubah['Cholesterol'].sum() + pd.read_csv(DATA_PATH).tail(50)['Cholesterol'].sum()
+    assert store.agregat.n == 150
+
+
+def test_store_lama_tanpa_asal_tidak_diubah(tmp_path, sumber):
+    path, _ = sumber
+    store = buka_store(path, tmp_path / "store")
+    store.tambah(pd.read_csv(DATA_PATH).tail(50))
+    # Simulasikan manifest store lama: asal partisi tidak tercatat
+    manifest_path = tmp_path / "store" / "manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    for partisi in manifest['partitions']:
+        del partisi['origin']
+    manifest_path.write_text(json.dumps(manifest))
+
+    _ubah_baris_lama(path)
+    store = buka_store(path, tmp_path / "store")
+    assert len(store) == 150
+    assert len(store.manifest['partitions']) == 2
+
+
+def test_format_lama_dengan_ingest_ditolak(tmp_path, sumber):
+    path, _ = sumber
+    store = buka_store(path, tmp_path / "store")
+    store.tambah(pd.read_csv(DATA_PATH).tail(50))
+    manifest_path = tmp_path / "store" / "manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest['format'] = 1
+    manifest_path.write_text(json.dumps(manifest))
+
+    with pytest.raises(ValueError, match="rebuild"):
+        buka_store(path, tmp_path / "store")
+    assert len(json.loads(manifest_path.read_text())['partitions']) == 2
+
+
+def test_baris_rusak_di_ekor_csv_dilewati(tmp_path, sumber):
+    path, df = sumber
+    buka_store(path, tmp_path / "store")
+    rusak = df.head(2).copy()
+    rusak.loc[rusak.index[0], 'ST_Slope'] = 'Upp'
+    rusak.to_csv(path, mode='a', header=False, index=False)
+
+    store = buka_store(path, tmp_path / "store")
+    assert len(store) == 101
+    assert store.agregat.per_kelas['sakit'] + store.agregat.per_kelas['sehat'] == 101
+    assert set(store.dataframe()['ST_Slope'].astype(str)) <= {'Up', 'Flat', 'Down'}
+    assert TARGET in store.dataframe().columns
+
+
+def _buka_di_proses(args):
+    path, store_dir = args
+    return len(buka_store(path, store_dir))
+
+
+def test_bootstrap_bersamaan_dari_banyak_proses(tmp_path, sumber):
+    # Setiap worker app menyinkronkan store saat memuat model; deploy baru membangunnya bersamaan
+    path, df = sumber
+    store_dir = tmp_path / "store"
+    konteks = multiprocessing.get_context('spawn')
+    with konteks.Pool(4) as pool:
+        hasil = pool.map(_buka_di_proses, [(str(path), str(store_dir))] * 8)
+    assert hasil == [len(df)] * 8
+    store = buka_store(path, store_dir)
+    assert len(store) == len(df)
+    assert [p['name'] for p in store.manifest['partitions']] == ['part-000000']
+    assert sorted(d.name for d in store_dir.iterdir()) == ['.lock', 'manifest.json', 'part-000000']